@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+批次匯出播放清單
+不開啟視窗，依批次描述檔一次產生多個 XSPF 播放清單
+
+批次描述檔格式 (JSON):
+    {
+      "playlists": [
+        {
+          "name": "2026-W42 Alice",
+          "tracks": [["BodyCombat/BC64.mp4", 1], ["BodyPump/BP100.mp4", 3]]
+        }
+      ]
+    }
+
+用法:
+    python batch_export.py WORK_DIR batch.json [--output-dir DIR] [--workers N] [--relative]
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from track_catalog import TrackCatalog
+from utils import normalize_video_id
+from xspf_generator import PlaylistItem, XSPFGenerator
+
+# 傳給子行程的播放清單：(名稱, 輸出檔案, [(影片相對路徑, 序號, 名稱, 開始, 結束, 訓練)])
+PlaylistJob = Tuple[str, str, List[Tuple[str, int, str, float, float, str]]]
+
+
+class BatchSpecError(Exception):
+    """批次描述檔格式錯誤或引用了不存在的分段"""
+
+
+def _parse_serial(value) -> Optional[int]:
+    """
+    解析分段序號：只接受整數（不含 bool）或只有 ASCII 數字的字串
+
+    Returns:
+        序號，格式不符時回傳 None
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    return None
+
+
+def load_batch_spec(spec_path: Path) -> List[Dict]:
+    """
+    讀取批次描述檔
+
+    Args:
+        spec_path: 批次描述檔路徑
+
+    Returns:
+        [{"name": 名稱, "tracks": [(影片路徑, 序號)]}]
+
+    Raises:
+        BatchSpecError: 檔案無法讀取或格式錯誤
+    """
+    try:
+        with open(spec_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        raise BatchSpecError(f"批次描述檔載入失敗: {e}")
+
+    if not isinstance(data, dict) or not isinstance(data.get("playlists", []), list):
+        raise BatchSpecError("批次描述檔格式錯誤: 需要包含 playlists 列表的物件")
+
+    playlists = []
+    names = set()
+    for i, playlist in enumerate(data.get("playlists", []), start=1):
+        if not isinstance(playlist, dict):
+            raise BatchSpecError(f"第 {i} 個播放清單格式錯誤: {playlist!r}")
+
+        name = str(playlist.get("name", ""))
+        if name.lower().endswith('.xspf'):
+            name = name[:-len('.xspf')]
+        if not name:
+            raise BatchSpecError(f"第 {i} 個播放清單沒有名稱")
+        # 名稱即輸出檔名，不可指向輸出目錄以外
+        if '/' in name or '\\' in name or '..' in name or name == '.':
+            raise BatchSpecError(f"播放清單名稱不可包含路徑: {name}")
+        if name in names:
+            raise BatchSpecError(f"播放清單名稱重複: {name}")
+        names.add(name)
+
+        tracks = playlist.get("tracks", [])
+        if not isinstance(tracks, list):
+            raise BatchSpecError(f"播放清單 {name}: tracks 必須是列表")
+
+        refs = []
+        for j, ref in enumerate(tracks, start=1):
+            # 接受 ["影片", 序號] 或 {"video": "影片", "serial": 序號}
+            if isinstance(ref, dict):
+                video, serial = ref.get("video"), ref.get("serial")
+            elif isinstance(ref, list) and len(ref) == 2:
+                video, serial = ref
+            else:
+                raise BatchSpecError(f"播放清單 {name} 第 {j} 個分段: 無效的分段引用 {ref!r}")
+
+            if not isinstance(video, str) or not video:
+                raise BatchSpecError(f"播放清單 {name} 第 {j} 個分段: 無效的影片 {video!r}")
+            serial = _parse_serial(serial)
+            if serial is None:
+                raise BatchSpecError(f"播放清單 {name} 第 {j} 個分段: 無效的序號 {ref!r}")
+            refs.append((video, serial))
+        playlists.append({"name": name, "tracks": refs})
+    return playlists
+
+
+def resolve_playlists(work_dir: Path, playlists: List[Dict], output_dir: Path) -> List[PlaylistJob]:
+    """
+    以分段目錄解析所有分段引用，任何一個分段不存在就停止
+
+    Args:
+        work_dir: 工作目錄路徑
+        playlists: load_batch_spec() 的結果
+        output_dir: 輸出目錄
+
+    Returns:
+        播放清單工作列表
+
+    Raises:
+        BatchSpecError: 引用了不存在的影片或分段
+    """
+    catalog = TrackCatalog.for_workspace(work_dir)
+    catalog.refresh()
+
+    jobs = []
+    for playlist in playlists:
+        items = []
+        for video, serial in playlist["tracks"]:
+            video_id = normalize_video_id(video, work_dir)
+            track = catalog.get_track(work_dir / video_id, serial)
+            if track is None:
+                raise BatchSpecError(f"播放清單 {playlist['name']}: 找不到分段 {video_id} #{serial}")
+            items.append((video_id, track.serial, track.name, track.start, track.end, track.training))
+        jobs.append((playlist["name"], str(output_dir / f"{playlist['name']}.xspf"), items))
+    return jobs
+
+
+def _write_playlist(work_dir: str, job: PlaylistJob, relative_locations: bool) -> Tuple[str, int]:
+    """
+    寫入一個播放清單（在子行程中執行）
+
+    Returns:
+        (輸出檔案, 項目數)
+    """
+    name, output_file, items = job
+    generator = XSPFGenerator(work_dir, relative_locations)
+    generator.write_xspf(Path(output_file), name, (PlaylistItem(*item) for item in items))
+    return output_file, len(items)
+
+
+def export_batch(work_dir: Path, jobs: List[PlaylistJob], max_workers: int = None,
+                 relative_locations: bool = False) -> int:
+    """
+    以行程池平行寫入所有播放清單，任何一個失敗就取消其餘的工作
+
+    Args:
+        work_dir: 工作目錄路徑
+        jobs: 播放清單工作列表
+        max_workers: 子行程數量（None 表示依 CPU 核心數）
+        relative_locations: location 是否使用相對路徑
+
+    Returns:
+        寫入的項目總數
+    """
+    total_items = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_write_playlist, str(work_dir), job, relative_locations)
+                   for job in jobs]
+        try:
+            for future in as_completed(futures):
+                output_file, count = future.result()
+                total_items += count
+                print(f"✓ {output_file}（{count} 個分段）")
+        except Exception:
+            for f in futures:
+                f.cancel()
+            raise
+    return total_items
+
+
+def main() -> int:
+    """程式進入點"""
+    parser = argparse.ArgumentParser(description="Workout Planner 批次匯出播放清單")
+    parser.add_argument("work_dir", help="工作目錄路徑")
+    parser.add_argument("spec", help="批次描述檔路徑 (JSON)")
+    parser.add_argument("--output-dir", help="輸出目錄（預設為工作目錄下的 playlists/）")
+    parser.add_argument("--workers", type=int, default=None, help="子行程數量")
+    parser.add_argument("--relative", action="store_true",
+                        help="影片位置使用相對於播放清單的路徑（不需存取影片檔案）")
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir)
+    if not work_dir.is_dir():
+        print(f"✗ 找不到工作目錄: {work_dir}")
+        return 1
+
+    output_dir = Path(args.output_dir) if args.output_dir else work_dir / "playlists"
+
+    start = time.perf_counter()
+    try:
+        jobs = resolve_playlists(work_dir, load_batch_spec(Path(args.spec)), output_dir)
+    except BatchSpecError as e:
+        print(f"✗ {e}")
+        return 1
+    resolved = time.perf_counter()
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        total_items = export_batch(work_dir, jobs, args.workers, args.relative)
+    except Exception as e:
+        print(f"✗ 播放清單匯出失敗: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(f"已匯出 {len(jobs)} 個播放清單、{total_items} 個分段")
+    print(f"解析: {(resolved - start) * 1000:.1f} ms，總耗時: {elapsed:.2f} s"
+          f"（{len(jobs) / elapsed:,.1f} 個播放清單/秒，{total_items / elapsed:,.0f} 個分段/秒）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+效能量測工具
+比較不同實作的效能數據
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+def benchmark_decode(args) -> int:
+    """量測影片解碼速度（逐幀 seek 與循序解碼）"""
+    from video_decoder import CV2_AVAILABLE, measure_decode_fps
+
+    if not CV2_AVAILABLE:
+        print("✗ 需要 opencv-python 才能量測解碼速度")
+        return 1
+
+    video_path = Path(args.video)
+    if not video_path.exists():
+        print(f"✗ 找不到影片: {video_path}")
+        return 1
+
+    print(f"影片: {video_path.name}（從第 {args.start} 幀解碼 {args.frames} 幀）")
+
+    seek_fps = measure_decode_fps(video_path, args.frames, args.start, sequential=False)
+    print(f"逐幀 seek: {seek_fps:8.1f} fps")
+
+    sequential_fps = measure_decode_fps(video_path, args.frames, args.start, sequential=True)
+    print(f"循序解碼:  {sequential_fps:8.1f} fps")
+
+    if seek_fps > 0:
+        print(f"加速倍數:  {sequential_fps / seek_fps:8.1f}x")
+    return 0
+
+
+def benchmark_seek(args) -> int:
+    """量測隨機跳轉延遲（OpenCV seek 與關鍵幀索引）"""
+    from keyframe_index import KeyframeIndex
+    from video_decoder import CV2_AVAILABLE, measure_seek_latency
+
+    if not CV2_AVAILABLE:
+        print("✗ 需要 opencv-python 才能量測跳轉延遲")
+        return 1
+
+    video_path = Path(args.video)
+    if not video_path.exists():
+        print(f"✗ 找不到影片: {video_path}")
+        return 1
+
+    index = KeyframeIndex.load_or_build(video_path)
+    if index is None:
+        print("✗ 無法建立關鍵幀索引（僅支援 MP4/M4V）")
+        return 1
+
+    print(f"影片: {video_path.name}（{len(index)} 個關鍵幀，隨機跳轉 {args.samples} 次）")
+
+    opencv_latency = measure_seek_latency(video_path, args.samples)
+    print(f"OpenCV seek:  {opencv_latency * 1000:8.1f} ms")
+
+    index_latency = measure_seek_latency(video_path, args.samples, keyframe_index=index)
+    print(f"關鍵幀索引:   {index_latency * 1000:8.1f} ms")
+    return 0
+
+
+def benchmark_xspf(args) -> int:
+    """量測 XSPF 播放清單寫入速度與記憶體用量"""
+    import tracemalloc
+    from xspf_generator import PlaylistItem, XSPFGenerator
+
+    def items():
+        for i in range(args.items):
+            yield PlaylistItem(f"BodyCombat/BC{i % 50}.mp4", i % 12 + 1, f"Track {i}",
+                               i * 10.0, i * 10.0 + 300.0, "Combat")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        generator = XSPFGenerator(work_dir, relative_locations=args.relative)
+        output_file = Path(work_dir) / "benchmark.xspf"
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        generator.write_xspf(output_file, "benchmark", items())
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"項目數:     {args.items}")
+        print(f"耗時:       {elapsed * 1000:8.1f} ms（{args.items / elapsed:,.0f} 項/秒）")
+        print(f"記憶體峰值: {peak / 1024:8.1f} KB")
+        print(f"檔案大小:   {output_file.stat().st_size / 1024:8.1f} KB")
+    return 0
+
+
+def _config_stress_worker(work_dir: str, worker: int, toggles: int) -> None:
+    """壓力測試子行程：反覆切換最愛並更新播放次數"""
+    from config_manager import ConfigManager
+
+    config = ConfigManager(work_dir)
+    for i in range(toggles):
+        # 每個子行程使用不同的分段；序號為 3 的倍數者切換兩次（最後不是最愛）
+        video = f"Stress/V{i % 5}.mp4"
+        serial = worker * 100000 + i
+        config.toggle_favorite(video, serial)
+        if i % 3 == 0:
+            config.toggle_favorite(video, serial)
+        config.update_playlist_stats("stress", last_played="2000-01-01")
+        config.set_preference(f"worker{worker}", i)
+
+
+def benchmark_config_stress(args) -> int:
+    """多個行程同時修改配置檔，檢查合併結果沒有遺失任何變更"""
+    from config_manager import ConfigManager
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        print(f"{args.processes} 個行程各切換 {args.toggles} 次最愛")
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.processes) as executor:
+            futures = [executor.submit(_config_stress_worker, work_dir, w, args.toggles)
+                       for w in range(args.processes)]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        config = ConfigManager(work_dir)
+        errors = 0
+        for w in range(args.processes):
+            for i in range(args.toggles):
+                expected = i % 3 != 0
+                if config.is_favorite(f"Stress/V{i % 5}.mp4", w * 100000 + i) != expected:
+                    errors += 1
+            if config.get_preference(f"worker{w}") != args.toggles - 1:
+                errors += 1
+
+        play_count = config.config["playlists"]["stress"]["play_count"]
+        expected_count = args.processes * args.toggles
+        if play_count != expected_count:
+            errors += 1
+
+        # 共用工作目錄的其他使用者需要能讀取配置檔：儲存後權限不變（Windows 只有唯讀屬性）
+        os.chmod(config.config_file, 0o664)
+        config.toggle_favorite("Stress/mode.mp4", 1)
+        mode = os.stat(config.config_file).st_mode & 0o777
+        if os.name == 'posix' and mode != 0o664:
+            errors += 1
+
+        print(f"耗時:       {elapsed:8.2f} s")
+        print(f"播放次數:   {play_count} / {expected_count}")
+        print(f"檔案權限:   {oct(mode)}（預期 0o664）")
+        print(f"錯誤:       {errors}")
+        return 0 if errors == 0 else 1
+
+
+def benchmark_playlists(args) -> int:
+    """量測播放清單庫的掃描、快取與排序速度"""
+    from playlist_library import PlaylistLibrary
+    from xspf_generator import PlaylistItem, XSPFGenerator
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        generator = XSPFGenerator(work_dir)
+        for p in range(args.count):
+            generator.generate_xspf(f"playlist{p:05d}", [
+                PlaylistItem(f"BodyCombat/BC{(p + i) % 50}.mp4", i + 1, f"Track {i}",
+                             i * 300.0, i * 300.0 + 240.0 + p % 60, "Combat")
+                for i in range(args.tracks)
+            ])
+        stats = {f"playlist{p:05d}.xspf": {"play_count": p % 17, "last_played": f"2026-01-{p % 28 + 1:02d}"}
+                 for p in range(args.count)}
+
+        start = time.perf_counter()
+        PlaylistLibrary(work_dir).refresh(stats)
+        cold = time.perf_counter() - start
+
+        # 新的行程：從快取檔載入，只比對簽章
+        start = time.perf_counter()
+        library = PlaylistLibrary(work_dir)
+        library.refresh(stats)
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for sort_by in PlaylistLibrary.SORT_KEYS:
+            library.get_playlists(sort_by)
+            library.get_playlists(sort_by, reverse=True)
+        sort_time = (time.perf_counter() - start) / (2 * len(PlaylistLibrary.SORT_KEYS))
+
+        print(f"播放清單數: {args.count}（各 {args.tracks} 個分段）")
+        print(f"首次掃描:   {cold * 1000:8.1f} ms")
+        print(f"快取載入:   {warm * 1000:8.1f} ms")
+        print(f"排序:       {sort_time * 1000:8.2f} ms")
+    return 0
+
+
+def _legacy_scan(work_dir: Path) -> int:
+    """舊的掃描方式：iterdir + 每個項目 is_dir()、兩次 glob、每個描述檔各自 stat"""
+    count = 0
+    for item in sorted(work_dir.iterdir()):
+        if not item.is_dir() or item.name.startswith('.') or item.name == 'playlists':
+            continue
+        videos = sorted(list(item.glob("*.mp4")) + list(item.glob("*.m4v")))
+        for video_path in videos:
+            try:
+                video_path.with_suffix('.json').stat()
+            except OSError:
+                pass
+            count += 1
+    return count
+
+
+def benchmark_scan(args) -> int:
+    """比較舊的掃描方式與 os.scandir 單次平行掃描"""
+    from workspace_scanner import scan_workspace
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.work_dir:
+            work_dir = Path(args.work_dir)
+        else:
+            work_dir = Path(tmp_dir)
+            for c in range(args.categories):
+                category_dir = work_dir / f"Category{c:02d}"
+                category_dir.mkdir()
+                for v in range(args.videos):
+                    (category_dir / f"V{v:04d}.mp4").touch()
+                    if v % 2 == 0:
+                        (category_dir / f"V{v:04d}.json").write_text("{}")
+
+        def best_of(func):
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        legacy = best_of(lambda: _legacy_scan(work_dir))
+        serial = best_of(lambda: scan_workspace(work_dir, max_workers=1))
+        parallel = best_of(lambda: scan_workspace(work_dir))
+
+        videos = sum(len(scan.videos) for scan in scan_workspace(work_dir).values())
+        print(f"影片數:       {videos}")
+        print(f"舊的掃描方式: {legacy * 1000:8.1f} ms")
+        print(f"scandir:      {serial * 1000:8.1f} ms")
+        print(f"scandir 平行: {parallel * 1000:8.1f} ms")
+    return 0
+
+
+class _LegacyTrack:
+    """舊的 Track：每個實例都有 __dict__，訓練名稱不共用"""
+
+    def __init__(self, serial, start, end, name="", training=""):
+        self.serial = serial
+        self.start = start
+        self.end = end
+        self.name = name
+        self.training = training
+
+
+class _LegacyPlaylistItem:
+    """舊的 PlaylistItem：每個實例都有 __dict__，每次讀取 title 都重新產生"""
+
+    def __init__(self, video_path, track_serial, track_name, start_time, end_time, training=""):
+        self.video_path = video_path
+        self.track_serial = track_serial
+        self.track_name = track_name
+        self.start_time = start_time
+        self.end_time = end_time
+        self.training = training
+
+    @property
+    def title(self):
+        parts = [Path(self.video_path).stem, f"Track {self.track_serial}"]
+        if self.track_name:
+            parts.append(self.track_name)
+        if self.training:
+            parts.append(f"({self.training})")
+        return " - ".join(parts)
+
+
+def benchmark_memory(args) -> int:
+    """比較舊的與 __slots__ 版本的 Track、PlaylistItem 記憶體用量"""
+    import json
+    import tracemalloc
+    from track_manager import Track
+    from xspf_generator import PlaylistItem
+
+    trainings = ["Warm-up", "Combat", "Power", "Conditioning", "Cool-down"]
+    files = [
+        json.dumps({"tracks": [
+            {"serial": t, "start": t * 300.0, "end": t * 300.0 + 240.5,
+             "name": f"Song {f}-{t}", "training": trainings[t % len(trainings)]}
+            for t in range(1, args.tracks_per_video + 1)
+        ]})
+        for f in range(args.tracks // args.tracks_per_video)
+    ]
+    count = len(files) * args.tracks_per_video
+
+    def measure(build):
+        """建立物件後仍保留的記憶體（每個物件的位元組數）"""
+        tracemalloc.start()
+        objects = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return objects, current / count
+
+    def load_tracks(track_class):
+        # 與讀取描述檔相同：每個檔案各自解析，字串不共用
+        tracks = []
+        for text in files:
+            tracks.append([track_class(t["serial"], t["start"], t["end"], t.get("name", ""), t.get("training", ""))
+                           for t in json.loads(text)["tracks"]])
+        return tracks
+
+    def load_items(item_class):
+        items = []
+        for f, text in enumerate(files):
+            for t in json.loads(text)["tracks"]:
+                # 與 get_relative_path() 相同：每個項目都產生新的路徑字串
+                video_path = "/".join((f"Category{f % 20:02d}", f"V{f:05d}.mp4"))
+                items.append(item_class(video_path, t["serial"], t.get("name", ""),
+                                        t["start"], t["end"], t.get("training", "")))
+        return items
+
+    def read_titles(items):
+        start = time.perf_counter()
+        for _ in range(args.title_reads):
+            for item in items:
+                item.title
+        return (time.perf_counter() - start) * 1000
+
+    _, legacy_track = measure(lambda: load_tracks(_LegacyTrack))
+    _, slots_track = measure(lambda: load_tracks(Track))
+    legacy_items, legacy_item = measure(lambda: load_items(_LegacyPlaylistItem))
+    slots_items, slots_item = measure(lambda: load_items(PlaylistItem))
+
+    print(f"分段數: {count}（每部影片 {args.tracks_per_video} 個）")
+    print(f"Track:        舊 {legacy_track:6.1f} B/個 → __slots__ {slots_track:6.1f} B/個"
+          f"（{(1 - slots_track / legacy_track) * 100:.0f}% 減少）")
+    print(f"PlaylistItem: 舊 {legacy_item:6.1f} B/個 → __slots__ {slots_item:6.1f} B/個"
+          f"（{(1 - slots_item / legacy_item) * 100:.0f}% 減少）")
+    print(f"讀取 title {args.title_reads} 次: 舊 {read_titles(legacy_items):8.1f} ms"
+          f" → 快取 {read_titles(slots_items):8.1f} ms")
+    return 0
+
+
+def main() -> int:
+    """程式進入點"""
+    parser = argparse.ArgumentParser(description="Workout Planner 效能量測")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    decode_parser = subparsers.add_parser("decode", help="量測影片解碼速度")
+    decode_parser.add_argument("video", help="影片檔案路徑")
+    decode_parser.add_argument("--frames", type=int, default=300, help="解碼幀數")
+    decode_parser.add_argument("--start", type=int, default=0, help="起始幀號")
+    decode_parser.set_defaults(func=benchmark_decode)
+
+    seek_parser = subparsers.add_parser("seek", help="量測隨機跳轉延遲")
+    seek_parser.add_argument("video", help="影片檔案路徑")
+    seek_parser.add_argument("--samples", type=int, default=50, help="跳轉次數")
+    seek_parser.set_defaults(func=benchmark_seek)
+
+    xspf_parser = subparsers.add_parser("xspf", help="量測 XSPF 播放清單寫入速度")
+    xspf_parser.add_argument("--items", type=int, default=10000, help="播放清單項目數")
+    xspf_parser.add_argument("--relative", action="store_true", help="使用相對路徑")
+    xspf_parser.set_defaults(func=benchmark_xspf)
+
+    stress_parser = subparsers.add_parser("config-stress", help="多行程同時修改配置檔的壓力測試")
+    stress_parser.add_argument("--processes", type=int, default=8, help="行程數")
+    stress_parser.add_argument("--toggles", type=int, default=50, help="每個行程切換最愛的次數")
+    stress_parser.set_defaults(func=benchmark_config_stress)
+
+    playlists_parser = subparsers.add_parser("playlists", help="量測播放清單庫的掃描與排序速度")
+    playlists_parser.add_argument("--count", type=int, default=1000, help="播放清單數")
+    playlists_parser.add_argument("--tracks", type=int, default=12, help="每個播放清單的分段數")
+    playlists_parser.set_defaults(func=benchmark_playlists)
+
+    scan_parser = subparsers.add_parser("scan", help="量測工作目錄掃描速度")
+    scan_parser.add_argument("work_dir", nargs="?", help="工作目錄路徑（預設產生測試目錄）")
+    scan_parser.add_argument("--categories", type=int, default=20, help="測試目錄的課程種類數")
+    scan_parser.add_argument("--videos", type=int, default=200, help="測試目錄每個課程種類的影片數")
+    scan_parser.add_argument("--repeat", type=int, default=5, help="重複次數（取最快的一次）")
+    scan_parser.set_defaults(func=benchmark_scan)
+
+    memory_parser = subparsers.add_parser("memory", help="比較 Track、PlaylistItem 每個物件的記憶體用量")
+    memory_parser.add_argument("--tracks", type=int, default=50000, help="分段數")
+    memory_parser.add_argument("--tracks-per-video", type=int, default=12, help="每部影片的分段數")
+    memory_parser.add_argument("--title-reads", type=int, default=5, help="讀取 title 的次數")
+    memory_parser.set_defaults(func=benchmark_memory)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
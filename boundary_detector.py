@@ -0,0 +1,351 @@
+"""
+分段邊界偵測模組
+以畫面切換與音訊靜音偵測建議的分段開始/結束時間
+"""
+
+import math
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+from track_manager import Track
+
+
+def _scan_chunk(video_path: str, start_frame: int, end_frame: int, step: int,
+                width: int, height: int) -> Tuple[int, "np.ndarray", "np.ndarray"]:
+    """
+    掃描一段影片，以低解析度影像取樣（在子行程中執行）
+
+    Args:
+        video_path: 影片檔案路徑
+        start_frame: 起始幀號
+        end_frame: 結束幀號（不含）
+        step: 取樣間隔幀數
+        width: 取樣影像寬度
+        height: 取樣影像高度
+
+    Returns:
+        (起始幀號, 取樣幀號陣列, 取樣影像陣列 [n, height * width * 3])
+    """
+    cap = cv2.VideoCapture(video_path)
+    frame_numbers = []
+    samples = []
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        for frame_number in range(start_frame, end_frame):
+            # 非取樣幀只解碼不轉換
+            if not cap.grab():
+                break
+            if (frame_number - start_frame) % step:
+                continue
+
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            frame_numbers.append(frame_number)
+            samples.append(small.reshape(-1))
+    finally:
+        cap.release()
+
+    if not samples:
+        return start_frame, np.empty(0, dtype=np.int64), np.empty((0, width * height * 3), dtype=np.uint8)
+    return start_frame, np.array(frame_numbers), np.stack(samples)
+
+
+def scene_change_scores(samples: "np.ndarray") -> "np.ndarray":
+    """
+    計算相鄰取樣影像的畫面變化分數（向量化運算）
+
+    Args:
+        samples: 取樣影像陣列 [n, pixels]
+
+    Returns:
+        分數陣列 [n - 1]，第 i 個值為第 i 與 i+1 張的平均絕對差
+    """
+    if len(samples) < 2:
+        return np.empty(0, dtype=np.float32)
+    diffs = np.abs(np.diff(samples.astype(np.int16), axis=0))
+    return diffs.mean(axis=1, dtype=np.float32)
+
+
+def find_scene_cuts(times: "np.ndarray", scores: "np.ndarray", window: int = 15,
+                    ratio: float = 3.0, min_score: float = 12.0) -> List[Tuple[float, float]]:
+    """
+    依據相對於鄰近中位數的突增判定畫面切換
+
+    Args:
+        times: 取樣時間陣列 [n]
+        scores: 畫面變化分數 [n - 1]
+        window: 計算鄰近中位數的取樣數
+        ratio: 分數需超過鄰近中位數的倍數
+        min_score: 分數下限
+
+    Returns:
+        [(切換時間, 強度)]，強度為分數與鄰近中位數的比值
+    """
+    if len(scores) == 0:
+        return []
+
+    half = window // 2
+    padded = np.pad(scores, half, mode='edge')
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1)
+    local_median = np.median(windows, axis=1) + 1.0
+
+    strength = scores / local_median
+    is_peak = np.zeros(len(scores), dtype=bool)
+    is_peak[1:-1] = (scores[1:-1] >= scores[:-2]) & (scores[1:-1] >= scores[2:])
+    mask = (strength >= ratio) & (scores >= min_score) & is_peak
+
+    return [(float(times[i + 1]), float(strength[i])) for i in np.flatnonzero(mask)]
+
+
+def find_silences(video_path: Path, window: float = 0.5, min_duration: float = 1.0,
+                  sample_rate: int = 8000) -> Optional[List[Tuple[float, float]]]:
+    """
+    以 ffmpeg 解出單聲道音訊並找出靜音區間
+
+    Args:
+        video_path: 影片檔案路徑
+        window: 計算能量的視窗長度（秒）
+        min_duration: 最短靜音長度（秒）
+        sample_rate: 取樣率
+
+    Returns:
+        [(開始時間, 結束時間)]，沒有 ffmpeg 或沒有音軌時回傳 None
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-v", "error", "-i", str(video_path), "-vn", "-ac", "1",
+             "-ar", str(sample_rate), "-f", "s16le", "-"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    audio = np.frombuffer(result.stdout, dtype=np.int16)
+    samples_per_window = int(window * sample_rate)
+    count = len(audio) // samples_per_window
+    if count == 0:
+        return None
+
+    # 每個視窗的 RMS 能量（dB）
+    frames = audio[:count * samples_per_window].reshape(count, samples_per_window).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1)) + 1.0
+    db = 20 * np.log10(rms)
+
+    # 以整部影片的音量分佈決定靜音門檻
+    threshold = min(np.percentile(db, 10) + 6.0, np.median(db) - 20.0)
+    quiet = db < threshold
+
+    silences = []
+    start = None
+    for i, is_quiet in enumerate(quiet):
+        if is_quiet and start is None:
+            start = i
+        elif not is_quiet and start is not None:
+            if (i - start) * window >= min_duration:
+                silences.append((start * window, i * window))
+            start = None
+    if start is not None and (count - start) * window >= min_duration:
+        silences.append((start * window, count * window))
+    return silences
+
+
+def select_boundaries(cuts: List[Tuple[float, float]], silences: Optional[List[Tuple[float, float]]],
+                      duration: float, min_gap: float = 120.0,
+                      expected_tracks: Optional[int] = None) -> List[float]:
+    """
+    綜合畫面切換與靜音區間挑選分段邊界
+
+    Args:
+        cuts: [(切換時間, 強度)]
+        silences: [(開始時間, 結束時間)]，None 表示沒有音訊資訊
+        duration: 影片總時長（秒）
+        min_gap: 分段最短長度（秒）
+        expected_tracks: 預期分段數（None 表示依門檻自動判定）
+
+    Returns:
+        排序後的邊界時間列表（不含 0 與影片結尾）
+    """
+    candidates = []
+    for time, strength in cuts:
+        score = strength
+        if silences:
+            # 位於靜音區間內或附近的切換更可能是分段邊界
+            if any(s - 2.0 <= time <= e + 2.0 for s, e in silences):
+                score *= 3.0
+        candidates.append((score, time))
+
+    # 較長的靜音即使沒有明顯畫面切換也列為候選
+    for start, end in silences or []:
+        if end - start >= 2.0:
+            candidates.append((end - start, (start + end) / 2))
+
+    candidates.sort(reverse=True)
+
+    selected: List[float] = []
+    limit = expected_tracks - 1 if expected_tracks else None
+    for score, time in candidates:
+        if limit is not None and len(selected) >= limit:
+            break
+        if limit is None and score < 6.0:
+            break
+        if time < min_gap / 2 or duration - time < min_gap / 2:
+            continue
+        if all(abs(time - t) >= min_gap for t in selected):
+            selected.append(time)
+
+    return sorted(selected)
+
+
+def boundaries_to_tracks(boundaries: List[float], duration: float) -> List[Track]:
+    """
+    將邊界時間轉換為連續的分段
+
+    Args:
+        boundaries: 排序後的邊界時間
+        duration: 影片總時長（秒）
+
+    Returns:
+        Track 列表（序號從1開始）
+    """
+    edges = [0.0] + boundaries + [duration]
+    return [
+        Track(serial=i, start=round(start, 2), end=round(end, 2))
+        for i, (start, end) in enumerate(zip(edges, edges[1:]), start=1)
+    ]
+
+
+class BoundaryDetector:
+    """
+    分段邊界偵測器
+
+    在背景執行緒中以行程池分段掃描影片（降低解析度與取樣率），
+    加上音訊能量分析，完成後以回呼函式回傳建議的 Track 列表
+    """
+
+    def __init__(self, video_path: Path, sample_fps: float = 2.0, width: int = 64,
+                 height: int = 36, min_gap: float = 120.0,
+                 expected_tracks: Optional[int] = None, max_workers: Optional[int] = None):
+        """
+        初始化偵測器
+
+        Args:
+            video_path: 影片檔案路徑
+            sample_fps: 每秒取樣幀數
+            width: 取樣影像寬度
+            height: 取樣影像高度
+            min_gap: 分段最短長度（秒）
+            expected_tracks: 預期分段數（None 表示自動判定）
+            max_workers: 子行程數量（None 表示依 CPU 核心數）
+        """
+        self.video_path = video_path
+        self.sample_fps = sample_fps
+        self.width = width
+        self.height = height
+        self.min_gap = min_gap
+        self.expected_tracks = expected_tracks
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.on_progress: Optional[Callable[[float, str], None]] = None
+        self.on_finished: Optional[Callable[[Optional[List[Track]]], None]] = None
+
+        self._cancel_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """在背景執行緒開始偵測"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """取消偵測"""
+        self._cancel_event.set()
+
+    def _report(self, progress: float, message: str) -> None:
+        if self.on_progress:
+            self.on_progress(progress, message)
+
+    def _run(self) -> None:
+        """偵測流程（在背景執行緒中執行）"""
+        tracks = None
+        try:
+            tracks = self.detect()
+        except Exception as e:
+            print(f"分段偵測失敗: {e}")
+        if self.on_finished and not self._cancel_event.is_set():
+            self.on_finished(tracks)
+
+    def detect(self) -> Optional[List[Track]]:
+        """
+        執行偵測
+
+        Returns:
+            建議的 Track 列表，取消或無法開啟影片時回傳 None
+        """
+        if not CV2_AVAILABLE:
+            return None
+
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            return None
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        cap.release()
+
+        duration = total_frames / fps
+        step = max(1, int(round(fps / self.sample_fps)))
+
+        # 依核心數切成多段，每段以取樣間隔對齊
+        chunk_count = self.max_workers * 2
+        chunk_frames = max(step, math.ceil(total_frames / chunk_count / step) * step)
+        chunks = [(s, min(s + chunk_frames, total_frames))
+                  for s in range(0, total_frames, chunk_frames)]
+
+        self._report(0.0, "掃描畫面...")
+        results = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(_scan_chunk, str(self.video_path), start, end, step,
+                                self.width, self.height)
+                for start, end in chunks
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                if self._cancel_event.is_set():
+                    for f in futures:
+                        f.cancel()
+                    return None
+                results.append(future.result())
+                self._report(0.9 * done / len(futures), f"掃描畫面 {done}/{len(futures)}")
+
+        results.sort(key=lambda r: r[0])
+        frame_numbers = np.concatenate([r[1] for r in results])
+        samples = np.concatenate([r[2] for r in results])
+        times = frame_numbers / fps
+
+        cuts = find_scene_cuts(times, scene_change_scores(samples))
+
+        self._report(0.9, "分析音訊...")
+        silences = find_silences(self.video_path)
+        if self._cancel_event.is_set():
+            return None
+
+        boundaries = select_boundaries(cuts, silences, duration,
+                                       self.min_gap, self.expected_tracks)
+        self._report(1.0, "完成")
+        return boundaries_to_tracks(boundaries, duration)
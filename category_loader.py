@@ -0,0 +1,79 @@
+"""
+課程種類背景載入模組
+在背景執行緒掃描課程種類並解析描述檔，介面以 after() 分批取出結果，不阻塞事件迴圈
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from track_catalog import TrackCatalog
+from workspace_scanner import scan_workspace
+
+
+class CategoryLoader:
+    """
+    課程種類載入器
+
+    先掃描所有要載入的課程種類（得知影片總數），
+    再以執行緒池平行解析有變動的描述檔，依顯示順序將已載入的影片放入 results：
+        ("total", 影片總數)
+        ("video", 課程種類, 影片路徑)
+        ("done",)
+    取消後不再放入影片，尚未開始的解析也會被取消
+    """
+
+    def __init__(self, catalog: TrackCatalog, categories: List[str], max_workers: Optional[int] = None):
+        """
+        初始化載入器
+
+        Args:
+            catalog: 分段目錄
+            categories: 依顯示順序排列的課程種類
+            max_workers: 解析描述檔的執行緒數量（None 表示依 CPU 核心數）
+        """
+        self.catalog = catalog
+        self.categories = list(categories)
+        self.max_workers = max_workers or min((os.cpu_count() or 1) * 4, 32)
+        self.results: "queue.Queue[Tuple]" = queue.Queue()
+
+        self._cancel_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已取消"""
+        return self._cancel_event.is_set()
+
+    def start(self) -> None:
+        """在背景執行緒開始載入"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """取消尚未完成的載入"""
+        self._cancel_event.set()
+
+    def _run(self) -> None:
+        """載入所有課程種類（在背景執行緒中執行）"""
+        try:
+            scans = scan_workspace(self.catalog.work_dir, self.categories)
+            scans = [scans[name] for name in self.categories if name in scans]
+            self.results.put(("total", sum(len(scan.videos) for scan in scans)))
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for scan in scans:
+                    updates = self.catalog.iter_update(scan, executor)
+                    for video_path in updates:
+                        if self.cancelled:
+                            updates.close()
+                            return
+                        self.results.put(("video", scan.name, video_path))
+
+            self.catalog.save_cache()
+        except Exception as e:
+            print(f"課程種類載入失敗: {e}")
+        finally:
+            self.results.put(("done",))
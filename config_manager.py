@@ -3,14 +3,94 @@
 管理 .workout-planner 配置檔案
 """
 
+import atexit
+import copy
 import json
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Union
+
+from utils import FileLock, atomic_write_text, normalize_video_id
+
+
+def merge_config(base: Dict, local: Dict, disk: Dict) -> Dict:
+    """
+    三方合併配置：將 local 相對於 base 的變更套用到 disk 上
+
+    - 最愛：以 (影片, 分段) 為單位套用新增與移除
+    - 播放次數：累加兩邊的增量
+    - 其他值（最後播放日期、偏好設定等）：以鍵為單位，有變更的一方覆寫（後寫入者為準）
+
+    Args:
+        base: 上次與磁碟同步時的配置
+        local: 目前記憶體中的配置
+        disk: 磁碟上最新的配置
+
+    Returns:
+        合併後的配置（新的 dict）
+    """
+    merged = copy.deepcopy(disk)
+
+    for key in set(base) | set(local):
+        if key in ("favorites", "playlists", "preferences"):
+            continue
+        if local.get(key) != base.get(key):
+            merged[key] = copy.deepcopy(local.get(key))
+
+    # 最愛
+    base_favs = base.get("favorites", {})
+    local_favs = local.get("favorites", {})
+    merged_favs = merged.setdefault("favorites", {})
+    for video in set(base_favs) | set(local_favs):
+        old = set(base_favs.get(video, []))
+        new = set(local_favs.get(video, []))
+        if old == new:
+            continue
+        serials = (set(merged_favs.get(video, [])) | (new - old)) - (old - new)
+        if serials:
+            merged_favs[video] = sorted(serials)
+        else:
+            merged_favs.pop(video, None)
+
+    # 播放清單統計
+    base_stats = base.get("playlists", {})
+    merged_stats = merged.setdefault("playlists", {})
+    for name, stats in local.get("playlists", {}).items():
+        old = base_stats.get(name, {})
+        if stats == old:
+            continue
+        target = merged_stats.setdefault(name, {"play_count": 0, "last_played": None})
+        for field, value in stats.items():
+            if field == "play_count":
+                target["play_count"] = target.get("play_count", 0) + value - old.get("play_count", 0)
+            elif value != old.get(field):
+                target[field] = copy.deepcopy(value)
+
+    # 偏好設定
+    base_prefs = base.get("preferences", {})
+    merged_prefs = merged.setdefault("preferences", {})
+    for pref, value in local.get("preferences", {}).items():
+        if value != base_prefs.get(pref):
+            merged_prefs[pref] = copy.deepcopy(value)
+
+    return merged
 
 
 class ConfigManager:
-    """配置檔案管理器"""
+    """
+    配置檔案管理器
+
+    預設每次變更都立即寫入；write_behind 模式下變更只標記為未儲存，
+    由背景執行緒在停止變更 flush_delay 秒後合併成一次寫入，
+    close()（或程式結束時）會寫入尚未儲存的變更。
+
+    寫入時先取得檔案鎖並重新讀取磁碟上的配置，與本地的變更合併後才寫回，
+    多個視窗或多台電腦同時使用同一工作目錄也不會互相覆蓋。
+
+    工作目錄有資料庫（.workout-planner.db）時，每個變更直接寫入資料庫
+    """
 
     DEFAULT_CONFIG = {
         "playlists": {},
@@ -20,41 +100,218 @@ class ConfigManager:
         }
     }
 
-    def __init__(self, work_dir: str = "."):
+    DEFAULT_FLUSH_DELAY = 1.0  # 延遲寫入的等待時間（秒）
+    NO_FAVORITES: FrozenSet[int] = frozenset()
+
+    def __init__(self, work_dir: str = ".", write_behind: bool = False,
+                 flush_delay: float = DEFAULT_FLUSH_DELAY, store=None):
         """
         初始化配置管理器
 
         Args:
             work_dir: 工作目錄路徑
+            write_behind: 是否在背景延遲寫入（使用資料庫時無作用）
+            flush_delay: 最後一次變更後等待多久才寫入（秒）
+            store: 工作目錄資料庫 (WorkspaceStore)，None 表示自動偵測
         """
         self.work_dir = Path(work_dir)
+        if store is None:
+            from workspace_store import WorkspaceStore
+            store = WorkspaceStore.open_if_exists(self.work_dir)
+        self.store = store
         self.config_file = self.work_dir / ".workout-planner"
+        self.lock_file = self.work_dir / ".workout-planner.lock"
+        self.write_behind = write_behind and store is None
+        self.flush_delay = flush_delay
+
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()  # 確保依序寫入
+        self._dirty = False
+        self._last_change = 0.0
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
         self.config = self._load_config()
 
+        # 最愛索引：正規化影片 ID -> 分段序號集合，以及依課程種類分組
+        self._favorites: Dict[str, FrozenSet[int]] = {}
+        self._category_favorites: Dict[str, Dict[str, FrozenSet[int]]] = {}
+        self._build_favorites_index()
+        self._base = copy.deepcopy(self.config)  # 上次與磁碟同步時的配置
+
+        if self.write_behind:
+            atexit.register(self.flush)
+
     def _load_config(self) -> Dict:
         """載入配置檔案，若不存在則建立預設配置"""
+        if self.store:
+            config = self.store.export_config()
+            config["preferences"] = dict(self.DEFAULT_CONFIG["preferences"], **config["preferences"])
+            return config
+
         if not self.config_file.exists():
-            self._save_config(self.DEFAULT_CONFIG)
-            return self.DEFAULT_CONFIG.copy()
+            with FileLock(self.lock_file):
+                if not self.config_file.exists():
+                    self._write_text(json.dumps(self.DEFAULT_CONFIG, indent=2, ensure_ascii=False))
+                    return copy.deepcopy(self.DEFAULT_CONFIG)
 
+        config = self._read_config()
+        return config if config is not None else copy.deepcopy(self.DEFAULT_CONFIG)
+
+    def _read_config(self) -> Optional[Dict]:
+        """讀取磁碟上的配置檔案，失敗時回傳 None"""
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except (json.JSONDecodeError, IOError) as e:
-            print(f"配置檔案載入失敗: {e}, 使用預設配置")
-            return self.DEFAULT_CONFIG.copy()
+            print(f"配置檔案載入失敗: {e}")
+            return None
 
-    def _save_config(self, config: Optional[Dict] = None) -> None:
-        """儲存配置檔案"""
-        if config is None:
-            config = self.config
+    def _normalized(self, config: Dict) -> Dict:
+        """將配置中的最愛鍵正規化（合併前使用）"""
+        favorites: Dict[str, set] = {}
+        for video_path, serials in config.get("favorites", {}).items():
+            favorites.setdefault(self.normalize_video_id(video_path), set()).update(serials)
+        return dict(config, favorites={vid: sorted(s) for vid, s in favorites.items() if s})
 
+    def _save_config(self) -> None:
+        """
+        儲存配置檔案
+        在檔案鎖內重新讀取磁碟上的配置，合併本地變更後寫回（先寫入暫存檔再取代）
+        """
+        with self._write_lock, FileLock(self.lock_file):
+            with self._lock:
+                local = copy.deepcopy(self.config)
+                base = self._base
+                self._dirty = False
+
+            disk = self._read_config() if self.config_file.exists() else None
+            if disk is None:
+                disk = base
+            merged = merge_config(base, self._normalized(local), self._normalized(disk))
+            self._write_text(json.dumps(merged, indent=2, ensure_ascii=False))
+
+            with self._lock:
+                # 寫入期間的新變更保留在記憶體中，下次寫入時再合併
+                self.config = merge_config(local, self.config, merged)
+                self._base = merged
+                self._build_favorites_index()
+
+    def _write_text(self, text: str) -> None:
+        """寫入配置檔案內容"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            atomic_write_text(self.config_file, text)
+        except OSError as e:
             print(f"配置檔案儲存失敗: {e}")
 
+    def reload(self) -> None:
+        """重新讀取磁碟上的配置（保留尚未儲存的本地變更）"""
+        if self.store:
+            with self._lock:
+                self.config = self.store.export_config()
+                self._build_favorites_index()
+            return
+
+        with self._write_lock, FileLock(self.lock_file):
+            disk = self._read_config()
+            if disk is None:
+                return
+            disk = self._normalized(disk)
+            with self._lock:
+                self.config = merge_config(self._base, self.config, disk)
+                self._base = disk
+                self._build_favorites_index()
+
+    def _mark_dirty(self) -> None:
+        """配置已變更：立即寫入，或在 write_behind 模式下交由背景執行緒寫入"""
+        if not self.write_behind or self._closed:
+            self._save_config()
+            return
+
+        with self._changed:
+            self._dirty = True
+            self._last_change = time.monotonic()
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+            self._changed.notify()
+
+    def _flush_loop(self) -> None:
+        """背景寫入迴圈：等到一段時間沒有新的變更才寫入"""
+        with self._changed:
+            while not self._closed:
+                if not self._dirty:
+                    self._changed.wait()
+                    continue
+
+                remaining = self._last_change + self.flush_delay - time.monotonic()
+                if remaining > 0:
+                    self._changed.wait(remaining)
+                    continue
+
+                # 寫入時釋放鎖，不阻擋其他變更
+                self._changed.release()
+                try:
+                    self.flush()
+                finally:
+                    self._changed.acquire()
+
+    def flush(self) -> None:
+        """立即寫入尚未儲存的變更"""
+        with self._lock:
+            if not self._dirty:
+                return
+        self._save_config()
+
+    def close(self) -> None:
+        """寫入尚未儲存的變更並停止背景寫入"""
+        with self._changed:
+            self._closed = True
+            self._changed.notify()
+        self.flush()
+        if self.write_behind:
+            atexit.unregister(self.flush)
+
+    def normalize_video_id(self, video_path: Union[str, Path]) -> str:
+        """
+        將影片路徑正規化為最愛索引的鍵
+
+        Args:
+            video_path: 影片路徑（相對於工作目錄或絕對路徑）
+
+        Returns:
+            影片 ID
+        """
+        return normalize_video_id(video_path, self.work_dir)
+
+    @staticmethod
+    def _category_of(video_id: str) -> str:
+        """影片 ID 的課程種類（第一層資料夾）"""
+        return video_id.split('/', 1)[0] if '/' in video_id else ''
+
+    def _build_favorites_index(self) -> None:
+        """由配置檔的最愛資料建立索引，並將配置檔的鍵統一為正規化的影片 ID"""
+        merged: Dict[str, set] = {}
+        for video_path, serials in self.config.get("favorites", {}).items():
+            merged.setdefault(self.normalize_video_id(video_path), set()).update(serials)
+
+        self.config["favorites"] = {vid: sorted(serials) for vid, serials in merged.items() if serials}
+        self._favorites = {}
+        self._category_favorites = {}
+        for vid, serials in self.config["favorites"].items():
+            self._set_favorites(vid, frozenset(serials))
+
+    def _set_favorites(self, video_id: str, serials: FrozenSet[int]) -> None:
+        """更新單一影片的最愛索引"""
+        category = self._category_favorites.setdefault(self._category_of(video_id), {})
+        if serials:
+            self._favorites[video_id] = serials
+            category[video_id] = serials
+        else:
+            self._favorites.pop(video_id, None)
+            category.pop(video_id, None)
+
     def get_favorites(self, video_path: str) -> List[int]:
         """
         取得指定影片的最愛分段
@@ -63,9 +320,34 @@ class ConfigManager:
             video_path: 影片路徑（相對於工作目錄）
 
         Returns:
-            最愛的分段序號列表
+            最愛的分段序號列表（已排序）
+        """
+        return sorted(self.get_favorite_set(video_path))
+
+    def get_favorite_set(self, video_path: Union[str, Path]) -> FrozenSet[int]:
         """
-        return self.config.get("favorites", {}).get(video_path, [])
+        取得指定影片的最愛分段集合
+
+        Args:
+            video_path: 影片路徑
+
+        Returns:
+            最愛的分段序號集合
+        """
+        return self._favorites.get(self.normalize_video_id(video_path), self.NO_FAVORITES)
+
+    def get_category_favorites(self, category: str) -> Dict[str, FrozenSet[int]]:
+        """
+        取得課程種類下所有影片的最愛分段
+
+        Args:
+            category: 課程種類
+
+        Returns:
+            {影片 ID: 最愛的分段序號集合}，只包含有最愛的影片
+        """
+        with self._lock:
+            return dict(self._category_favorites.get(category, {}))
 
     def toggle_favorite(self, video_path: str, track_serial: int) -> bool:
         """
@@ -78,22 +360,24 @@ class ConfigManager:
         Returns:
             切換後的狀態 (True=已加入最愛, False=已移除)
         """
-        if "favorites" not in self.config:
-            self.config["favorites"] = {}
-
-        if video_path not in self.config["favorites"]:
-            self.config["favorites"][video_path] = []
-
-        favorites = self.config["favorites"][video_path]
-
-        if track_serial in favorites:
-            favorites.remove(track_serial)
-            is_favorite = False
+        video_id = self.normalize_video_id(video_path)
+
+        with self._lock:
+            favorites = self._favorites.get(video_id, self.NO_FAVORITES)
+            is_favorite = track_serial not in favorites
+            favorites = favorites | {track_serial} if is_favorite else favorites - {track_serial}
+            self._set_favorites(video_id, favorites)
+
+            # 同步到配置檔資料
+            if favorites:
+                self.config.setdefault("favorites", {})[video_id] = sorted(favorites)
+            else:
+                self.config.setdefault("favorites", {}).pop(video_id, None)
+
+        if self.store:
+            self.store.set_favorite(video_id, track_serial, is_favorite)
         else:
-            favorites.append(track_serial)
-            is_favorite = True
-
-        self._save_config()
+            self._mark_dirty()
         return is_favorite
 
     def is_favorite(self, video_path: str, track_serial: int) -> bool:
@@ -107,7 +391,7 @@ class ConfigManager:
         Returns:
             是否為最愛
         """
-        return track_serial in self.get_favorites(video_path)
+        return track_serial in self.get_favorite_set(video_path)
 
     def update_playlist_stats(self, playlist_name: str, last_played: str = None) -> None:
         """
@@ -117,23 +401,37 @@ class ConfigManager:
             playlist_name: 播放清單名稱
             last_played: 最後播放日期 (YYYY-MM-DD 格式)
         """
-        if "playlists" not in self.config:
-            self.config["playlists"] = {}
+        with self._lock:
+            if "playlists" not in self.config:
+                self.config["playlists"] = {}
 
-        if playlist_name not in self.config["playlists"]:
-            self.config["playlists"][playlist_name] = {
-                "play_count": 0,
-                "last_played": None
-            }
+            if playlist_name not in self.config["playlists"]:
+                self.config["playlists"][playlist_name] = {
+                    "play_count": 0,
+                    "last_played": None
+                }
 
-        # 更新播放次數
-        self.config["playlists"][playlist_name]["play_count"] += 1
+            # 更新播放次數
+            self.config["playlists"][playlist_name]["play_count"] += 1
 
-        # 更新最後播放日期
-        if last_played:
-            self.config["playlists"][playlist_name]["last_played"] = last_played
+            # 更新最後播放日期
+            if last_played:
+                self.config["playlists"][playlist_name]["last_played"] = last_played
 
-        self._save_config()
+        if self.store:
+            self.store.update_playlist_stats(playlist_name, last_played)
+        else:
+            self._mark_dirty()
+
+    def get_playlist_stats(self) -> Dict[str, Dict]:
+        """
+        取得所有播放清單的統計資訊
+
+        Returns:
+            {播放清單名稱: {"play_count": 次數, "last_played": 日期}}
+        """
+        with self._lock:
+            return copy.deepcopy(self.config.get("playlists", {}))
 
     def get_preference(self, key: str, default=None):
         """取得偏好設定"""
@@ -141,8 +439,13 @@ class ConfigManager:
 
     def set_preference(self, key: str, value) -> None:
         """設定偏好設定"""
-        if "preferences" not in self.config:
-            self.config["preferences"] = {}
+        with self._lock:
+            if "preferences" not in self.config:
+                self.config["preferences"] = {}
 
-        self.config["preferences"][key] = value
-        self._save_config()
+            self.config["preferences"][key] = value
+
+        if self.store:
+            self.store.set_preference(key, value)
+        else:
+            self._mark_dirty()
@@ -0,0 +1,383 @@
+"""
+縮圖膠卷模組
+在背景以多個行程擷取影片縮圖，並快取於磁碟
+"""
+
+import io
+import json
+import math
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import cv2
+    from PIL import Image, ImageTk
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+from keyframe_index import KeyframeIndex
+from utils import get_video_cache_path
+
+
+def _extract_thumbnails(video_path: str, jobs: List[Tuple[int, int, float]],
+                        width: int, height: int) -> List[Tuple[int, float, bytes]]:
+    """
+    擷取一批縮圖（在子行程中執行）
+
+    Args:
+        video_path: 影片檔案路徑
+        jobs: [(縮圖序號, 幀號, 時間)]，幀號為 -1 時依時間跳轉
+        width: 縮圖寬度
+        height: 縮圖高度
+
+    Returns:
+        [(縮圖序號, 時間, JPEG 資料)]
+    """
+    cap = cv2.VideoCapture(video_path)
+    results = []
+    try:
+        for index, frame_number, seconds in jobs:
+            # 直接跳到關鍵幀只需解碼一幀，不必往後解碼
+            if frame_number >= 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            else:
+                cap.set(cv2.CAP_PROP_POS_MSEC, seconds * 1000)
+
+            ret, frame = cap.read()
+            if not ret:
+                continue
+
+            thumb = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            ok, encoded = cv2.imencode(".jpg", thumb, [cv2.IMWRITE_JPEG_QUALITY, 80])
+            if ok:
+                results.append((index, seconds, encoded.tobytes()))
+    finally:
+        cap.release()
+    return results
+
+
+class FilmstripGenerator:
+    """
+    縮圖膠卷產生器
+
+    每隔固定秒數取一張縮圖，只解碼該時間點之前最近的關鍵幀；
+    縮圖完成後立即放入 queue 並寫入磁碟快取，
+    再次開啟同一部影片時直接從快取讀取
+    """
+
+    VERSION = 1
+    CACHE_SUFFIX = ".filmstrip"
+    BATCH_SIZE = 8  # 每個子行程工作包含的縮圖數
+
+    def __init__(self, video_path: Path, duration: float, fps: float, interval: float = 10.0,
+                 width: int = 96, height: int = 54, max_workers: Optional[int] = None):
+        """
+        初始化產生器
+
+        Args:
+            video_path: 影片檔案路徑
+            duration: 影片總時長（秒）
+            fps: 影片幀率
+            interval: 縮圖間隔（秒）
+            width: 縮圖寬度
+            height: 縮圖高度
+            max_workers: 子行程數量（None 表示依 CPU 核心數）
+        """
+        self.video_path = video_path
+        self.duration = duration
+        self.fps = fps if fps > 0 else 30
+        self.interval = interval
+        self.width = width
+        self.height = height
+        self.max_workers = max_workers
+        self.cache_dir = get_video_cache_path(video_path, self.CACHE_SUFFIX)
+        self.results: "queue.Queue[Tuple]" = queue.Queue()
+
+        self._cancel_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def count(self) -> int:
+        """縮圖總數"""
+        return max(1, math.ceil(self.duration / self.interval)) if self.duration > 0 else 0
+
+    def start(self) -> None:
+        """在背景執行緒開始產生縮圖，結果依完成順序放入 results"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """取消尚未完成的縮圖工作"""
+        self._cancel_event.set()
+
+    def _signature(self) -> Dict:
+        """快取的有效性簽章"""
+        stat = self.video_path.stat()
+        return {
+            "version": self.VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "interval": self.interval,
+            "width": self.width,
+            "height": self.height
+        }
+
+    def _prepare_cache(self) -> bool:
+        """
+        檢查磁碟快取，影片或參數變更時清除舊縮圖
+
+        Returns:
+            快取是否已完整
+        """
+        manifest_path = self.cache_dir / "manifest.json"
+        signature = self._signature()
+
+        manifest = None
+        if manifest_path.exists():
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                manifest = None
+
+        if manifest and all(manifest.get(k) == v for k, v in signature.items()):
+            return manifest.get("complete", False)
+
+        # 快取失效：清除舊縮圖並寫入新的簽章
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for old in self.cache_dir.glob("*.jpg"):
+            old.unlink()
+        self._write_manifest(signature, complete=False)
+        return False
+
+    def _write_manifest(self, signature: Dict, complete: bool) -> None:
+        """寫入快取描述檔"""
+        data = dict(signature, complete=complete)
+        with open(self.cache_dir / "manifest.json", 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def _thumb_path(self, index: int) -> Path:
+        return self.cache_dir / f"{index:05d}.jpg"
+
+    def _run(self) -> None:
+        """產生縮圖（在背景執行緒中執行）"""
+        try:
+            complete = self._prepare_cache()
+        except OSError as e:
+            print(f"縮圖快取無法使用: {e}")
+            self.results.put(("done",))
+            return
+
+        # 先送出已快取的縮圖
+        pending: List[Tuple[int, int, float]] = []
+        index = KeyframeIndex.load_or_build(self.video_path)
+
+        for i in range(self.count):
+            seconds = i * self.interval
+            thumb_path = self._thumb_path(i)
+            if thumb_path.exists():
+                self.results.put(("thumb", i, seconds, thumb_path.read_bytes()))
+                continue
+
+            if index is not None:
+                # 每個時間點取之前最近的關鍵幀
+                frame_number = index.keyframe_at_or_before(int(seconds * self.fps))
+                pending.append((i, frame_number, seconds))
+            else:
+                pending.append((i, -1, seconds))
+
+        extracted = True
+        if pending and not complete:
+            extracted = self._extract(pending)
+
+        if not self._cancel_event.is_set():
+            try:
+                # 有縮圖擷取或儲存失敗時不標記為完整，下次開啟再補產生
+                self._write_manifest(self._signature(), complete=extracted)
+            except OSError as e:
+                print(f"縮圖快取儲存失敗: {e}")
+        self.results.put(("done",))
+
+    def _extract(self, pending: List[Tuple[int, int, float]]) -> bool:
+        """
+        以行程池擷取縮圖，完成一批就送出一批
+
+        Returns:
+            所有批次是否都已擷取並寫入快取
+        """
+        succeeded = True
+        batches = [pending[i:i + self.BATCH_SIZE] for i in range(0, len(pending), self.BATCH_SIZE)]
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(_extract_thumbnails, str(self.video_path), batch,
+                                self.width, self.height)
+                for batch in batches
+            ]
+
+            for future in as_completed(futures):
+                if self._cancel_event.is_set():
+                    for f in futures:
+                        f.cancel()
+                    return False
+
+                try:
+                    thumbs = future.result()
+                except Exception as e:
+                    print(f"縮圖擷取失敗: {e}")
+                    succeeded = False
+                    continue
+
+                for i, seconds, data in thumbs:
+                    try:
+                        self._thumb_path(i).write_bytes(data)
+                    except OSError:
+                        succeeded = False
+                    self.results.put(("thumb", i, seconds, data))
+        return succeeded
+
+
+class FilmstripView(ttk.Frame):
+    """縮圖膠卷元件，點擊縮圖可跳轉到該時間"""
+
+    POLL_INTERVAL_MS = 100
+
+    def __init__(self, parent, thumb_width: int = 96, thumb_height: int = 54,
+                 on_seek: Optional[Callable[[float], None]] = None):
+        """
+        初始化縮圖膠卷元件
+
+        Args:
+            parent: 父元件
+            thumb_width: 縮圖寬度
+            thumb_height: 縮圖高度
+            on_seek: 點擊縮圖時的回呼函式（參數為秒數）
+        """
+        super().__init__(parent)
+
+        self.thumb_width = thumb_width
+        self.thumb_height = thumb_height
+        self.on_seek = on_seek
+        self.generator: Optional[FilmstripGenerator] = None
+        self._photos: Dict[int, object] = {}  # 保持 PhotoImage 引用
+        self._times: Dict[int, float] = {}
+        self._poll_job = None
+        self._marker = None
+        self._duration = 0.0
+
+        self.canvas = tk.Canvas(self, height=thumb_height + 6, bg='black', highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=scrollbar.set)
+        self.canvas.pack(fill=tk.X)
+        scrollbar.pack(fill=tk.X)
+
+        self.canvas.bind('<Button-1>', self._on_click)
+
+    def load(self, video_path: Path, duration: float, fps: float, interval: float = 10.0) -> None:
+        """
+        開始載入影片縮圖
+
+        Args:
+            video_path: 影片檔案路徑
+            duration: 影片總時長（秒）
+            fps: 影片幀率
+            interval: 縮圖間隔（秒）
+        """
+        if not CV2_AVAILABLE:
+            return
+
+        self.stop()
+        self.canvas.delete('all')
+        self._photos.clear()
+        self._times.clear()
+        self._marker = None
+        self._duration = duration
+
+        self.generator = FilmstripGenerator(
+            video_path, duration, fps, interval, self.thumb_width, self.thumb_height
+        )
+        total_width = self.generator.count * (self.thumb_width + 2)
+        self.canvas.configure(scrollregion=(0, 0, total_width, self.thumb_height + 6))
+        self.generator.start()
+        self._poll()
+
+    def stop(self) -> None:
+        """停止產生縮圖"""
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self.generator:
+            self.generator.cancel()
+            self.generator = None
+
+    def set_position(self, seconds: float) -> None:
+        """
+        更新目前播放位置的標記
+
+        Args:
+            seconds: 時間（秒）
+        """
+        if not self.generator or self.generator.interval <= 0:
+            return
+
+        x = seconds / self.generator.interval * (self.thumb_width + 2)
+        if self._marker is None:
+            self._marker = self.canvas.create_line(x, 0, x, self.thumb_height + 6, fill='red', width=2)
+        else:
+            self.canvas.coords(self._marker, x, 0, x, self.thumb_height + 6)
+        self.canvas.tag_raise(self._marker)
+
+    def _poll(self) -> None:
+        """從產生器的 queue 取出已完成的縮圖並顯示"""
+        self._poll_job = None
+        generator = self.generator
+        if not generator:
+            return
+
+        try:
+            while True:
+                message = generator.results.get_nowait()
+                if message[0] == "done":
+                    return
+                _, index, seconds, data = message
+                self._add_thumbnail(index, seconds, data)
+        except queue.Empty:
+            pass
+
+        self._poll_job = self.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _add_thumbnail(self, index: int, seconds: float, data: bytes) -> None:
+        """顯示一張縮圖"""
+        try:
+            image = Image.open(io.BytesIO(data))
+            photo = ImageTk.PhotoImage(image)
+        except Exception:
+            return
+
+        x = index * (self.thumb_width + 2)
+        self.canvas.create_image(x, 3, anchor=tk.NW, image=photo)
+        self._photos[index] = photo
+        self._times[index] = seconds
+        if self._marker is not None:
+            self.canvas.tag_raise(self._marker)
+
+    def _on_click(self, event) -> None:
+        """點擊縮圖跳轉"""
+        if not self.on_seek or not self.generator:
+            return
+
+        x = self.canvas.canvasx(event.x)
+        index = int(x // (self.thumb_width + 2))
+        seconds = self._times.get(index, index * self.generator.interval)
+        self.on_seek(min(seconds, self._duration))
+
+    def destroy(self):
+        """銷毀元件"""
+        self.stop()
+        super().destroy()
@@ -0,0 +1,99 @@
+"""
+影片幀快取模組
+以 LRU 策略快取已解碼、已縮放的顯示用影像
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class FrameCache:
+    """
+    已解碼影像的 LRU 快取
+
+    以 (影片路徑, 幀號) 為鍵，依影像佔用的位元組數控制總容量，
+    超過上限時淘汰最久未使用的影像
+    """
+
+    DEFAULT_MAX_BYTES = 128 * 1024 * 1024  # 128 MB
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        初始化快取
+
+        Args:
+            max_bytes: 快取容量上限（位元組），0 表示停用快取
+        """
+        self.max_bytes = max(0, max_bytes)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get(self, key: Hashable):
+        """
+        取得快取的影像
+
+        Args:
+            key: (影片路徑, 幀號)
+
+        Returns:
+            影像 (唯讀 numpy 陣列)，不存在時回傳 None
+        """
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key: Hashable, frame) -> None:
+        """
+        加入影像到快取
+
+        Args:
+            key: (影片路徑, 幀號)
+            frame: 影像 (numpy 陣列)，加入後會被設為唯讀
+        """
+        size = frame.nbytes
+        if size > self.max_bytes:
+            return
+
+        # 快取中的影像可能被多次顯示，避免被意外修改
+        frame.setflags(write=False)
+
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+
+            self._frames[key] = frame
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    def invalidate(self, video_path: Optional[str] = None) -> None:
+        """
+        清除快取
+
+        Args:
+            video_path: 只清除此影片的影像，None 表示全部清除
+        """
+        with self._lock:
+            if video_path is None:
+                self._frames.clear()
+                self.current_bytes = 0
+                return
+
+            for key in [k for k in self._frames if k[0] == video_path]:
+                self.current_bytes -= self._frames.pop(key).nbytes
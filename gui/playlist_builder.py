@@ -6,19 +6,73 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from pathlib import Path
+import queue
 import subprocess
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
+from category_loader import CategoryLoader
 from config_manager import ConfigManager
-from track_manager import Track, TrackManager
+from track_manager import Track
+from track_catalog import TrackCatalog
+from track_search import TrackSearchIndex, tokenize
 from xspf_generator import XSPFGenerator, PlaylistItem
-from utils import get_workout_categories, get_video_files, get_relative_path, seconds_to_time_str
+from xspf_reader import diff_playlists
+from playlist_library import PlaylistLibrary
+from workspace_watcher import WorkspaceChange, WorkspaceWatcher
+from utils import get_relative_path, seconds_to_time_str
+
+
+class VideoRow:
+    """分段列表中的影片節點"""
+
+    def __init__(self, item_id: str, video_path: Path):
+        """
+        初始化影片節點資料
+
+        Args:
+            item_id: Treeview 節點 ID
+            video_path: 影片檔案路徑
+        """
+        self.item_id = item_id
+        self.video_path = video_path
+        self.track_rows = []  # TrackRow 列表（依序號排序）
+        self.populated = True  # 分段節點是否已建立（延遲載入時展開才建立）
+        self.favorite_count = 0
+        self.visible = True
+
+
+class TrackRow:
+    """分段列表中的分段節點"""
+
+    def __init__(self, item_id: str, video_row: VideoRow, video_path: Path, track: Track,
+                 is_favorite: bool):
+        """
+        初始化分段節點資料
+
+        Args:
+            item_id: Treeview 節點 ID
+            video_row: 所屬的影片節點
+            video_path: 影片檔案路徑
+            track: 分段
+            is_favorite: 是否為最愛
+        """
+        self.item_id = item_id
+        self.video_row = video_row
+        self.key = (video_path, track.serial)  # 搜尋索引的鍵
+        self.track = track
+        self.is_favorite = is_favorite
+        self.visible = True
 
 
 class PlaylistBuilderWindow:
     """播放清單建立器視窗"""
 
+    FILTER_DEBOUNCE_MS = 150  # 篩選文字輸入的延遲時間
+    LAZY_TREE_THRESHOLD = 50  # 影片數超過此值時，展開影片才建立分段節點
+    LOAD_POLL_INTERVAL_MS = 30  # 取出背景載入結果的間隔
+    LOAD_BATCH_SIZE = 100  # 每次最多建立的影片節點數
+
     def __init__(self, window, work_dir: Path):
         """
         初始化播放清單建立器視窗
@@ -29,11 +83,34 @@ class PlaylistBuilderWindow:
         """
         self.window = window
         self.work_dir = work_dir
-        self.config_manager = ConfigManager(str(work_dir))
-        self.xspf_generator = XSPFGenerator(str(work_dir))
+        # 連續標記最愛時合併成一次寫入
+        self.config_manager = ConfigManager(str(work_dir), write_behind=True)
+        self.xspf_generator = XSPFGenerator(
+            str(work_dir),
+            relative_locations=bool(self.config_manager.get_preference("relative_playlist_locations", False))
+        )
+        self.catalog = TrackCatalog.for_workspace(work_dir)
+        self.search_index = TrackSearchIndex()
+        self.playlist_library = PlaylistLibrary.for_workspace(work_dir)
 
         self.selected_category = None
         self.playlist_items = []  # 已選擇的播放清單項目
+        self._video_rows = []  # 分段列表中的影片節點資料 (VideoRow)
+        self._video_rows_by_item = {}  # 影片節點 ID -> VideoRow
+        self._lazy_tree = False  # 目前的列表是否延遲建立分段節點
+        self._track_rows = {}  # 分段節點 ID -> TrackRow
+        self._filter_job = None  # 延遲篩選的 after() ID
+        self._loader = None  # 背景載入中的 CategoryLoader
+        self._load_job = None  # 取出載入結果的 after() ID
+        self._load_total = 0  # 載入中的影片總數
+        self._load_favorites = {}  # 載入中各課程種類的最愛索引
+        self._pending_changes = []  # 載入期間收到的工作目錄變更
+
+        # 監看工作目錄，描述檔或影片變更時只更新受影響的影片節點
+        self.watcher = None
+        if self.config_manager.get_preference("watch_workspace", True):
+            self.watcher = WorkspaceWatcher.for_workspace(work_dir)
+            self.watcher.add_listener(self._on_workspace_changed_threadsafe)
 
         # 設定視窗
         self.window.title("建立課程播放清單")
@@ -61,7 +138,7 @@ class PlaylistBuilderWindow:
         category_frame.pack(fill=tk.X, pady=5)
 
         # 取得所有課程種類
-        categories = get_workout_categories(self.work_dir)
+        categories = self.catalog.get_categories()
 
         if not categories:
             ttk.Label(
@@ -106,7 +183,7 @@ class PlaylistBuilderWindow:
         # 文字篩選
         ttk.Label(filter_frame, text="篩選:", font=('Arial', 13)).pack(side=tk.LEFT, padx=(15, 5))
         self.filter_text = tk.StringVar()
-        self.filter_text.trace_add('write', lambda *args: self._on_filter_changed())
+        self.filter_text.trace_add('write', lambda *args: self._on_filter_text_changed())
         filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_text, width=20)
         filter_entry.pack(side=tk.LEFT)
 
@@ -116,6 +193,14 @@ class PlaylistBuilderWindow:
             command=lambda: self.filter_text.set('')
         ).pack(side=tk.LEFT, padx=(5, 0))
 
+        self.search_all_categories = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            filter_frame,
+            text="所有種類",
+            variable=self.search_all_categories,
+            command=self._on_search_scope_changed
+        ).pack(side=tk.LEFT, padx=(10, 0))
+
         # 課程分段列表（使用 Treeview）
         self.video_tree = ttk.Treeview(left_frame, show='tree', height=20)
         video_scrollbar = ttk.Scrollbar(left_frame, orient=tk.VERTICAL, command=self.video_tree.yview)
@@ -123,9 +208,19 @@ class PlaylistBuilderWindow:
         self.video_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         video_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
+        # 載入進度（只在背景載入時顯示於列表上方）
+        self.load_frame = ttk.Frame(left_frame)
+        self.load_progress = ttk.Progressbar(self.load_frame, mode='determinate')
+        self.load_progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.load_label = ttk.Label(self.load_frame, text="", foreground='gray')
+        self.load_label.pack(side=tk.LEFT, padx=(5, 0))
+
         # 綁定雙擊事件
         self.video_tree.bind('<Double-Button-1>', self._on_track_double_click)
 
+        # 展開影片時才建立分段節點（延遲載入）
+        self.video_tree.bind('<<TreeviewOpen>>', self._on_video_open)
+
         # 綁定右鍵點擊事件（支援 macOS 和其他平台）
         self.video_tree.bind('<Button-2>', self._on_track_right_click)  # macOS 右鍵
         self.video_tree.bind('<Button-3>', self._on_track_right_click)  # Windows/Linux 右鍵
@@ -161,6 +256,12 @@ class PlaylistBuilderWindow:
             command=self._clear_playlist
         ).pack(side=tk.LEFT, padx=(5, 0))
 
+        ttk.Button(
+            header_frame,
+            text="已存播放清單...",
+            command=self._open_saved_playlists
+        ).pack(side=tk.LEFT, padx=(5, 0))
+
         self.duration_label = ttk.Label(header_frame, text="總時長: 00:00:00", font=('Arial', 15, 'bold'))
         self.duration_label.pack(side=tk.RIGHT)
 
@@ -199,85 +300,432 @@ class PlaylistBuilderWindow:
             style='Builder.TButton'
         ).pack(side=tk.RIGHT, padx=5)
 
+        # 相對路徑的播放清單可以和影片一起搬移到其他電腦
+        self.relative_locations = tk.BooleanVar(
+            value=bool(self.config_manager.get_preference("relative_playlist_locations", False))
+        )
+        ttk.Checkbutton(
+            export_frame,
+            text="使用相對路徑",
+            variable=self.relative_locations,
+            command=self._on_relative_locations_changed
+        ).pack(side=tk.RIGHT, padx=5)
+
     def _on_category_selected(self):
         """當選擇課程種類時"""
         self.selected_category = self.category_var.get()
-        self._load_videos()
+        # 影片可能已搬移或更換，重新解析影片路徑
+        self.xspf_generator.resolver.invalidate()
+        self._start_loading()
+
+    def _on_relative_locations_changed(self):
+        """切換播放清單是否使用相對路徑"""
+        self.xspf_generator.relative_locations = self.relative_locations.get()
+        self.config_manager.set_preference("relative_playlist_locations", self.relative_locations.get())
+
+    def _on_search_scope_changed(self):
+        """切換是否列出所有課程種類"""
+        self._start_loading()
 
     def _on_filter_changed(self):
-        """當篩選條件改變時"""
-        self._load_videos()
+        """當「只顯示最愛」改變時，立即重新篩選"""
+        self._apply_filter()
+
+    def _on_filter_text_changed(self):
+        """當篩選文字改變時，延遲篩選（連續輸入只篩選一次）"""
+        if self._filter_job is not None:
+            self.window.after_cancel(self._filter_job)
+        self._filter_job = self.window.after(self.FILTER_DEBOUNCE_MS, self._apply_filter)
+
+    def _start_loading(self):
+        """
+        在背景重新掃描目前列出的課程種類（只重新解析有變動的描述檔），
+        已載入的影片分批加入列表；取消尚未完成的上一次載入
+        """
+        self._cancel_loading()
+        self._clear_tree()
+
+        categories = self._displayed_categories()
+        if not categories:
+            return
+
+        self._loader = CategoryLoader(self.catalog, categories)
+        self._load_total = 0
+        self._load_favorites = {}
+        self.load_progress.configure(value=0, maximum=1)
+        self.load_label.config(text="載入中...")
+        self.load_frame.pack(fill=tk.X, pady=(0, 5), before=self.video_tree)
+
+        self._loader.start()
+        self._load_job = self.window.after(self.LOAD_POLL_INTERVAL_MS, self._poll_loader)
+
+    def _cancel_loading(self):
+        """取消背景載入（切換課程種類或關閉視窗時）"""
+        if self._load_job is not None:
+            self.window.after_cancel(self._load_job)
+            self._load_job = None
+        if self._loader is not None:
+            self._loader.cancel()
+            self._loader = None
+            self.load_frame.pack_forget()
+        # 新的載入會重新掃描，不需要再套用載入期間的變更
+        self._pending_changes = []
+
+    def _poll_loader(self):
+        """從載入器取出已載入的影片，每次最多建立 LOAD_BATCH_SIZE 個影片節點"""
+        self._load_job = None
+        loader = self._loader
+        if loader is None:
+            return
+
+        done = False
+        video_rows = []
+        try:
+            while len(video_rows) < self.LOAD_BATCH_SIZE:
+                message = loader.results.get_nowait()
+                if message[0] == "total":
+                    self._load_total = message[1]
+                    self._lazy_tree = self._load_total > self.LAZY_TREE_THRESHOLD
+                    self.load_progress.configure(maximum=max(1, self._load_total))
+                elif message[0] == "video":
+                    _, category, video_path = message
+                    video_rows.append(self._create_video_row(
+                        category, video_path, self._category_favorite_count(category, video_path)))
+                else:
+                    done = True
+                    break
+        except queue.Empty:
+            pass
+
+        if video_rows:
+            self._video_rows.extend(video_rows)
+            # 搜尋索引只索引新解析的描述檔
+            self.search_index.sync(self.catalog)
+            self._apply_filter()
+            self.load_progress.configure(value=len(self._video_rows))
+            self.load_label.config(text=f"載入中 {len(self._video_rows)}/{self._load_total}")
+
+        if done:
+            self._finish_loading()
+        else:
+            self._load_job = self.window.after(self.LOAD_POLL_INTERVAL_MS, self._poll_loader)
+
+    def _finish_loading(self):
+        """背景載入完成，套用載入期間收到的工作目錄變更"""
+        self._loader = None
+        self.load_frame.pack_forget()
+        changes, self._pending_changes = self._pending_changes, []
+        if changes:
+            self._on_workspace_changed(changes)
+
+    def _category_favorite_count(self, category: str, video_path: Path) -> int:
+        """載入中影片的最愛分段數（每個課程種類只取得一次最愛索引）"""
+        favorites = self._load_favorites.get(category)
+        if favorites is None:
+            favorites = self._load_favorites[category] = self.config_manager.get_category_favorites(category)
+        video_id = self.config_manager.normalize_video_id(video_path)
+        return len(favorites.get(video_id, ConfigManager.NO_FAVORITES))
+
+    def _clear_tree(self):
+        """清空列表（被隱藏的節點不在樹狀結構中，需要另外刪除）"""
+        hidden = [row.item_id for row in self._iter_rows() if not row.visible]
+        self.video_tree.delete(*self.video_tree.get_children(), *hidden)
+        self._video_rows = []
+        self._video_rows_by_item = {}
+        self._track_rows = {}
 
     def _load_videos(self):
-        """載入選中課程種類的所有影片"""
-        # 清空列表
-        for item in self.video_tree.get_children():
-            self.video_tree.delete(item)
+        """
+        以分段目錄中的資料重建列表（分段目錄已是最新時使用，不重新掃描）
 
-        if not self.selected_category:
+        影片數超過 LAZY_TREE_THRESHOLD 時只建立影片節點（加上「載入中...」預留子節點），
+        展開影片時才建立分段節點，開啟課程種類的時間與影片的分段數無關
+        """
+        self._clear_tree()
+
+        categories = self._displayed_categories()
+        if not categories:
             return
 
-        category_dir = self.work_dir / self.selected_category
-        videos = get_video_files(category_dir)
+        # 搜尋索引只重新索引有變動的描述檔
+        self.search_index.sync(self.catalog)
 
-        for video_path in videos:
-            # 建立影片節點
-            video_name = video_path.stem
-            video_node = self.video_tree.insert('', tk.END, text=video_name, tags=('video',))
+        # 一次取得各種類的最愛索引，不必逐一查詢每部影片
+        favorites = {category: self.config_manager.get_category_favorites(category)
+                     for category in categories}
 
-            # 載入分段描述檔
-            track_manager = TrackManager(str(video_path))
+        videos = self._displayed_videos(categories)
+        self._lazy_tree = len(videos) > self.LAZY_TREE_THRESHOLD
 
-            if not track_manager.has_description_file():
-                # 沒有描述檔
-                self.video_tree.insert(video_node, tk.END, text="(沒有描述檔)", tags=('no_desc',))
-                self.video_tree.item(video_node, tags=('video', 'no_desc'))
-            else:
-                # 有描述檔，展開所有分段
-                tracks = track_manager.get_all_tracks()
-                video_rel_path = get_relative_path(video_path, self.work_dir)
-
-                # 篩選 tracks（如果啟用了只顯示最愛或有文字篩選）
-                show_favorites_only = self.show_favorites_only.get()
-                filter_keyword = self.filter_text.get().strip().lower()
-                has_visible_tracks = False
-
-                for track in tracks:
-                    # 檢查是否為最愛
-                    is_fav = self.config_manager.is_favorite(video_rel_path, track.serial)
-
-                    # 如果啟用「只顯示最愛」且此 track 不是最愛，則跳過
-                    if show_favorites_only and not is_fav:
-                        continue
-
-                    # 文字篩選：檢查 track.name 或 track.training 是否包含關鍵字
-                    if filter_keyword:
-                        track_name = (track.name or '').lower()
-                        track_training = (track.training or '').lower()
-                        if filter_keyword not in track_name and filter_keyword not in track_training:
-                            continue
-
-                    has_visible_tracks = True
-                    fav_icon = "★" if is_fav else "☆"
-
-                    track_text = f"{fav_icon} Track {track.serial}: {track.name or '(無名稱)'}"
-                    if track.training:
-                        track_text += f" [{track.training}]"
-
-                    track_node = self.video_tree.insert(
-                        video_node,
-                        tk.END,
-                        text=track_text,
-                        tags=('track',),
-                        values=(str(video_path), track.serial)
-                    )
+        for category, video_path in videos:
+            video_id = self.config_manager.normalize_video_id(video_path)
+            favorite_count = len(favorites[category].get(video_id, ConfigManager.NO_FAVORITES))
+            self._video_rows.append(self._create_video_row(category, video_path, favorite_count))
 
-                # 如果沒有可見的 tracks，則不顯示這個影片節點
-                if not has_visible_tracks:
-                    self.video_tree.delete(video_node)
+        self._apply_filter()
+
+    def _displayed_categories(self):
+        """目前列出的課程種類"""
+        if self.search_all_categories.get():
+            return self.catalog.get_categories()
+        return [self.selected_category] if self.selected_category else []
+
+    def _displayed_videos(self, categories):
+        """依顯示順序列出 (課程種類, 影片路徑)"""
+        return [(category, video_path)
+                for category in categories
+                for video_path in self.catalog.get_videos(category)]
+
+    def _create_video_row(self, category: str, video_path: Path, favorite_count: int,
+                          detached: bool = False) -> VideoRow:
+        """
+        建立影片節點
+
+        Args:
+            category: 課程種類
+            video_path: 影片檔案路徑
+            favorite_count: 最愛分段數
+            detached: 是否先不顯示（由 _apply_filter() 放到正確位置）
+
+        Returns:
+            影片節點資料
+        """
+        # 列出所有種類時加上種類名稱
+        video_name = f"{category} / {video_path.stem}" if self.search_all_categories.get() else video_path.stem
+        video_node = self.video_tree.insert('', tk.END, text=video_name, tags=('video',),
+                                            open=not self._lazy_tree)
+        video_row = VideoRow(video_node, video_path)
+        video_row.favorite_count = favorite_count
+        self._video_rows_by_item[video_node] = video_row
+        if detached:
+            self.video_tree.detach(video_node)
+            video_row.visible = False
+
+        self._fill_video(video_row, detached)
+        return video_row
+
+    def _fill_video(self, video_row: VideoRow, detached: bool = False):
+        """建立影片節點的子節點（延遲載入時只加上預留子節點）"""
+        entry = self.catalog.get_entry(video_row.video_path)
+
+        if not entry or not entry.has_description_file:
+            # 沒有描述檔
+            self.video_tree.insert(video_row.item_id, tk.END, text="(沒有描述檔)", tags=('no_desc',))
+            self.video_tree.item(video_row.item_id, tags=('video', 'no_desc'))
+            video_row.populated = True
+            return
+
+        self.video_tree.item(video_row.item_id, tags=('video',))
+        if self._lazy_tree:
+            self.video_tree.insert(video_row.item_id, tk.END, text="載入中...", tags=('placeholder',))
+            video_row.populated = False
+        else:
+            self._populate_video(video_row, detached)
+
+    def _populate_video(self, video_row: VideoRow, detached: bool = False):
+        """
+        建立影片節點下的分段節點（資料來自記憶體中的分段目錄）
+
+        Args:
+            video_row: 影片節點
+            detached: 分段節點是否先不顯示（由 _apply_filter() 依序放回正確位置）
+        """
+        # 移除預留子節點
+        self.video_tree.delete(*self.video_tree.get_children(video_row.item_id))
+        video_row.populated = True
+
+        video_path = video_row.video_path
+        entry = self.catalog.get_entry(video_path)
+        if not entry:
+            return
+
+        # 有描述檔，建立所有分段節點，顯示與否由篩選決定
+        favorite_serials = self.config_manager.get_favorite_set(video_path)
+        video_row.favorite_count = len(favorite_serials)
+
+        for track in entry.tracks:
+            is_fav = track.serial in favorite_serials
+            track_node = self.video_tree.insert(
+                video_row.item_id,
+                tk.END,
+                text=self._track_text(track, is_fav),
+                tags=('track',),
+                values=(str(video_path), track.serial)
+            )
+            row = TrackRow(track_node, video_row, video_path, track, is_fav)
+            if detached:
+                self.video_tree.detach(track_node)
+                row.visible = False
+            video_row.track_rows.append(row)
+            self._track_rows[track_node] = row
+
+    def _on_video_open(self, event):
+        """展開影片節點時才建立分段節點"""
+        video_row = self._video_rows_by_item.get(self.video_tree.focus())
+        if video_row is not None and not video_row.populated:
+            self._populate_video(video_row)
+            self._apply_filter()
+
+    def _on_workspace_changed_threadsafe(self, changes):
+        """監看器的回呼函式（在背景執行緒中被呼叫），透過 after() 交回主執行緒處理"""
+        self.window.after(0, self._on_workspace_changed, changes)
+
+    def _on_workspace_changed(self, changes):
+        """
+        分段目錄已由監看器更新，只更新受影響的影片節點
+
+        Args:
+            changes: WorkspaceChange 列表
+        """
+        if not self.window.winfo_exists():
+            return
+
+        if self._loader is not None:
+            # 載入中的列表尚不完整，載入完成後再套用
+            self._pending_changes.extend(changes)
+            return
+
+        for change in changes:
+            if change.video_path is not None:
+                # 影片可能已搬移或更換，重新解析影片路徑
+                self.xspf_generator.resolver.invalidate(get_relative_path(change.video_path, self.work_dir))
+
+        categories = self._displayed_categories()
+        if any(change.kind == WorkspaceChange.CATEGORIES for change in changes):
+            self._load_videos()
+            return
+
+        changed = {change.video_path for change in changes if change.category in categories}
+        if not changed:
+            return
+
+        self.search_index.sync(self.catalog)
+        rows = {row.video_path: row for row in self._video_rows}
+
+        # 依分段目錄的順序重建影片節點列表，新增的影片先不顯示，由 _apply_filter() 放到正確位置
+        video_rows = []
+        for category, video_path in self._displayed_videos(categories):
+            row = rows.pop(video_path, None)
+            if row is None:
+                row = self._create_video_row(category, video_path,
+                                             len(self.config_manager.get_favorite_set(video_path)),
+                                             detached=True)
+            elif video_path in changed:
+                populated = row.populated
+                self._clear_video(row)
+                row.favorite_count = len(self.config_manager.get_favorite_set(video_path))
+                entry = self.catalog.get_entry(video_path)
+                if populated and self._lazy_tree and entry and entry.has_description_file:
+                    # 已展開的影片直接重建分段節點（描述檔已移除時由 _fill_video() 標示）
+                    self._populate_video(row, detached=True)
                 else:
-                    # 展開影片節點
-                    self.video_tree.item(video_node, open=True)
+                    self._fill_video(row, detached=True)
+            video_rows.append(row)
+
+        # 已移除的影片
+        for row in rows.values():
+            self._clear_video(row)
+            self.video_tree.delete(row.item_id)
+            self._video_rows_by_item.pop(row.item_id, None)
+
+        self._video_rows = video_rows
+        self._apply_filter()
+
+    def _clear_video(self, video_row: VideoRow):
+        """刪除影片節點下的所有子節點"""
+        hidden = [row.item_id for row in video_row.track_rows if not row.visible]
+        self.video_tree.delete(*self.video_tree.get_children(video_row.item_id), *hidden)
+        for row in video_row.track_rows:
+            self._track_rows.pop(row.item_id, None)
+        video_row.track_rows = []
+        video_row.favorite_count = 0
+
+    def _iter_rows(self):
+        """列出所有影片與分段節點的資料"""
+        for video_row in self._video_rows:
+            yield video_row
+            yield from video_row.track_rows
+
+    @staticmethod
+    def _track_text(track: Track, is_fav: bool) -> str:
+        """分段節點的顯示文字"""
+        fav_icon = "★" if is_fav else "☆"
+        track_text = f"{fav_icon} Track {track.serial}: {track.name or '(無名稱)'}"
+        if track.training:
+            track_text += f" [{track.training}]"
+        return track_text
+
+    def _apply_filter(self):
+        """
+        依篩選條件隱藏或顯示既有的節點
+        只對可見狀態改變的節點呼叫 detach/move，不重建樹狀結構。
+        尚未展開的影片以最愛數與搜尋結果判斷；有符合關鍵字的分段時才建立分段節點並展開
+        """
+        self._filter_job = None
+        show_favorites_only = self.show_favorites_only.get()
+        filter_keyword = self.filter_text.get().strip()
+
+        matches = self._search(filter_keyword) if filter_keyword else None
+        matched_videos = {video_path for video_path, _serial in matches} if matches is not None else None
+
+        video_index = 0
+        for video_row in self._video_rows:
+            if not video_row.populated:
+                if matched_videos is not None and video_row.video_path in matched_videos:
+                    self._populate_video(video_row)
+                    self.video_tree.item(video_row.item_id, open=True)
+
+            if not video_row.populated:
+                # 未展開：沒有符合關鍵字的分段，或沒有篩選文字
+                video_visible = matched_videos is None and (not show_favorites_only or video_row.favorite_count > 0)
+            elif show_favorites_only and video_row.track_rows and not video_row.favorite_count:
+                # 沒有最愛的影片直接隱藏，不必檢查其分段
+                video_visible = False
+            elif video_row.track_rows:
+                track_index = 0
+                for row in video_row.track_rows:
+                    # 「只顯示最愛」與文字篩選（比對 track.name 或 track.training）
+                    visible = ((not show_favorites_only or row.is_favorite)
+                               and (matches is None or row.key in matches))
+                    self._set_row_visible(row, visible, video_row.item_id, track_index)
+                    if visible:
+                        track_index += 1
+
+                # 如果沒有可見的 tracks，則不顯示這個影片節點
+                video_visible = track_index > 0
+            else:
+                video_visible = True
+
+            self._set_row_visible(video_row, video_visible, '', video_index)
+            if video_visible:
+                video_index += 1
+
+    def _search(self, keyword: str):
+        """
+        取得符合關鍵字的分段
+
+        以搜尋索引查詢，不逐一比對；關鍵字只有符號（如 "-"、"&"）切不出字詞時，
+        改為逐一比對名稱與訓練名稱是否包含關鍵字
+        """
+        if tokenize(keyword):
+            return self.search_index.search(keyword)
+
+        keyword = keyword.lower()
+        return {(entry.video_path, track.serial)
+                for entry in self.catalog.get_entries()
+                for track in entry.tracks
+                if keyword in (track.name or '').lower() or keyword in (track.training or '').lower()}
+
+    def _set_row_visible(self, row, visible: bool, parent: str, index: int):
+        """變更節點的可見狀態"""
+        if visible == row.visible:
+            return
+
+        if visible:
+            self.video_tree.move(row.item_id, parent, index)
+        else:
+            self.video_tree.detach(row.item_id)
+        row.visible = visible
 
     def _on_track_double_click(self, event):
         """當雙擊分段時，加入到播放清單"""
@@ -302,9 +750,8 @@ class PlaylistBuilderWindow:
         video_path = Path(video_path_str)
         track_serial = int(track_serial)
 
-        # 載入 track 資訊
-        track_manager = TrackManager(video_path_str)
-        track = track_manager.get_track(track_serial)
+        # 從分段目錄取得 track 資訊
+        track = self.catalog.get_track(video_path, track_serial)
 
         if not track:
             return
@@ -374,6 +821,39 @@ class PlaylistBuilderWindow:
             self.playlist_items.clear()
             self._refresh_playlist()
 
+    def _open_saved_playlists(self):
+        """開啟已存播放清單對話框"""
+        self.playlist_library.refresh(self.config_manager.get_playlist_stats())
+        dialog = tk.Toplevel(self.window)
+        SavedPlaylistsDialog(dialog, self)
+
+    def load_saved_playlist(self, items) -> bool:
+        """
+        以已存播放清單取代目前的播放清單
+
+        Args:
+            items: PlaylistItem 列表
+
+        Returns:
+            是否已取代（使用者取消時為 False）
+        """
+        if self.playlist_items and not messagebox.askyesno(
+                "確認", "目前的播放清單將被取代，確定要繼續嗎？", parent=self.window):
+            return False
+
+        self.playlist_items = [self._reconcile_item(item) for item in items]
+        self._refresh_playlist()
+        return True
+
+    def _reconcile_item(self, item: PlaylistItem) -> PlaylistItem:
+        """以分段目錄中時間相同的分段還原名稱與訓練（XSPF 標題無法完整區分兩者）"""
+        track = self.catalog.get_track(self.work_dir / item.video_path, item.track_serial)
+        if (track is None or round(track.start, 2) != round(item.start_time, 2)
+                or round(track.end, 2) != round(item.end_time, 2)):
+            return item
+        return PlaylistItem(item.video_path, track.serial, track.name,
+                            item.start_time, item.end_time, track.training)
+
     def _export_playlist(self):
         """匯出播放清單"""
         if not self.playlist_items:
@@ -456,9 +936,8 @@ class PlaylistBuilderWindow:
         video_path = Path(video_path_str)
         track_serial = int(track_serial)
 
-        # 載入 track 資訊
-        track_manager = TrackManager(video_path_str)
-        track = track_manager.get_track(track_serial)
+        # 從分段目錄取得 track 資訊
+        track = self.catalog.get_track(video_path, track_serial)
 
         if not track:
             messagebox.showerror("錯誤", "無法載入分段資訊")
@@ -504,8 +983,13 @@ class PlaylistBuilderWindow:
         # 切換最愛狀態
         is_favorite = self.config_manager.toggle_favorite(video_rel_path, track_serial)
 
-        # 重新載入影片列表以更新顯示（星星圖標會自動更新）
-        self._load_videos()
+        # 只更新該節點的星星圖標，並重新套用篩選（「只顯示最愛」時可能需要隱藏）
+        row = self._track_rows.get(self.right_clicked_item)
+        if row:
+            row.video_row.favorite_count += 1 if is_favorite else -1
+            row.is_favorite = is_favorite
+            self.video_tree.item(row.item_id, text=self._track_text(row.track, is_favorite))
+            self._apply_filter()
 
     def _on_close(self):
         """處理視窗關閉事件"""
@@ -521,9 +1005,148 @@ class PlaylistBuilderWindow:
                 # 如果使用者在匯出對話框中取消，playlist_items 仍有內容
                 if self.playlist_items:
                     return
+        self._cancel_loading()
+        if self._filter_job is not None:
+            self.window.after_cancel(self._filter_job)
+            self._filter_job = None
+        if self.watcher:
+            self.watcher.remove_listener(self._on_workspace_changed_threadsafe)
+        self.config_manager.close()
         self.window.destroy()
 
 
+class SavedPlaylistsDialog:
+    """已存播放清單對話框（開啟或與目前的播放清單比較）"""
+
+    def __init__(self, window, builder: PlaylistBuilderWindow):
+        """
+        初始化對話框
+
+        Args:
+            window: Tkinter 視窗
+            builder: 播放清單建立器視窗
+        """
+        self.window = window
+        self.builder = builder
+        self._playlists = {}  # 節點 ID -> PlaylistSummary
+        self._sort_by = "name"
+        self._sort_reverse = False
+
+        self.window.title("已存播放清單")
+        self.window.geometry("720x420")
+        self.window.transient(builder.window)
+
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """設定使用者介面"""
+        tree_frame = ttk.Frame(self.window, padding=10)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+
+        # 欄位 -> (標題, 寬度, 排序欄位)
+        columns = {
+            'name': ("名稱", 280, "name"),
+            'tracks': ("分段數", 70, "tracks"),
+            'duration': ("總時長", 90, "duration"),
+            'play_count': ("播放次數", 80, "play_count"),
+            'last_played': ("最後播放", 100, "last_played"),
+        }
+        self.tree = ttk.Treeview(tree_frame, columns=tuple(columns), show='headings', selectmode='browse')
+        for column, (text, width, sort_by) in columns.items():
+            self.tree.heading(column, text=text, command=lambda s=sort_by: self._sort(s))
+            self.tree.column(column, width=width, anchor=tk.W if column == 'name' else tk.CENTER)
+
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<Double-Button-1>', lambda e: self._open_selected())
+
+        self._populate()
+
+        button_frame = ttk.Frame(self.window, padding=(10, 0, 10, 10))
+        button_frame.pack(fill=tk.X)
+        ttk.Button(button_frame, text="開啟", command=self._open_selected).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="與目前清單比較", command=self._diff_selected).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(button_frame, text="關閉", command=self.window.destroy).pack(side=tk.RIGHT)
+
+    def _populate(self):
+        """依目前的排序填入播放清單"""
+        self.tree.delete(*self.tree.get_children())
+        self._playlists.clear()
+        for summary in self.builder.playlist_library.get_playlists(self._sort_by, self._sort_reverse):
+            item_id = self.tree.insert('', tk.END, values=(
+                summary.name,
+                summary.track_count,
+                seconds_to_time_str(summary.duration),
+                summary.play_count,
+                summary.last_played or "-"
+            ))
+            self._playlists[item_id] = summary
+
+    def _sort(self, sort_by: str):
+        """點擊欄位標題排序（再點一次反向）"""
+        if sort_by == self._sort_by:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_by = sort_by
+            self._sort_reverse = False
+        self._populate()
+
+    def _load_items(self, summary):
+        """讀取播放清單的項目，失敗時顯示錯誤並回傳 None"""
+        try:
+            return self.builder.playlist_library.load_items(summary.file_name)
+        except Exception as e:
+            messagebox.showerror("錯誤", f"播放清單載入失敗: {str(e)}", parent=self.window)
+            return None
+
+    def _selected_playlist(self):
+        """取得選中的播放清單"""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("警告", "請先選擇播放清單", parent=self.window)
+            return None
+        return self._playlists.get(selection[0])
+
+    def _open_selected(self):
+        """以選中的播放清單取代目前的播放清單"""
+        playlist = self._selected_playlist()
+        if not playlist:
+            return
+        items = self._load_items(playlist)
+        if items is not None and self.builder.load_saved_playlist(items):
+            self.window.destroy()
+
+    def _diff_selected(self):
+        """顯示選中的播放清單與目前播放清單的差異"""
+        playlist = self._selected_playlist()
+        if not playlist:
+            return
+
+        items = self._load_items(playlist)
+        if items is None:
+            return
+        lines = diff_playlists(items, self.builder.playlist_items)
+
+        diff_window = tk.Toplevel(self.window)
+        diff_window.title(f"比較 - {playlist.name} → 目前清單")
+        diff_window.geometry("700x450")
+
+        text = tk.Text(diff_window, wrap=tk.NONE, font=('Courier', 12))
+        scrollbar = ttk.Scrollbar(diff_window, orient=tk.VERTICAL, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        text.tag_configure('added', foreground='#2e7d32')
+        text.tag_configure('removed', foreground='#c62828')
+        text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        tags = {'+': 'added', '-': 'removed'}
+        for line in lines or ["  (兩個播放清單都是空的)"]:
+            text.insert(tk.END, line + "\n", tags.get(line[0], ()))
+        text.configure(state=tk.DISABLED)
+
+
 class PreviewWindow:
     """預覽視窗"""
 
@@ -593,17 +1216,5 @@ class PreviewWindow:
             self.window.destroy()
             return
 
-        # 跳轉到開始位置
-        self.video_player.seek_to(self.track.start)
-
-        # 自動播放
-        self.video_player._play()
-
-        # 設定定時器，在結束時間停止
-        duration_ms = int((self.track.end - self.track.start) * 1000)
-        self.window.after(duration_ms, self._stop_playback)
-
-    def _stop_playback(self):
-        """停止播放"""
-        if hasattr(self, 'video_player'):
-            self.video_player._pause()
+        # 播放分段，播放時鐘到達結束時間時自動停止
+        self.video_player.play_segment(self.track.start, self.track.end)
@@ -7,10 +7,14 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from pathlib import Path
 import sys
+from typing import Optional
 sys.path.append(str(Path(__file__).parent.parent))
 
 from video_player import VideoPlayer
+from filmstrip import FilmstripView
+from boundary_detector import BoundaryDetector
 from track_manager import Track, TrackManager
+from workspace_watcher import WorkspaceWatcher
 from utils import seconds_to_time_str, validate_video_file
 
 
@@ -32,10 +36,11 @@ class TrackEditorWindow:
         self.tracks = []  # Track 物件列表
         self.mark_start_time = None  # 標記的開始時間
         self._original_tracks = []  # 用於追蹤未儲存的變更
+        self.boundary_detector: Optional[BoundaryDetector] = None
 
         # 設定視窗
         self.window.title("建立分段描述檔")
-        self.window.geometry("900x850")
+        self.window.geometry("900x930")
 
         # 設定視窗關閉處理
         self.window.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -63,7 +68,12 @@ class TrackEditorWindow:
 
         # 影片播放器
         self.video_player = VideoPlayer(main_container, width=640, height=360)
-        self.video_player.pack(pady=10)
+        self.video_player.pack(pady=(10, 0))
+
+        # 縮圖膠卷（點擊縮圖跳轉）
+        self.filmstrip = FilmstripView(main_container, on_seek=self.video_player.seek_to)
+        self.filmstrip.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self.video_player.on_position_changed = self.filmstrip.set_position
 
         # 時間戳標記區域
         mark_frame = ttk.LabelFrame(main_container, text="時間戳標記", padding=10)
@@ -91,6 +101,15 @@ class TrackEditorWindow:
         )
         self.mark_end_btn.pack(side=tk.LEFT, padx=5)
 
+        self.detect_btn = ttk.Button(
+            button_row,
+            text="自動偵測分段",
+            command=self._detect_boundaries,
+            state=tk.DISABLED,
+            style='Editor.TButton'
+        )
+        self.detect_btn.pack(side=tk.LEFT, padx=5)
+
         self.mark_info_label = ttk.Label(
             button_row,
             text="請先標記開始時間",
@@ -193,6 +212,9 @@ class TrackEditorWindow:
             text=f"影片: {video_path.name} | 時長: {seconds_to_time_str(self.video_player.get_duration())}"
         )
 
+        # 在背景產生縮圖膠卷
+        self.filmstrip.load(video_path, self.video_player.get_duration(), self.video_player.fps)
+
         # 載入現有的分段描述檔（如果存在）
         self.track_manager = TrackManager(str(video_path))
         if self.track_manager.has_description_file():
@@ -205,6 +227,7 @@ class TrackEditorWindow:
 
         # 啟用標記按鈕
         self.mark_start_btn.config(state=tk.NORMAL)
+        self.detect_btn.config(state=tk.NORMAL)
 
     def _mark_start(self):
         """標記開始時間"""
@@ -238,6 +261,56 @@ class TrackEditorWindow:
         )
         self.mark_end_btn.config(state=tk.DISABLED)
 
+    def _detect_boundaries(self):
+        """在背景自動偵測分段邊界"""
+        if self.boundary_detector or not self.video_path:
+            return
+
+        self.detect_btn.config(state=tk.DISABLED)
+        self.boundary_detector = BoundaryDetector(self.video_path)
+
+        # 回呼函式在背景執行緒中被呼叫，透過 after() 交回主執行緒處理
+        self.boundary_detector.on_progress = lambda progress, message: self.window.after(
+            0, lambda: self._on_detect_progress(progress, message)
+        )
+        self.boundary_detector.on_finished = lambda tracks: self.window.after(
+            0, lambda: self._on_detect_finished(tracks)
+        )
+        self.boundary_detector.start()
+
+    def _on_detect_progress(self, progress: float, message: str):
+        """更新偵測進度"""
+        self.mark_info_label.config(
+            text=f"自動偵測: {message} ({progress * 100:.0f}%)",
+            foreground='blue'
+        )
+
+    def _on_detect_finished(self, tracks):
+        """偵測完成，詢問是否套用建議的分段"""
+        self.boundary_detector = None
+        self.detect_btn.config(state=tk.NORMAL)
+        self.mark_info_label.config(text="請先標記開始時間", foreground='gray')
+
+        if not tracks:
+            messagebox.showwarning("警告", "無法偵測到分段邊界")
+            return
+
+        summary = "\n".join(
+            f"Track {t.serial}: {seconds_to_time_str(t.start)} - {seconds_to_time_str(t.end)}"
+            for t in tracks
+        )
+        prompt = f"偵測到 {len(tracks)} 個分段:\n\n{summary}\n\n"
+        if self.tracks:
+            prompt += "是否以建議的分段取代目前的分段列表？"
+        else:
+            prompt += "是否套用建議的分段？"
+
+        if not messagebox.askyesno("自動偵測分段", prompt):
+            return
+
+        self.tracks = tracks
+        self._refresh_track_list()
+
     def _show_track_edit_dialog(self, start_time: float, end_time: float, track: Track = None):
         """
         顯示分段編輯對話框
@@ -423,7 +496,11 @@ class TrackEditorWindow:
 
         # 儲存
         if self.track_manager.save_tracks():
-            messagebox.showinfo("成功", f"分段描述檔已匯出至\n{self.track_manager.json_path}")
+            # 更新開啟中的播放清單建立器（分段存在資料庫時沒有檔案系統事件）
+            watcher = WorkspaceWatcher.get_existing(self.work_dir)
+            if watcher:
+                watcher.notify([self.video_path])
+            messagebox.showinfo("成功", f"分段描述檔已匯出至\n{self.track_manager.storage_location}")
             # 更新原始狀態
             self._save_original_state()
         else:
@@ -459,4 +536,9 @@ class TrackEditorWindow:
                 # 再次檢查是否還有未儲存的變更（可能使用者取消了匯出）
                 if self._has_unsaved_changes():
                     return
+
+        # 確定關閉後才取消偵測（使用者取消關閉時偵測繼續進行）
+        if self.boundary_detector:
+            self.boundary_detector.cancel()
+            self.boundary_detector = None
         self.window.destroy()
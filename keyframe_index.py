@@ -0,0 +1,253 @@
+"""
+關鍵幀索引模組
+解析 MP4/M4V 的 sample table 建立關鍵幀索引，供快速且精確的跳轉使用
+"""
+
+import json
+import struct
+from bisect import bisect_right
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+
+from utils import atomic_write_text, get_video_cache_path
+
+# 需要往下層解析的容器 box
+_CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+class KeyframeIndex:
+    """影片關鍵幀索引"""
+
+    VERSION = 1
+    CACHE_SUFFIX = ".keyframes.json"
+
+    def __init__(self, keyframes: List[int], keyframe_times: List[float]):
+        """
+        初始化關鍵幀索引
+
+        Args:
+            keyframes: 關鍵幀幀號列表（從0開始，已排序）
+            keyframe_times: 對應的時間戳（秒）
+        """
+        self.keyframes = keyframes
+        self.keyframe_times = keyframe_times
+
+    def __len__(self) -> int:
+        return len(self.keyframes)
+
+    def keyframe_at_or_before(self, frame_number: int) -> int:
+        """
+        取得指定幀之前（含）最近的關鍵幀
+
+        Args:
+            frame_number: 幀號
+
+        Returns:
+            關鍵幀幀號
+        """
+        i = bisect_right(self.keyframes, frame_number) - 1
+        return self.keyframes[i] if i >= 0 else 0
+
+    def keyframe_time_at_or_before(self, seconds: float) -> float:
+        """
+        取得指定時間之前（含）最近的關鍵幀時間
+
+        Args:
+            seconds: 時間（秒）
+
+        Returns:
+            關鍵幀時間（秒）
+        """
+        i = bisect_right(self.keyframe_times, seconds) - 1
+        return self.keyframe_times[i] if i >= 0 else 0.0
+
+    @classmethod
+    def load_or_build(cls, video_path: Path) -> Optional['KeyframeIndex']:
+        """
+        載入快取的關鍵幀索引，若不存在或影片已變更則重新建立
+
+        Args:
+            video_path: 影片檔案路徑
+
+        Returns:
+            關鍵幀索引，無法解析時回傳 None
+        """
+        try:
+            stat = video_path.stat()
+        except OSError:
+            return None
+
+        cache_path = get_video_cache_path(video_path, cls.CACHE_SUFFIX)
+        data = _load_cache(cache_path)
+        if (data and data.get("version") == cls.VERSION
+                and data.get("mtime_ns") == stat.st_mtime_ns
+                and data.get("size") == stat.st_size):
+            if data.get("keyframes") is None:
+                return None
+            return cls(data["keyframes"], data["keyframe_times"])
+
+        index = build_keyframe_index(video_path)
+
+        # 無法解析的影片也記錄下來，避免每次開啟都重新解析
+        data = {
+            "version": cls.VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "keyframes": index.keyframes if index else None,
+            "keyframe_times": index.keyframe_times if index else None
+        }
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(cache_path, json.dumps(data, separators=(',', ':')))
+        except OSError as e:
+            print(f"關鍵幀索引儲存失敗: {e}")
+
+        return index
+
+
+_CACHE_KEYS = ("version", "mtime_ns", "size", "keyframes", "keyframe_times")
+
+
+def _load_cache(cache_path: Path) -> Optional[Dict]:
+    """讀取索引快取檔，失敗或格式不符時回傳 None"""
+    if not cache_path.exists():
+        return None
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+
+    if not isinstance(data, dict) or any(key not in data for key in _CACHE_KEYS):
+        return None
+    keyframes, keyframe_times = data["keyframes"], data["keyframe_times"]
+    # 無法解析的影片兩者皆為 None，否則為長度相同的列表
+    if keyframes is None and keyframe_times is None:
+        return data
+    if (not isinstance(keyframes, list) or not isinstance(keyframe_times, list)
+            or len(keyframes) != len(keyframe_times)):
+        return None
+    return data
+
+
+def _iter_boxes(f: BinaryIO, start: int, end: int):
+    """
+    逐一列出範圍內的 box
+
+    Yields:
+        (box 類型, payload 起點, box 終點)
+    """
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+
+        size, box_type = struct.unpack(">I4s", header)
+        payload = offset + 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            payload += 8
+        elif size == 0:
+            size = end - offset
+
+        if size < payload - offset:
+            return
+
+        yield box_type, payload, offset + size
+        offset += size
+
+
+def _read_payload(f: BinaryIO, payload: int, box_end: int) -> bytes:
+    """讀取 box 的內容"""
+    f.seek(payload)
+    return f.read(box_end - payload)
+
+
+def _parse_track(f: BinaryIO, start: int, end: int, track: Dict) -> None:
+    """遞迴解析 trak box，收集 handler、timescale、stss、stts"""
+    for box_type, payload, box_end in _iter_boxes(f, start, end):
+        if box_type in _CONTAINER_BOXES:
+            _parse_track(f, payload, box_end, track)
+        elif box_type == b"hdlr":
+            data = _read_payload(f, payload, box_end)
+            track["handler"] = data[8:12]
+        elif box_type == b"mdhd":
+            data = _read_payload(f, payload, box_end)
+            # 內容不完整時 unpack_from 會引發 struct.error
+            offset = 20 if data[:1] == b"\x01" else 12
+            track["timescale"] = struct.unpack_from(">I", data, offset)[0]
+        elif box_type == b"stss":
+            data = _read_payload(f, payload, box_end)
+            count = struct.unpack_from(">I", data, 4)[0]
+            track["stss"] = struct.unpack_from(f">{count}I", data, 8)
+        elif box_type == b"stts":
+            data = _read_payload(f, payload, box_end)
+            count = struct.unpack_from(">I", data, 4)[0]
+            track["stts"] = struct.unpack_from(f">{count * 2}I", data, 8)
+
+
+def build_keyframe_index(video_path: Path) -> Optional[KeyframeIndex]:
+    """
+    解析 MP4/M4V 檔案建立關鍵幀索引
+    讀取影像軌的 stss（同步樣本表）與 stts（樣本時長表），只讀取需要的 box
+
+    Args:
+        video_path: 影片檔案路徑
+
+    Returns:
+        關鍵幀索引，非 MP4 格式或解析失敗時回傳 None
+    """
+    try:
+        file_size = video_path.stat().st_size
+        with open(video_path, 'rb') as f:
+            for box_type, payload, box_end in _iter_boxes(f, 0, file_size):
+                if box_type != b"moov":
+                    continue
+
+                for trak_type, trak_payload, trak_end in _iter_boxes(f, payload, box_end):
+                    if trak_type != b"trak":
+                        continue
+
+                    track: Dict = {}
+                    _parse_track(f, trak_payload, trak_end, track)
+                    if track.get("handler") == b"vide":
+                        return _index_from_track(track)
+                return None
+    except (OSError, struct.error, IndexError) as e:
+        print(f"關鍵幀索引建立失敗: {e}")
+    return None
+
+
+def _index_from_track(track: Dict) -> Optional[KeyframeIndex]:
+    """由影像軌的 sample table 計算關鍵幀幀號與時間"""
+    stts = track.get("stts")
+    timescale = track.get("timescale")
+    if not stts or not timescale:
+        return None
+
+    # 沒有 stss 表示每一幀都是關鍵幀
+    sample_count = sum(stts[0::2])
+    sync_samples = track.get("stss") or range(1, sample_count + 1)
+
+    keyframes: List[int] = []
+    keyframe_times: List[float] = []
+
+    # 依 stts 逐段累計解碼時間戳
+    sample = 0      # 目前段落的第一個樣本（從0開始）
+    dts = 0
+    entry = 0
+    for sync in sync_samples:
+        frame = sync - 1
+        while entry < len(stts) // 2 and frame >= sample + stts[entry * 2]:
+            count, delta = stts[entry * 2], stts[entry * 2 + 1]
+            sample += count
+            dts += count * delta
+            entry += 1
+        delta = stts[entry * 2 + 1] if entry < len(stts) // 2 else 0
+        keyframes.append(frame)
+        keyframe_times.append((dts + (frame - sample) * delta) / timescale)
+
+    return KeyframeIndex(keyframes, keyframe_times)
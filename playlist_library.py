@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+播放清單庫模組
+索引 playlists/ 下所有已匯出的 XSPF 播放清單（名稱、總時長、分段數、引用的影片），
+並與 .workout-planner 的播放統計（play_count、last_played）對應
+
+用法:
+    python playlist_library.py WORK_DIR [--sort name|duration|tracks|play_count|last_played] [--reverse]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils import atomic_write_text, seconds_to_time_str
+from xspf_generator import PlaylistItem, XSPFGenerator
+from xspf_reader import read_xspf
+
+
+class PlaylistSummary:
+    """已匯出播放清單的摘要"""
+
+    def __init__(self, file_name: str, name: str, signature: Tuple[int, int],
+                 duration: float, track_count: int, videos: List[str]):
+        """
+        初始化播放清單摘要
+
+        Args:
+            file_name: XSPF 檔名（如 "週一.xspf"）
+            name: 播放清單名稱（XSPF 的 title）
+            signature: 檔案的 (mtime_ns, size)
+            duration: 總時長（秒）
+            track_count: 分段數
+            videos: 引用的影片 ID（依出現順序、不重複）
+        """
+        self.file_name = file_name
+        self.name = name
+        self.signature = signature
+        self.duration = duration
+        self.track_count = track_count
+        self.videos = videos
+        self.play_count = 0
+        self.last_played: Optional[str] = None
+
+    @classmethod
+    def from_items(cls, file_name: str, name: str, signature: Tuple[int, int],
+                   items: List[PlaylistItem]) -> 'PlaylistSummary':
+        """由播放清單項目建立摘要"""
+        videos = list(dict.fromkeys(item.video_path for item in items))
+        return cls(file_name, name, signature,
+                   XSPFGenerator.calculate_total_duration(items), len(items), videos)
+
+
+class PlaylistLibrary:
+    """
+    播放清單庫
+
+    每個 XSPF 檔案只解析一次，摘要與檔案簽章保存在工作目錄的 .workout-planner.playlists，
+    refresh() 只重新解析修改時間或大小有變動的檔案；
+    列出與排序只使用記憶體中的摘要，不需開啟任何播放清單
+    """
+
+    CACHE_FILE_NAME = ".workout-planner.playlists"
+    CACHE_VERSION = 1
+
+    # 排序欄位 -> 排序鍵
+    SORT_KEYS = {
+        "name": lambda s: s.name.casefold(),
+        "duration": lambda s: s.duration,
+        "tracks": lambda s: s.track_count,
+        "play_count": lambda s: s.play_count,
+        "last_played": lambda s: s.last_played or "",
+    }
+
+    _instances: Dict[Path, 'PlaylistLibrary'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, work_dir: Path, use_cache: bool = True):
+        """
+        初始化播放清單庫
+
+        Args:
+            work_dir: 工作目錄路徑
+            use_cache: 是否使用磁碟快取檔
+        """
+        self.work_dir = Path(work_dir)
+        self.playlists_dir = self.work_dir / "playlists"
+        self.cache_path = self.work_dir / self.CACHE_FILE_NAME if use_cache else None
+        self._summaries: Dict[str, PlaylistSummary] = {}  # 檔名 -> 摘要
+        self._lock = threading.RLock()
+        self._dirty = False
+
+        if self.cache_path:
+            self._load_cache()
+
+    @classmethod
+    def for_workspace(cls, work_dir: Path) -> 'PlaylistLibrary':
+        """
+        取得工作目錄共用的播放清單庫
+
+        Args:
+            work_dir: 工作目錄路徑
+
+        Returns:
+            播放清單庫
+        """
+        key = Path(work_dir).resolve()
+        with cls._instances_lock:
+            library = cls._instances.get(key)
+            if library is None:
+                library = cls(work_dir)
+                cls._instances[key] = library
+            return library
+
+    def refresh(self, stats: Optional[Dict[str, Dict]] = None) -> None:
+        """
+        重新掃描 playlists/ 並解析有變動的檔案
+
+        Args:
+            stats: 播放統計（ConfigManager.get_playlist_stats()），None 表示不更新
+        """
+        try:
+            entries = [e for e in os.scandir(self.playlists_dir)
+                       if e.name.lower().endswith('.xspf') and e.is_file()]
+        except OSError:
+            entries = []
+
+        location_cache = {}
+        with self._lock:
+            seen = set()
+            for entry in entries:
+                seen.add(entry.name)
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                cached = self._summaries.get(entry.name)
+                if cached is not None and cached.signature == signature:
+                    continue
+
+                try:
+                    name, items = read_xspf(Path(entry.path), self.work_dir, location_cache)
+                except (ET.ParseError, OSError) as e:
+                    print(f"播放清單載入失敗: {entry.name}: {e}")
+                    if self._summaries.pop(entry.name, None) is not None:
+                        self._dirty = True
+                    continue
+                self._summaries[entry.name] = PlaylistSummary.from_items(entry.name, name, signature, items)
+                self._dirty = True
+
+            for removed in set(self._summaries) - seen:
+                del self._summaries[removed]
+                self._dirty = True
+
+            if stats is not None:
+                self._apply_stats(stats)
+
+        self.save_cache()
+
+    def _apply_stats(self, stats: Dict[str, Dict]) -> None:
+        """將播放統計對應到摘要（統計以檔名或不含副檔名的名稱記錄）"""
+        for file_name, summary in self._summaries.items():
+            entry = stats.get(file_name) or stats.get(Path(file_name).stem) or {}
+            summary.play_count = entry.get("play_count", 0)
+            summary.last_played = entry.get("last_played")
+
+    def _load_cache(self) -> None:
+        """從快取檔載入上次解析的摘要"""
+        if not self.cache_path.exists():
+            return
+
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"播放清單庫快取載入失敗: {e}")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != self.CACHE_VERSION:
+            return
+
+        # 先解析完整個快取檔，格式錯誤時整份捨棄，重新解析播放清單
+        summaries = {}
+        try:
+            for file_name, name, signature, duration, track_count, videos in data.get("playlists", []):
+                summaries[file_name] = PlaylistSummary(
+                    file_name, name, tuple(signature), duration, track_count, list(videos))
+        except (TypeError, ValueError) as e:
+            print(f"播放清單庫快取載入失敗: {e}")
+            return
+
+        with self._lock:
+            self._summaries.update(summaries)
+
+    def save_cache(self) -> None:
+        """有變動時將摘要寫入快取檔（先寫入暫存檔再取代）"""
+        if not self.cache_path:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [
+                [s.file_name, s.name, list(s.signature), s.duration, s.track_count, s.videos]
+                for s in self._summaries.values()
+            ]
+            self._dirty = False
+
+        try:
+            atomic_write_text(self.cache_path, json.dumps(
+                {"version": self.CACHE_VERSION, "playlists": rows}, ensure_ascii=False, separators=(',', ':')))
+        except OSError as e:
+            print(f"播放清單庫快取儲存失敗: {e}")
+
+    def get_playlists(self, sort_by: str = "name", reverse: bool = False) -> List[PlaylistSummary]:
+        """
+        取得所有播放清單摘要（需先 refresh）
+
+        Args:
+            sort_by: 排序欄位（name、duration、tracks、play_count、last_played）
+            reverse: 是否反向排序
+
+        Returns:
+            排序後的摘要列表
+        """
+        with self._lock:
+            summaries = list(self._summaries.values())
+        summaries.sort(key=self.SORT_KEYS[sort_by], reverse=reverse)
+        return summaries
+
+    def get(self, file_name: str) -> Optional[PlaylistSummary]:
+        """
+        取得指定檔名的播放清單摘要
+
+        Args:
+            file_name: XSPF 檔名
+
+        Returns:
+            摘要，不存在時回傳 None
+        """
+        with self._lock:
+            return self._summaries.get(file_name)
+
+    def get_playlists_using(self, video_id: str) -> List[PlaylistSummary]:
+        """
+        取得引用指定影片的播放清單
+
+        Args:
+            video_id: 影片 ID（如 "BodyCombat/BC64.mp4"）
+
+        Returns:
+            依名稱排序的摘要列表
+        """
+        with self._lock:
+            summaries = [s for s in self._summaries.values() if video_id in s.videos]
+        summaries.sort(key=self.SORT_KEYS["name"])
+        return summaries
+
+    def load_items(self, file_name: str) -> List[PlaylistItem]:
+        """
+        讀取播放清單的所有項目
+
+        Args:
+            file_name: XSPF 檔名
+
+        Returns:
+            PlaylistItem 列表
+
+        Raises:
+            ET.ParseError: XML 格式錯誤
+            OSError: 檔案無法讀取
+        """
+        _name, items = read_xspf(self.playlists_dir / file_name, self.work_dir)
+        return items
+
+
+def main() -> int:
+    """命令列進入點：列出工作目錄的播放清單"""
+    parser = argparse.ArgumentParser(description="Workout Planner 播放清單庫")
+    parser.add_argument("work_dir", help="工作目錄路徑")
+    parser.add_argument("--sort", choices=sorted(PlaylistLibrary.SORT_KEYS), default="name",
+                        help="排序欄位")
+    parser.add_argument("--reverse", action="store_true", help="反向排序")
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir)
+    if not work_dir.is_dir():
+        print(f"✗ 找不到工作目錄: {work_dir}")
+        return 1
+
+    from config_manager import ConfigManager
+    library = PlaylistLibrary.for_workspace(work_dir)
+    library.refresh(ConfigManager(str(work_dir)).get_playlist_stats())
+
+    for summary in library.get_playlists(args.sort, args.reverse):
+        print(f"{summary.name}\t{summary.track_count} 個分段\t{seconds_to_time_str(summary.duration)}"
+              f"\t播放 {summary.play_count} 次\t{summary.last_played or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
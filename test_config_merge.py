@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+測試配置檔的三方合併、檔案鎖與多行程同時寫入
+
+用法:
+    python test_config_merge.py
+    python -m unittest test_config_merge
+"""
+
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from config_manager import ConfigManager, merge_config
+from utils import FileLock
+
+PROCESSES = 6
+TOGGLES = 30
+
+
+def _toggle_worker(work_dir: str, worker: int, toggles: int) -> None:
+    """子行程：切換各自的最愛分段並累加播放次數（序號為 3 的倍數者切換兩次，最後不是最愛）"""
+    config = ConfigManager(work_dir)
+    for i in range(toggles):
+        video = f"Stress/V{i % 5}.mp4"
+        serial = worker * 1000 + i
+        config.toggle_favorite(video, serial)
+        if i % 3 == 0:
+            config.toggle_favorite(video, serial)
+        config.update_playlist_stats("stress", last_played=f"2026-01-{worker + 1:02d}")
+        config.set_preference(f"worker{worker}", i)
+
+
+def _lock_worker(work_dir: str, increments: int) -> None:
+    """子行程：在檔案鎖內讀取、遞增並寫回計數（沒有互斥時會遺失遞增）"""
+    counter = Path(work_dir) / "counter"
+    for _ in range(increments):
+        with FileLock(Path(work_dir) / "counter.lock"):
+            value = int(counter.read_text())
+            time.sleep(0.001)
+            counter.write_text(str(value + 1))
+
+
+def _run_processes(target, args_list) -> None:
+    """啟動多個子行程並等待全部結束"""
+    processes = [multiprocessing.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        if process.exitcode != 0:
+            raise AssertionError(f"子行程失敗: exitcode={process.exitcode}")
+
+
+class MergeConfigTest(unittest.TestCase):
+    """merge_config() 的三方合併規則"""
+
+    def test_favorites_apply_additions_and_removals(self):
+        base = {"favorites": {"A/a.mp4": [1, 2]}}
+        local = {"favorites": {"A/a.mp4": [2, 3]}}
+        disk = {"favorites": {"A/a.mp4": [1, 2, 5], "B/b.mp4": [7]}}
+        merged = merge_config(base, local, disk)
+        # 本地移除 1、新增 3；其他行程新增的 5 與 B/b.mp4 保留
+        self.assertEqual(merged["favorites"], {"A/a.mp4": [2, 3, 5], "B/b.mp4": [7]})
+
+    def test_favorites_video_removed_when_empty(self):
+        base = {"favorites": {"A/a.mp4": [1]}}
+        local = {"favorites": {}}
+        disk = {"favorites": {"A/a.mp4": [1]}}
+        self.assertEqual(merge_config(base, local, disk)["favorites"], {})
+
+    def test_unchanged_local_keeps_disk(self):
+        base = {"favorites": {"A/a.mp4": [1]}, "playlists": {"p": {"play_count": 1, "last_played": "x"}}}
+        disk = {"favorites": {"A/a.mp4": [1, 2]}, "playlists": {"p": {"play_count": 4, "last_played": "y"}},
+                "preferences": {"k": 1}}
+        merged = merge_config(base, json.loads(json.dumps(base)), disk)
+        self.assertEqual(merged["favorites"], disk["favorites"])
+        self.assertEqual(merged["playlists"], disk["playlists"])
+        self.assertEqual(merged["preferences"], disk["preferences"])
+
+    def test_play_count_is_additive(self):
+        base = {"playlists": {"p": {"play_count": 2, "last_played": "2026-01-01"}}}
+        local = {"playlists": {"p": {"play_count": 5, "last_played": "2026-01-01"},
+                               "new": {"play_count": 1, "last_played": "2026-01-03"}}}
+        disk = {"playlists": {"p": {"play_count": 4, "last_played": "2026-01-02"}}}
+        merged = merge_config(base, local, disk)
+        # 本地 +3、磁碟 +2
+        self.assertEqual(merged["playlists"]["p"]["play_count"], 7)
+        self.assertEqual(merged["playlists"]["new"]["play_count"], 1)
+
+    def test_last_played_last_writer_wins_per_key(self):
+        base = {"playlists": {"p": {"play_count": 1, "last_played": "2026-01-01"},
+                              "q": {"play_count": 1, "last_played": "2026-01-01"}}}
+        local = {"playlists": {"p": {"play_count": 1, "last_played": "2026-02-01"},
+                               "q": {"play_count": 1, "last_played": "2026-01-01"}}}
+        disk = {"playlists": {"p": {"play_count": 1, "last_played": "2026-01-15"},
+                              "q": {"play_count": 1, "last_played": "2026-01-20"}}}
+        merged = merge_config(base, local, disk)
+        self.assertEqual(merged["playlists"]["p"]["last_played"], "2026-02-01")  # 本地有變更，覆寫
+        self.assertEqual(merged["playlists"]["q"]["last_played"], "2026-01-20")  # 本地沒變更，保留磁碟
+
+    def test_preferences_last_writer_wins_per_key(self):
+        base = {"preferences": {"a": 1, "b": 1}}
+        local = {"preferences": {"a": 2, "b": 1}}
+        disk = {"preferences": {"a": 1, "b": 3, "c": 4}}
+        self.assertEqual(merge_config(base, local, disk)["preferences"], {"a": 2, "b": 3, "c": 4})
+
+    def test_merge_does_not_modify_inputs(self):
+        base = {"favorites": {"A/a.mp4": [1]}}
+        local = {"favorites": {"A/a.mp4": [1, 2]}}
+        disk = {"favorites": {"A/a.mp4": [1]}}
+        merge_config(base, local, disk)
+        self.assertEqual(disk, {"favorites": {"A/a.mp4": [1]}})
+
+
+class MultiProcessTest(unittest.TestCase):
+    """多個行程同時寫入同一工作目錄"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.work_dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_file_lock_is_mutually_exclusive(self):
+        (Path(self.work_dir) / "counter").write_text("0")
+        increments = 20
+        _run_processes(_lock_worker, [(self.work_dir, increments)] * PROCESSES)
+        self.assertEqual(int((Path(self.work_dir) / "counter").read_text()), PROCESSES * increments)
+
+    def test_concurrent_toggles_lose_no_changes(self):
+        _run_processes(_toggle_worker, [(self.work_dir, w, TOGGLES) for w in range(PROCESSES)])
+
+        config = ConfigManager(self.work_dir)
+        expected = {}
+        for w in range(PROCESSES):
+            for i in range(TOGGLES):
+                if i % 3 != 0:
+                    expected.setdefault(f"Stress/V{i % 5}.mp4", set()).add(w * 1000 + i)
+        favorites = {video: set(serials) for video, serials in config.config["favorites"].items()}
+        self.assertEqual(favorites, expected)
+
+        self.assertEqual(config.get_playlist_stats()["stress"]["play_count"], PROCESSES * TOGGLES)
+        for w in range(PROCESSES):
+            self.assertEqual(config.get_preference(f"worker{w}"), TOGGLES - 1)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if unittest.main(exit=False).result.wasSuccessful() else 1)
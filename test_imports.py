@@ -28,6 +28,62 @@ def test_imports():
         print(f"✗ track_manager: {e}")
         tests.append(False)
 
+    try:
+        import track_catalog
+        print("✓ track_catalog")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ track_catalog: {e}")
+        tests.append(False)
+
+    try:
+        import batch_export
+        print("✓ batch_export")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ batch_export: {e}")
+        tests.append(False)
+
+    try:
+        import workspace_scanner
+        print("✓ workspace_scanner")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ workspace_scanner: {e}")
+        tests.append(False)
+
+    try:
+        import workspace_watcher
+        print("✓ workspace_watcher")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ workspace_watcher: {e}")
+        tests.append(False)
+
+    try:
+        import category_loader
+        print("✓ category_loader")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ category_loader: {e}")
+        tests.append(False)
+
+    try:
+        import workspace_store
+        print("✓ workspace_store")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ workspace_store: {e}")
+        tests.append(False)
+
+    try:
+        import track_search
+        print("✓ track_search")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ track_search: {e}")
+        tests.append(False)
+
     try:
         import xspf_generator
         print("✓ xspf_generator")
@@ -36,6 +92,22 @@ def test_imports():
         print(f"✗ xspf_generator: {e}")
         tests.append(False)
 
+    try:
+        import xspf_reader
+        print("✓ xspf_reader")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ xspf_reader: {e}")
+        tests.append(False)
+
+    try:
+        import playlist_library
+        print("✓ playlist_library")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ playlist_library: {e}")
+        tests.append(False)
+
     try:
         import utils
         print("✓ utils")
@@ -44,6 +116,46 @@ def test_imports():
         print(f"✗ utils: {e}")
         tests.append(False)
 
+    try:
+        import keyframe_index
+        print("✓ keyframe_index")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ keyframe_index: {e}")
+        tests.append(False)
+
+    try:
+        import frame_cache
+        print("✓ frame_cache")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ frame_cache: {e}")
+        tests.append(False)
+
+    try:
+        import video_decoder
+        print("✓ video_decoder")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ video_decoder: {e}")
+        tests.append(False)
+
+    try:
+        import boundary_detector
+        print("✓ boundary_detector")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ boundary_detector: {e}")
+        tests.append(False)
+
+    try:
+        import filmstrip
+        print("✓ filmstrip")
+        tests.append(True)
+    except Exception as e:
+        print(f"✗ filmstrip: {e}")
+        tests.append(False)
+
     try:
         import video_player
         print("✓ video_player")
@@ -0,0 +1,416 @@
+"""
+分段目錄模組
+一次載入工作目錄下所有分段描述檔，並常駐於記憶體中提供查詢
+"""
+
+import bisect
+import json
+import threading
+from concurrent.futures import Executor, Future, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from track_manager import Track, read_track_file
+from utils import atomic_write_text
+from workspace_scanner import CategoryScan, iter_workspace, scan_categories, stat_signature
+from workspace_store import WorkspaceStore
+
+
+class CatalogEntry:
+    """單一影片的分段資料"""
+
+    def __init__(self, video_path: Path, category: str):
+        """
+        初始化目錄項目
+
+        Args:
+            video_path: 影片檔案路徑
+            category: 課程種類
+        """
+        self.video_path = video_path
+        self.json_path = video_path.with_suffix('.json')
+        self.category = category
+        self.signature: Optional[Tuple] = None  # 描述檔的 (mtime_ns, size)，或資料庫的 ("db", 版本號)
+        self.tracks: List[Track] = []
+        self.tracks_by_serial: Dict[int, Track] = {}
+
+    @property
+    def has_description_file(self) -> bool:
+        """是否有描述檔（且至少有一個分段）"""
+        return self.signature is not None and len(self.tracks) > 0
+
+    def set_tracks(self, tracks: List[Track]) -> None:
+        """設定分段列表並重建序號索引"""
+        self.tracks = tracks
+        self.tracks_by_serial = {t.serial: t for t in tracks}
+
+
+class TrackCatalog:
+    """
+    工作目錄分段目錄
+
+    每個描述檔只解析一次，以 (影片路徑, 序號) 建立索引；
+    refresh() 只重新解析修改時間或大小有變動的描述檔。
+    解析結果與描述檔簽章保存在工作目錄的 .workout-planner.cache，
+    啟動時一次讀入，之後只需比對簽章。
+
+    工作目錄有資料庫（.workout-planner.db）時，每個課程種類以一次查詢載入，
+    以資料庫中的版本號作為簽章，不使用快取檔
+    """
+
+    CACHE_FILE_NAME = ".workout-planner.cache"
+    CACHE_VERSION = 1
+
+    _instances: Dict[Path, 'TrackCatalog'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, work_dir: Path, use_cache: bool = True):
+        """
+        初始化分段目錄
+
+        Args:
+            work_dir: 工作目錄路徑
+            use_cache: 是否使用磁碟快取檔
+        """
+        self.work_dir = Path(work_dir)
+        self.store = WorkspaceStore.open_if_exists(self.work_dir)
+        self.cache_path = self.work_dir / self.CACHE_FILE_NAME if use_cache and not self.store else None
+        self._entries: Dict[Path, CatalogEntry] = {}
+        self._categories: Dict[str, List[Path]] = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+
+        if self.cache_path:
+            self._load_cache()
+
+    @classmethod
+    def for_workspace(cls, work_dir: Path) -> 'TrackCatalog':
+        """
+        取得工作目錄共用的分段目錄（同一工作目錄的視窗共用同一份資料）
+
+        Args:
+            work_dir: 工作目錄路徑
+
+        Returns:
+            分段目錄
+        """
+        key = Path(work_dir).resolve()
+        with cls._instances_lock:
+            catalog = cls._instances.get(key)
+            if catalog is None:
+                catalog = cls(work_dir)
+                cls._instances[key] = catalog
+            return catalog
+
+    def get_categories(self) -> List[str]:
+        """取得所有課程種類"""
+        return scan_categories(self.work_dir)
+
+    def refresh(self, category: Optional[str] = None) -> None:
+        """
+        重新掃描影片並更新有變動的描述檔
+
+        Args:
+            category: 只更新此課程種類，None 表示全部
+        """
+        for _ in self.iter_refresh(category):
+            pass
+
+    def iter_refresh(self, category: Optional[str] = None) -> Iterator[str]:
+        """
+        平行掃描課程種類資料夾，每更新完一個課程種類就回傳其名稱（順序不固定），
+        全部完成後寫入快取檔
+
+        Args:
+            category: 只更新此課程種類，None 表示全部
+
+        Yields:
+            已更新的課程種類
+        """
+        categories = [category] if category else self.get_categories()
+
+        for scan in iter_workspace(self.work_dir, categories):
+            for _ in self.iter_update(scan):
+                pass
+            yield scan.name
+
+        if category is None:
+            with self._lock:
+                for name in set(self._categories) - set(categories):
+                    for removed in self._categories.pop(name):
+                        self._entries.pop(removed, None)
+                    self._dirty = True
+
+        self.save_cache()
+
+    def iter_update(self, scan: CategoryScan, executor: Optional[Executor] = None) -> Iterator[Path]:
+        """
+        以掃描結果更新一個課程種類，依影片順序逐一回傳已更新的影片；
+        提供 executor 時，有變動的描述檔先全部交給執行緒池平行解析。
+        全部完成後才更新課程種類的影片列表（不寫入快取檔），
+        呼叫端提早停止時取消尚未開始的解析，已更新的影片保留
+
+        Args:
+            scan: 課程種類的掃描結果
+            executor: 解析描述檔的執行緒池，None 表示依序解析
+
+        Yields:
+            已更新的影片路徑
+        """
+        name = scan.name
+        stored = self.store.get_category_tracks(name) if self.store else None
+
+        futures: Dict[Path, Future] = {}
+        if stored is None and executor is not None:
+            with self._lock:
+                for video in scan.videos:
+                    entry = self._entries.get(video.path)
+                    if video.sidecar_signature is not None and (
+                            entry is None or entry.signature != video.sidecar_signature):
+                        futures[video.path] = executor.submit(read_track_file, video.json_path)
+
+        try:
+            for video in scan.videos:
+                future = futures.get(video.path)
+                if future is not None:
+                    # 等待解析完成時不持有鎖，其他執行緒仍可查詢
+                    wait([future])
+                with self._lock:
+                    if stored is None:
+                        self._refresh_entry(video.path, name, video.sidecar_signature, future)
+                    else:
+                        self._refresh_stored_entry(video.path, name, stored)
+                yield video.path
+        finally:
+            for future in futures.values():
+                future.cancel()
+
+        videos = scan.video_paths
+        with self._lock:
+            old_videos = set(self._categories.get(name, []))
+            self._categories[name] = videos
+            for removed in old_videos - set(videos):
+                self._entries.pop(removed, None)
+                self._dirty = True
+
+    def refresh_video(self, video_path: Path) -> Optional[CatalogEntry]:
+        """
+        更新單一影片的描述檔
+
+        Args:
+            video_path: 影片檔案路徑
+
+        Returns:
+            目錄項目
+        """
+        video_path = Path(video_path)
+        category = video_path.parent.name
+        stored = self.store.get_category_tracks(category) if self.store else None
+        with self._lock:
+            entry = self._entries.get(video_path)
+            category = entry.category if entry else category
+            if stored is None:
+                entry = self._refresh_entry(video_path, category, stat_signature(video_path.with_suffix('.json')))
+            else:
+                entry = self._refresh_stored_entry(video_path, category, stored)
+        self.save_cache()
+        return entry
+
+    def sync_video(self, video_path: Path) -> Optional[CatalogEntry]:
+        """
+        依影片檔案目前的狀態更新目錄（新增、更新描述檔或移除），不掃描整個課程種類
+
+        Args:
+            video_path: 影片檔案路徑
+
+        Returns:
+            目錄項目，影片已不存在時回傳 None
+        """
+        video_path = Path(video_path)
+        category = video_path.parent.name
+
+        if not video_path.exists():
+            with self._lock:
+                removed = self._entries.pop(video_path, None) is not None
+                videos = self._categories.get(category)
+                if videos is not None and video_path in videos:
+                    videos.remove(video_path)
+                    removed = True
+                self._dirty = self._dirty or removed
+            self.save_cache()
+            return None
+
+        entry = self.refresh_video(video_path)
+        with self._lock:
+            # 尚未載入的課程種類等 refresh() 時再一次列出
+            videos = self._categories.get(category)
+            if videos is not None and video_path not in videos:
+                bisect.insort(videos, video_path)
+                self._dirty = True
+        self.save_cache()
+        return entry
+
+    def _refresh_entry(self, video_path: Path, category: str, signature: Optional[Tuple],
+                       future: Optional[Future] = None) -> CatalogEntry:
+        """比對描述檔簽章（掃描時已取得），有變動才重新解析（future 為已在執行緒池解析的結果）"""
+        entry = self._entries.get(video_path)
+        if entry is None:
+            entry = CatalogEntry(video_path, category)
+            self._entries[video_path] = entry
+
+        if signature == entry.signature:
+            return entry
+
+        self._dirty = True
+        entry.signature = signature
+        if signature is None:
+            entry.set_tracks([])
+            return entry
+
+        try:
+            entry.set_tracks(future.result() if future is not None else read_track_file(entry.json_path))
+        except (json.JSONDecodeError, IOError, KeyError, AttributeError, TypeError, ValueError) as e:
+            # 單一描述檔格式錯誤只影響該影片，不中斷整個課程種類的更新
+            print(f"分段描述檔載入失敗: {e}")
+            entry.set_tracks([])
+        return entry
+
+    def _refresh_stored_entry(self, video_path: Path, category: str,
+                              stored: Dict[str, Tuple[int, List[Track]]]) -> CatalogEntry:
+        """以資料庫查詢結果更新目錄項目"""
+        entry = self._entries.get(video_path)
+        if entry is None:
+            entry = CatalogEntry(video_path, category)
+            self._entries[video_path] = entry
+
+        revision, tracks = stored.get(self.store.video_id(video_path), (None, []))
+        signature = ("db", revision) if revision is not None else None
+        if signature != entry.signature:
+            entry.signature = signature
+            entry.set_tracks(tracks)
+        return entry
+
+    def _load_cache(self) -> None:
+        """從快取檔載入上次解析的結果"""
+        if not self.cache_path.exists():
+            return
+
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"分段目錄快取載入失敗: {e}")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != self.CACHE_VERSION:
+            return
+
+        # 先解析完整個快取檔，格式錯誤（如寫入中斷）時整份捨棄，重新解析描述檔
+        entries: Dict[Path, CatalogEntry] = {}
+        categories: Dict[str, List[Path]] = {}
+        try:
+            for category, videos in data.get("categories", {}).items():
+                paths = []
+                for rel_path, signature, tracks in videos:
+                    video_path = self.work_dir / rel_path
+                    entry = CatalogEntry(video_path, category)
+                    entry.signature = tuple(signature) if signature else None
+                    entry.set_tracks([
+                        Track(serial, start, end, name, training)
+                        for serial, start, end, name, training in tracks
+                    ])
+                    entries[video_path] = entry
+                    paths.append(video_path)
+                categories[category] = paths
+        except (AttributeError, TypeError, ValueError) as e:
+            print(f"分段目錄快取載入失敗: {e}")
+            return
+
+        with self._lock:
+            self._entries.update(entries)
+            self._categories.update(categories)
+
+    def save_cache(self) -> None:
+        """有變動時將目錄寫入快取檔（先寫入暫存檔再取代）"""
+        if not self.cache_path:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+
+            categories = {}
+            for category, videos in self._categories.items():
+                rows = []
+                for video_path in videos:
+                    entry = self._entries.get(video_path)
+                    if entry is None:
+                        continue
+                    rows.append([
+                        video_path.relative_to(self.work_dir).as_posix(),
+                        list(entry.signature) if entry.signature else None,
+                        [[t.serial, t.start, t.end, t.name, t.training] for t in entry.tracks]
+                    ])
+                categories[category] = rows
+            data = {"version": self.CACHE_VERSION, "categories": categories}
+            self._dirty = False
+
+        try:
+            atomic_write_text(self.cache_path, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+        except OSError as e:
+            print(f"分段目錄快取儲存失敗: {e}")
+
+    def get_videos(self, category: str) -> List[Path]:
+        """
+        取得課程種類下的所有影片（需先 refresh）
+
+        Args:
+            category: 課程種類
+
+        Returns:
+            排序後的影片路徑列表
+        """
+        with self._lock:
+            return list(self._categories.get(category, []))
+
+    def get_entries(self) -> List[CatalogEntry]:
+        """取得所有已載入的目錄項目"""
+        with self._lock:
+            return list(self._entries.values())
+
+    def get_entry(self, video_path: Path) -> Optional[CatalogEntry]:
+        """取得影片的目錄項目"""
+        with self._lock:
+            return self._entries.get(Path(video_path))
+
+    def get_tracks(self, video_path: Path) -> List[Track]:
+        """
+        取得影片的所有分段（已排序）
+
+        Args:
+            video_path: 影片檔案路徑
+
+        Returns:
+            Track 列表
+        """
+        entry = self.get_entry(video_path)
+        return list(entry.tracks) if entry else []
+
+    def get_track(self, video_path: Path, serial: int) -> Optional[Track]:
+        """
+        取得指定分段
+
+        Args:
+            video_path: 影片檔案路徑
+            serial: 分段序號
+
+        Returns:
+            Track 物件，不存在時回傳 None
+        """
+        entry = self.get_entry(video_path)
+        return entry.tracks_by_serial.get(serial) if entry else None
+
+    def has_description_file(self, video_path: Path) -> bool:
+        """檢查影片是否有描述檔"""
+        entry = self.get_entry(video_path)
+        return entry.has_description_file if entry else False
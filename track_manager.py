@@ -4,12 +4,22 @@
 """
 
 import json
+import sqlite3
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional
 
 
 class Track:
-    """影片分段資料類別"""
+    """
+    影片分段資料類別
+
+    使用 __slots__，不為每個分段建立 __dict__（分段目錄常駐數萬個分段）；
+    訓練名稱只有少數幾種，以 sys.intern() 讓所有分段共用同一個字串。
+    分段建立後不再修改，編輯時以新的 Track 取代
+    """
+
+    __slots__ = ('serial', 'start', 'end', 'name', 'training')
 
     def __init__(self, serial: int, start: float, end: float,
                  name: str = "", training: str = ""):
@@ -27,11 +37,11 @@ class Track:
         self.start = start
         self.end = end
         self.name = name
-        self.training = training
+        self.training = sys.intern(training) if training else training
 
     @property
     def duration(self) -> float:
-        """取得分段時長（秒）"""
+        """取得分段時長（秒；即時計算，不為每個分段多保存一個 float）"""
         return self.end - self.start
 
     def to_dict(self) -> Dict:
@@ -59,34 +69,77 @@ class Track:
         return f"Track(serial={self.serial}, start={self.start}, end={self.end}, name={self.name})"
 
 
+def read_track_file(json_path: Path) -> List[Track]:
+    """
+    讀取分段描述檔
+
+    Args:
+        json_path: 分段描述檔路徑
+
+    Returns:
+        依 serial 排序的 Track 列表
+
+    Raises:
+        json.JSONDecodeError, IOError, KeyError: 檔案無法讀取或格式錯誤
+        ValueError: 內容不是 {"tracks": [{...}, ...]} 的形式
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{json_path}: 描述檔的最上層必須是物件")
+    items = data.get("tracks", [])
+    if not isinstance(items, list) or not all(isinstance(t, dict) for t in items):
+        raise ValueError(f"{json_path}: tracks 必須是物件列表")
+    tracks = [Track.from_dict(t) for t in items]
+    tracks.sort(key=lambda t: t.serial)
+    return tracks
+
+
 class TrackManager:
-    """影片分段描述檔管理器"""
+    """
+    影片分段描述檔管理器
+
+    工作目錄有資料庫（.workout-planner.db）時改由資料庫讀寫分段
+    """
 
-    def __init__(self, video_path: str):
+    def __init__(self, video_path: str, store=None):
         """
         初始化分段管理器
 
         Args:
             video_path: 影片檔案路徑（.mp4）
+            store: 工作目錄資料庫 (WorkspaceStore)，None 表示自動偵測
         """
         self.video_path = Path(video_path)
         self.json_path = self.video_path.with_suffix('.json')
         self.tracks: List[Track] = []
+
+        if store is None:
+            from workspace_store import WorkspaceStore
+            # 影片位於 <工作目錄>/<課程種類>/ 之下
+            store = WorkspaceStore.open_if_exists(self.video_path.parent.parent)
+        self.store = store
+
         self._load_tracks()
 
+    @property
+    def storage_location(self) -> Path:
+        """分段資料的儲存位置（描述檔或資料庫）"""
+        return self.store.db_path if self.store else self.json_path
+
     def _load_tracks(self) -> None:
         """載入分段描述檔"""
+        if self.store:
+            self.tracks = self.store.get_tracks(self.video_path) or []
+            return
+
         if not self.json_path.exists():
             self.tracks = []
             return
 
         try:
-            with open(self.json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.tracks = [Track.from_dict(t) for t in data.get("tracks", [])]
-                # 按 serial 排序
-                self.tracks.sort(key=lambda t: t.serial)
-        except (json.JSONDecodeError, IOError, KeyError) as e:
+            self.tracks = read_track_file(self.json_path)
+        except (json.JSONDecodeError, IOError, KeyError, AttributeError, TypeError, ValueError) as e:
             print(f"分段描述檔載入失敗: {e}")
             self.tracks = []
 
@@ -100,6 +153,14 @@ class TrackManager:
         # 按 serial 排序
         self.tracks.sort(key=lambda t: t.serial)
 
+        if self.store:
+            try:
+                self.store.save_tracks(self.video_path, self.tracks)
+                return True
+            except sqlite3.Error as e:
+                print(f"分段資料儲存失敗: {e}")
+                return False
+
         data = {
             "video": self.video_path.name,
             "tracks": [t.to_dict() for t in self.tracks]
@@ -157,6 +218,8 @@ class TrackManager:
 
     def has_description_file(self) -> bool:
         """檢查是否有描述檔"""
+        if self.store:
+            return len(self.tracks) > 0
         return self.json_path.exists() and len(self.tracks) > 0
 
     def get_all_tracks(self) -> List[Track]:
@@ -0,0 +1,181 @@
+"""
+分段搜尋模組
+以分段目錄建立分段名稱與訓練標籤的倒排索引，支援中英文混合的子字串搜尋
+"""
+
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 中日韓文字（每個字視為獨立的字詞單位，以 n-gram 比對）
+_CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN_RE = re.compile(f"[{_CJK_RANGES}]+|[^\\W_{_CJK_RANGES}]+")
+
+TrackKey = Tuple[Path, int]  # (影片路徑, 分段序號)
+
+
+def normalize_text(text: str) -> str:
+    """
+    正規化文字（全形轉半形、不分大小寫）
+
+    Args:
+        text: 原始文字
+
+    Returns:
+        正規化後的文字
+    """
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    將文字切成字詞：英數字以連續字元為一個字詞，中日韓文字與英數字的交界也會切開
+
+    Args:
+        text: 原始文字
+
+    Returns:
+        正規化後的字詞列表
+    """
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+class TrackSearchIndex:
+    """
+    分段全文索引
+
+    每個字詞的 1 到 3 字元 n-gram 對應到 (影片路徑, 序號)。
+    三個字元以內的查詢直接查表；較長的查詢取各 3-gram 的交集後再確認，
+    不需逐一掃描所有分段。多個關鍵字（以空白分隔）需全部符合
+    """
+
+    MAX_GRAM = 3
+
+    def __init__(self):
+        """初始化空的索引"""
+        self._postings: Dict[str, Set[TrackKey]] = {}
+        self._grams: Dict[TrackKey, Set[str]] = {}
+        self._texts: Dict[TrackKey, str] = {}  # 用於確認長查詢的字詞文字
+        self._video_keys: Dict[Path, List[TrackKey]] = {}
+        self._video_signatures: Dict[Path, object] = {}
+        self._category_keys: Dict[str, Set[TrackKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def sync(self, catalog) -> None:
+        """
+        依分段目錄更新索引，只重新索引描述檔有變動的影片
+
+        Args:
+            catalog: TrackCatalog
+        """
+        seen = set()
+        for entry in catalog.get_entries():
+            seen.add(entry.video_path)
+            if (entry.video_path in self._video_signatures
+                    and self._video_signatures[entry.video_path] == entry.signature):
+                continue
+            self.remove_video(entry.video_path)
+            self.add_video(entry.video_path, entry.category, entry.tracks)
+            self._video_signatures[entry.video_path] = entry.signature
+
+        for video_path in [p for p in self._video_keys if p not in seen]:
+            self.remove_video(video_path)
+
+    def add_video(self, video_path: Path, category: str, tracks: Iterable) -> None:
+        """
+        加入影片的所有分段
+
+        Args:
+            video_path: 影片檔案路徑
+            category: 課程種類
+            tracks: Track 列表
+        """
+        keys = []
+        category_keys = self._category_keys.setdefault(category, set())
+
+        for track in tracks:
+            key = (video_path, track.serial)
+            tokens = tokenize(track.name or '') + tokenize(track.training or '')
+            grams = set()
+            for token in tokens:
+                for size in range(1, self.MAX_GRAM + 1):
+                    for i in range(len(token) - size + 1):
+                        grams.add(token[i:i + size])
+
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(key)
+            self._grams[key] = grams
+            self._texts[key] = "\n".join(tokens)
+            category_keys.add(key)
+            keys.append(key)
+
+        self._video_keys[video_path] = keys
+
+    def remove_video(self, video_path: Path) -> None:
+        """
+        移除影片的所有分段
+
+        Args:
+            video_path: 影片檔案路徑
+        """
+        keys = self._video_keys.pop(video_path, None)
+        self._video_signatures.pop(video_path, None)
+        if not keys:
+            return
+
+        for key in keys:
+            for gram in self._grams.pop(key, ()):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del self._postings[gram]
+            self._texts.pop(key, None)
+            for category_keys in self._category_keys.values():
+                category_keys.discard(key)
+
+    def search(self, query: str, category: Optional[str] = None) -> Set[TrackKey]:
+        """
+        搜尋分段名稱或訓練標籤包含所有關鍵字的分段
+
+        Args:
+            query: 查詢文字（以空白分隔多個關鍵字）
+            category: 只搜尋此課程種類，None 表示所有種類
+
+        Returns:
+            符合的 (影片路徑, 序號) 集合；查詢為空時回傳空集合
+        """
+        terms = tokenize(query)
+        if not terms:
+            return set()
+
+        # 先查最長的關鍵字，候選集合通常最小
+        result: Optional[Set[TrackKey]] = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            matches = self._match_term(term, result)
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+
+        if category is not None:
+            result &= self._category_keys.get(category, set())
+        return result
+
+    def _match_term(self, term: str, candidates: Optional[Set[TrackKey]]) -> Set[TrackKey]:
+        """查詢單一關鍵字（子字串比對）"""
+        if len(term) <= self.MAX_GRAM:
+            return set(self._postings.get(term, ()))
+
+        grams = {term[i:i + self.MAX_GRAM] for i in range(len(term) - self.MAX_GRAM + 1)}
+        postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+        matches = set(postings[0]) if candidates is None else postings[0] & candidates
+        for posting in postings[1:]:
+            matches &= posting
+            if not matches:
+                return matches
+
+        # 3-gram 都出現不代表連續出現，需確認
+        return {key for key in matches if term in self._texts[key]}
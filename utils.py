@@ -4,8 +4,20 @@
 """
 
 import os
+import tempfile
+import threading
+import unicodedata
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 影片專屬快取（關鍵幀索引、縮圖等）存放的資料夾名稱
+CACHE_DIR_NAME = ".workout-planner-cache"
 
 
 def seconds_to_time_str(seconds: float) -> str:
@@ -65,13 +77,9 @@ def get_video_files(directory: Path) -> List[Path]:
     Returns:
         影片檔案路徑列表
     """
-    if not directory.exists() or not directory.is_dir():
-        return []
-
-    video_files = []
-    video_files.extend(directory.glob("*.mp4"))
-    video_files.extend(directory.glob("*.m4v"))
-    return sorted(video_files)
+    from workspace_scanner import scan_category
+    directory = Path(directory)
+    return scan_category(directory.parent, directory.name).video_paths
 
 
 def get_workout_categories(work_dir: Path) -> List[str]:
@@ -84,15 +92,8 @@ def get_workout_categories(work_dir: Path) -> List[str]:
     Returns:
         課程種類名稱列表
     """
-    if not work_dir.exists():
-        return []
-
-    categories = []
-    for item in work_dir.iterdir():
-        if item.is_dir() and not item.name.startswith('.') and item.name != 'playlists':
-            categories.append(item.name)
-
-    return sorted(categories)
+    from workspace_scanner import scan_categories
+    return scan_categories(work_dir)
 
 
 def ensure_dir_exists(directory: Path) -> None:
@@ -105,6 +106,121 @@ def ensure_dir_exists(directory: Path) -> None:
     directory.mkdir(parents=True, exist_ok=True)
 
 
+# os.umask() 只能以「設定再還原」的方式讀取（不是執行緒安全的），匯入時讀取一次
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """
+    以原子方式寫入文字檔（先寫入同目錄的暫存檔再取代），
+    寫入途中中斷也不會留下不完整的檔案。
+    暫存檔建立時權限為 0600，取代前改為原檔案的權限（新檔案依 umask），
+    共用工作目錄的其他使用者仍可讀取
+
+    Args:
+        path: 檔案路徑
+        text: 檔案內容
+
+    Raises:
+        OSError: 寫入失敗
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class FileLock:
+    """
+    跨行程的建議式檔案鎖（advisory lock）
+
+    POSIX 使用 fcntl.lockf（網路磁碟上也有效），Windows 使用 msvcrt.locking。
+    lockf 的鎖屬於整個行程，因此同一行程內另以執行緒鎖互斥
+
+    用法:
+        with FileLock(path):
+            ...
+    """
+
+    _thread_locks: Dict[str, threading.Lock] = {}
+    _thread_locks_guard = threading.Lock()
+
+    def __init__(self, path: Path):
+        """
+        初始化檔案鎖
+
+        Args:
+            path: 鎖定檔路徑（不存在時會自動建立）
+        """
+        self.path = Path(path)
+        key = os.path.abspath(self.path)
+        with self._thread_locks_guard:
+            self._thread_lock = self._thread_locks.setdefault(key, threading.Lock())
+        self._file = None
+
+    def __enter__(self) -> 'FileLock':
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, 'a+b')
+            if fcntl:
+                fcntl.lockf(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue  # LK_LOCK 重試 10 秒後仍失敗，繼續等待
+        except BaseException:
+            if self._file:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if fcntl:
+                fcntl.lockf(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+
+
+def get_video_cache_path(video_path: Path, suffix: str) -> Path:
+    """
+    取得影片專屬快取檔案的路徑
+    快取存放在影片所在目錄的 .workout-planner-cache 資料夾
+
+    Args:
+        video_path: 影片檔案路徑
+        suffix: 快取檔案後綴（如 ".keyframes.json"）
+
+    Returns:
+        快取檔案路徑
+    """
+    return video_path.parent / CACHE_DIR_NAME / f"{video_path.name}{suffix}"
+
+
 def get_relative_path(path: Path, base: Path) -> str:
     """
     取得相對於基準路徑的相對路徑
@@ -122,6 +238,29 @@ def get_relative_path(path: Path, base: Path) -> str:
         return str(path)
 
 
+def normalize_video_id(video_path: Union[str, Path], work_dir: Path) -> str:
+    """
+    將影片路徑正規化為影片 ID
+    （相對於工作目錄、以 / 分隔、Unicode NFC，macOS 的 NFD 檔名也能對應）
+
+    Args:
+        video_path: 影片路徑（相對於工作目錄或絕對路徑）
+        work_dir: 工作目錄路徑
+
+    Returns:
+        影片 ID（如 "BodyCombat/BC64.mp4"）
+    """
+    path = Path(str(video_path).replace('\\', '/'))
+    if path.is_absolute():
+        for base in (work_dir, work_dir.resolve()):
+            try:
+                path = path.relative_to(base)
+                break
+            except ValueError:
+                continue
+    return unicodedata.normalize('NFC', path.as_posix())
+
+
 def validate_video_file(file_path: Path) -> Tuple[bool, str]:
     """
     驗證影片檔案
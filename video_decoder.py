@@ -0,0 +1,518 @@
+"""
+影片解碼模組
+提供循序解碼讀取器與背景解碼執行緒
+"""
+
+import random
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+
+class FrameReader:
+    """
+    影片幀讀取器
+
+    記錄 VideoCapture 下一次 read() 會回傳的幀號，
+    只有在真正跳轉時才呼叫 cap.set() 進行 seek，
+    一般播放時則循序解碼，避免每一幀都從關鍵幀重新解碼。
+    若有關鍵幀索引，跳轉時會先 seek 到目標之前最近的關鍵幀，
+    再往後解碼最少的幀數；目標與目前位置在同一個 GOP 內時則不需 seek
+    """
+
+    def __init__(self, cap, sequential: bool = True, keyframe_index=None):
+        """
+        初始化讀取器
+
+        Args:
+            cap: cv2.VideoCapture 物件
+            sequential: 是否啟用循序解碼（False 時每一幀都 seek）
+            keyframe_index: 關鍵幀索引 (KeyframeIndex，可選)
+        """
+        self.cap = cap
+        self.sequential = sequential
+        self.keyframe_index = keyframe_index
+        self.next_frame = 0  # 下一次 read() 會回傳的幀號，-1 表示未知
+        self.seek_count = 0
+
+    def seek(self, frame_number: int) -> None:
+        """
+        跳轉到指定幀
+
+        Args:
+            frame_number: 幀號
+        """
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        self.next_frame = frame_number
+        self.seek_count += 1
+
+    def _position_at(self, frame_number: int) -> bool:
+        """
+        將讀取位置移到指定幀
+
+        Args:
+            frame_number: 幀號
+
+        Returns:
+            是否成功
+        """
+        if self.sequential and frame_number == self.next_frame:
+            return True
+
+        if not self.sequential or self.keyframe_index is None:
+            self.seek(frame_number)
+            return True
+
+        # 目標在目前位置之後且屬於同一個 GOP 時，直接往後解碼即可
+        keyframe = self.keyframe_index.keyframe_at_or_before(frame_number)
+        if not (0 <= self.next_frame and keyframe <= self.next_frame < frame_number):
+            self.seek(keyframe)
+
+        while self.next_frame < frame_number:
+            if not self.cap.grab():
+                self.next_frame = -1
+                return False
+            self.next_frame += 1
+        return True
+
+    def read(self, frame_number: int):
+        """
+        讀取指定幀
+
+        Args:
+            frame_number: 幀號
+
+        Returns:
+            (是否成功, BGR 影像)
+        """
+        if not self._position_at(frame_number):
+            return False, None
+
+        ret, frame = self.cap.read()
+        self.next_frame = frame_number + 1 if ret else -1
+        return ret, frame
+
+    def grab(self, frame_number: int) -> bool:
+        """
+        解碼指定幀但不取出影像（用於丟棄落後的幀）
+
+        Args:
+            frame_number: 幀號
+
+        Returns:
+            是否成功
+        """
+        if not self._position_at(frame_number):
+            return False
+
+        ret = self.cap.grab()
+        self.next_frame = frame_number + 1 if ret else -1
+        return ret
+
+
+def measure_decode_fps(video_path: Path, frame_count: int = 300,
+                       start_frame: int = 0, sequential: bool = True) -> float:
+    """
+    量測解碼速度（用於比較循序解碼與逐幀 seek）
+
+    Args:
+        video_path: 影片檔案路徑
+        frame_count: 要解碼的幀數
+        start_frame: 起始幀號
+        sequential: 是否使用循序解碼
+
+    Returns:
+        每秒解碼幀數，無法開啟影片時回傳 0
+    """
+    if not CV2_AVAILABLE:
+        return 0.0
+
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        return 0.0
+
+    reader = FrameReader(cap, sequential=sequential)
+    decoded = 0
+    start_time = time.perf_counter()
+    try:
+        for frame_number in range(start_frame, start_frame + frame_count):
+            ret, _ = reader.read(frame_number)
+            if not ret:
+                break
+            decoded += 1
+    finally:
+        cap.release()
+
+    elapsed = time.perf_counter() - start_time
+    return decoded / elapsed if elapsed > 0 else 0.0
+
+
+def measure_seek_latency(video_path: Path, samples: int = 50,
+                         keyframe_index=None, seed: int = 0) -> float:
+    """
+    量測隨機跳轉的平均延遲
+
+    Args:
+        video_path: 影片檔案路徑
+        samples: 跳轉次數
+        keyframe_index: 關鍵幀索引（None 表示直接交由 OpenCV seek）
+        seed: 亂數種子（固定種子讓前後比較使用相同的跳轉位置）
+
+    Returns:
+        平均每次跳轉的秒數，無法開啟影片時回傳 0
+    """
+    if not CV2_AVAILABLE:
+        return 0.0
+
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        return 0.0
+
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    rng = random.Random(seed)
+    targets = [rng.randrange(max(1, total_frames)) for _ in range(samples)]
+
+    reader = FrameReader(cap, keyframe_index=keyframe_index)
+    start_time = time.perf_counter()
+    try:
+        for frame_number in targets:
+            reader.read(frame_number)
+    finally:
+        cap.release()
+
+    return (time.perf_counter() - start_time) / max(1, samples)
+
+
+def convert_frame(frame, width: int, height: int, out=None):
+    """
+    將 BGR 影像縮放並轉換為 RGB 顯示用影像
+
+    Args:
+        frame: BGR 影像
+        width: 顯示寬度
+        height: 顯示高度
+        out: 預先配置的輸出緩衝區（可選）
+
+    Returns:
+        RGB 影像（若有提供 out 則為 out 本身）
+    """
+    # 先縮放再轉色彩空間，轉換的像素較少
+    resized = cv2.resize(frame, (width, height), dst=out)
+    return cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)
+
+
+class FrameRing:
+    """
+    固定大小的幀環形緩衝區
+
+    所有緩衝區在建立時預先配置，解碼執行緒寫入後發布，
+    顯示端只取最新一幀；尚未被取走的舊幀會直接被覆寫（丟幀）
+    """
+
+    def __init__(self, slots: int, width: int, height: int):
+        """
+        初始化環形緩衝區
+
+        Args:
+            slots: 緩衝區數量（至少 3 個）
+            width: 影像寬度
+            height: 影像高度
+        """
+        slots = max(3, slots)
+        self.buffers: List = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(slots)]
+        self.frame_numbers: List[int] = [-1] * slots
+        self.dropped_frames = 0
+        self._lock = threading.Lock()
+        self._latest = -1    # 最新完成的緩衝區
+        self._reading = -1   # 顯示端正在使用的緩衝區
+        self._write_slot = -1
+
+    def acquire_write_slot(self) -> int:
+        """
+        取得可寫入的緩衝區（不會是最新幀或顯示中的幀）
+
+        Returns:
+            緩衝區索引
+        """
+        with self._lock:
+            slot = self._write_slot
+            for _ in range(len(self.buffers)):
+                slot = (slot + 1) % len(self.buffers)
+                if slot != self._latest and slot != self._reading:
+                    break
+            self._write_slot = slot
+            return slot
+
+    def publish(self, slot: int, frame_number: int) -> None:
+        """
+        發布寫入完成的幀
+
+        Args:
+            slot: 緩衝區索引
+            frame_number: 幀號
+        """
+        with self._lock:
+            if self._latest >= 0 and self._latest != self._reading:
+                # 前一幀尚未被顯示就被新幀取代
+                self.dropped_frames += 1
+            self.frame_numbers[slot] = frame_number
+            self._latest = slot
+
+    def take_latest(self) -> Optional[Tuple[int, int]]:
+        """
+        取得最新完成的幀，使用完畢後需呼叫 release()
+
+        Returns:
+            (緩衝區索引, 幀號)，沒有新幀時回傳 None
+        """
+        with self._lock:
+            if self._latest < 0 or self._latest == self._reading:
+                return None
+            self._reading = self._latest
+            return self._reading, self.frame_numbers[self._reading]
+
+    def release(self, slot: int) -> None:
+        """
+        釋放顯示端使用中的緩衝區
+
+        Args:
+            slot: 緩衝區索引
+        """
+        with self._lock:
+            if self._reading == slot:
+                self._reading = -1
+            if self._latest == slot:
+                self._latest = -1
+
+    def clear(self) -> None:
+        """捨棄所有尚未顯示的幀（跳轉時使用）"""
+        with self._lock:
+            if self._latest != self._reading:
+                self._latest = -1
+
+
+class PresentationClock:
+    """
+    播放時鐘
+
+    以 time.monotonic() 為基準計算目前的播放位置，
+    決定哪一幀應該在畫面上，不受顯示或解碼延遲影響而漂移
+    """
+
+    def __init__(self, fps: float):
+        """
+        初始化播放時鐘
+
+        Args:
+            fps: 影片幀率
+        """
+        self.fps = fps if fps > 0 else 30
+        self._lock = threading.Lock()
+        self._origin_position = 0.0  # 計時起點對應的播放位置（秒）
+        self._origin_time = time.monotonic()
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        """時鐘是否正在走"""
+        return self._running
+
+    def start(self, position: float) -> None:
+        """
+        從指定位置開始計時
+
+        Args:
+            position: 播放位置（秒）
+        """
+        with self._lock:
+            self._origin_position = position
+            self._origin_time = time.monotonic()
+            self._running = True
+
+    def pause(self) -> None:
+        """暫停計時，位置停在目前時間"""
+        with self._lock:
+            self._origin_position = self._position_locked()
+            self._running = False
+
+    def seek(self, position: float) -> None:
+        """
+        跳轉到指定位置（保持原本的執行狀態）
+
+        Args:
+            position: 播放位置（秒）
+        """
+        with self._lock:
+            self._origin_position = position
+            self._origin_time = time.monotonic()
+
+    def position(self) -> float:
+        """
+        取得目前播放位置
+
+        Returns:
+            播放位置（秒）
+        """
+        with self._lock:
+            return self._position_locked()
+
+    def frame(self) -> int:
+        """
+        取得目前應顯示的幀號
+
+        Returns:
+            幀號
+        """
+        return int(self.position() * self.fps)
+
+    def time_until(self, frame_number: int) -> float:
+        """
+        計算距離指定幀應顯示的時間
+
+        Args:
+            frame_number: 幀號
+
+        Returns:
+            秒數（已到期則為 0 或負數）
+        """
+        return frame_number / self.fps - self.position()
+
+    def _position_locked(self) -> float:
+        if not self._running:
+            return self._origin_position
+        return self._origin_position + (time.monotonic() - self._origin_time)
+
+
+class DecodeWorker:
+    """
+    背景解碼執行緒
+
+    以獨立的 VideoCapture 循序解碼、縮放並轉換色彩，
+    每一幀在 PresentationClock 到期時才發布到 FrameRing；
+    落後時鐘的幀直接跳過，落後太多時直接 seek 追上
+    """
+
+    # 落後超過此秒數時直接 seek，而不是逐幀丟棄
+    CATCH_UP_SEEK_SECONDS = 2.0
+
+    def __init__(self, video_path: Path, width: int, height: int,
+                 clock: PresentationClock, total_frames: int,
+                 start_frame: int = 0, end_frame: Optional[int] = None,
+                 slots: int = 4, keyframe_index=None):
+        """
+        初始化解碼執行緒
+
+        Args:
+            video_path: 影片檔案路徑
+            width: 顯示寬度
+            height: 顯示高度
+            clock: 播放時鐘
+            total_frames: 影片總幀數
+            start_frame: 起始幀號
+            end_frame: 結束幀號（不含），None 表示播到影片結尾
+            slots: 環形緩衝區數量
+            keyframe_index: 關鍵幀索引 (KeyframeIndex，可選)
+        """
+        self.video_path = video_path
+        self.keyframe_index = keyframe_index
+        self.width = width
+        self.height = height
+        self.clock = clock
+        self.fps = clock.fps
+        self.total_frames = total_frames
+        self.end_frame = total_frames if end_frame is None else min(end_frame, total_frames)
+        self.ring = FrameRing(slots, width, height)
+        self.finished = False
+        self.decoded_frames = 0
+
+        self._start_frame = start_frame
+        self._seek_frame: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """啟動解碼執行緒"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止解碼執行緒並等待結束"""
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def seek(self, frame_number: int) -> None:
+        """
+        播放中跳轉（時鐘需由呼叫端同步調整）
+
+        Args:
+            frame_number: 目標幀號
+        """
+        self._seek_frame = frame_number
+        self.ring.clear()
+
+    def _run(self) -> None:
+        """解碼循環（在背景執行緒中執行）"""
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            self.finished = True
+            return
+
+        reader = FrameReader(cap, keyframe_index=self.keyframe_index)
+        frame_number = self._start_frame
+        catch_up_frames = int(self.CATCH_UP_SEEK_SECONDS * self.fps)
+
+        try:
+            while not self._stop_event.is_set():
+                seek_frame = self._seek_frame
+                if seek_frame is not None:
+                    self._seek_frame = None
+                    frame_number = seek_frame
+
+                if frame_number >= self.end_frame:
+                    break
+
+                due_frame = self.clock.frame()
+
+                # 落後太多時直接跳到時鐘位置
+                if due_frame - frame_number > catch_up_frames:
+                    frame_number = due_frame
+                    continue
+
+                # 已落後時鐘的幀只解碼不轉換，直接丟棄
+                if frame_number < due_frame and frame_number < self.end_frame - 1:
+                    if not reader.grab(frame_number):
+                        break
+                    self.ring.dropped_frames += 1
+                    frame_number += 1
+                    continue
+
+                ret, frame = reader.read(frame_number)
+                if not ret:
+                    break
+
+                slot = self.ring.acquire_write_slot()
+                convert_frame(frame, self.width, self.height, out=self.ring.buffers[slot])
+
+                # 等到時鐘到達此幀才發布，畫面不會超前實際播放位置
+                wait = self.clock.time_until(frame_number)
+                if wait > 0 and self._stop_event.wait(wait):
+                    break
+                if self._seek_frame is not None:
+                    continue
+
+                self.ring.publish(slot, frame_number)
+                self.decoded_frames += 1
+                frame_number += 1
+        finally:
+            cap.release()
+            self.finished = True
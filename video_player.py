@@ -7,7 +7,7 @@ import tkinter as tk
 from tkinter import ttk
 from pathlib import Path
 from typing import Optional, Callable
-import threading
+import math
 import time
 
 try:
@@ -18,11 +18,16 @@ except ImportError:
     CV2_AVAILABLE = False
     print("警告: 無法導入 cv2 或 PIL，影片播放功能將不可用")
 
+from frame_cache import FrameCache
+from keyframe_index import KeyframeIndex
+from video_decoder import FrameReader, DecodeWorker, PresentationClock, convert_frame
+
 
 class VideoPlayer(ttk.Frame):
     """影片播放器元件"""
 
-    def __init__(self, parent, width=640, height=480):
+    def __init__(self, parent, width=640, height=480, sequential=True,
+                 cache_bytes=FrameCache.DEFAULT_MAX_BYTES):
         """
         初始化影片播放器
 
@@ -30,6 +35,8 @@ class VideoPlayer(ttk.Frame):
             parent: 父元件
             width: 播放器寬度
             height: 播放器高度
+            sequential: 播放時是否循序解碼（只在跳轉時 seek）
+            cache_bytes: 已解碼影像快取的容量上限（位元組），0 表示停用
         """
         super().__init__(parent)
 
@@ -37,12 +44,22 @@ class VideoPlayer(ttk.Frame):
         self.height = height
         self.video_path: Optional[Path] = None
         self.cap: Optional[cv2.VideoCapture] = None
+        self.reader: Optional[FrameReader] = None
+        self.keyframe_index: Optional[KeyframeIndex] = None
+        self.sequential = sequential
+        self.frame_cache = FrameCache(cache_bytes)
         self.is_playing = False
         self.current_frame = 0
         self.total_frames = 0
         self.fps = 30
         self.duration = 0  # 總時長（秒）
-        self.play_thread: Optional[threading.Thread] = None
+        self.clock = PresentationClock(self.fps)
+        self.stop_time: Optional[float] = None  # 播放到此時間（秒）自動暫停
+        self.decoder: Optional[DecodeWorker] = None
+        self._play_job = None  # 顯示計時器的 after() ID
+        self._next_tick = 0.0
+        self._photo = None
+        self._canvas_image = None
         self.on_position_changed: Optional[Callable[[float], None]] = None
 
         self._setup_ui()
@@ -140,10 +157,16 @@ class VideoPlayer(ttk.Frame):
         if not self.cap.isOpened():
             return False
 
+        # 關鍵幀索引（快取於影片目錄，影片變更時自動重建）
+        self.keyframe_index = KeyframeIndex.load_or_build(video_path)
+        self.reader = FrameReader(self.cap, sequential=self.sequential,
+                                  keyframe_index=self.keyframe_index)
+
         # 取得影片資訊
         self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
         self.fps = self.cap.get(cv2.CAP_PROP_FPS)
         self.duration = self.total_frames / self.fps if self.fps > 0 else 0
+        self.clock = PresentationClock(self.fps)
 
         # 顯示第一幀
         self._show_frame(0)
@@ -170,38 +193,53 @@ class VideoPlayer(ttk.Frame):
         if not self.cap:
             return
 
-        # 設定影片位置
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-        ret, frame = self.cap.read()
+        # 來回拖曳或 ±1 秒時，重複的幀直接從快取取得
+        cache_key = (str(self.video_path), frame_number)
+        frame = self.frame_cache.get(cache_key)
 
-        if ret:
-            # 轉換顏色空間 (BGR -> RGB)
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if frame is None:
+            # 讀取影片幀（循序播放時不需 seek）
+            ret, frame = self.reader.read(frame_number)
+            if not ret:
+                return
 
-            # 調整大小
-            frame = cv2.resize(frame, (self.width, self.height))
+            # 調整大小並轉換顏色空間 (BGR -> RGB)
+            frame = convert_frame(frame, self.width, self.height)
+            self.frame_cache.put(cache_key, frame)
 
-            # 轉換為 PIL Image
-            image = Image.fromarray(frame)
-            photo = ImageTk.PhotoImage(image)
+        self._display_frame(frame, frame_number)
 
-            # 顯示在 Canvas 上
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=photo)
-            self.canvas.image = photo  # 保持引用
+    def _display_frame(self, frame, frame_number: int) -> None:
+        """
+        將已轉換好的 RGB 影像顯示在 Canvas 上
+
+        Args:
+            frame: RGB 影像 (numpy 陣列，大小與播放器相同)
+            frame_number: 幀號
+        """
+        # 轉換為 PIL Image
+        image = Image.fromarray(frame)
+
+        # 重複使用同一個 PhotoImage 與 Canvas 物件，避免每幀重新建立
+        if self._photo is None:
+            self._photo = ImageTk.PhotoImage(image)
+            self._canvas_image = self.canvas.create_image(0, 0, anchor=tk.NW, image=self._photo)
+        else:
+            self._photo.paste(image)
 
-            self.current_frame = frame_number
+        self.current_frame = frame_number
 
-            # 更新進度條
-            progress = (frame_number / self.total_frames * 100) if self.total_frames > 0 else 0
-            self.progress_var.set(progress)
+        # 更新進度條
+        progress = (frame_number / self.total_frames * 100) if self.total_frames > 0 else 0
+        self.progress_var.set(progress)
 
-            # 更新時間標籤
-            self._update_time_label()
+        # 更新時間標籤
+        self._update_time_label()
 
-            # 觸發位置變更回調
-            if self.on_position_changed:
-                current_time = self.get_current_time()
-                self.on_position_changed(current_time)
+        # 觸發位置變更回調
+        if self.on_position_changed:
+            current_time = self.get_current_time()
+            self.on_position_changed(current_time)
 
     def _toggle_play_pause(self):
         """切換播放/暫停"""
@@ -218,21 +256,60 @@ class VideoPlayer(ttk.Frame):
         self.is_playing = True
         self.play_pause_btn.config(text="暫停")
 
-        # 在新執行緒中播放
-        self.play_thread = threading.Thread(target=self._play_loop, daemon=True)
-        self.play_thread.start()
+        end_frame = None
+        if self.stop_time is not None:
+            end_frame = int(math.ceil(self.stop_time * self.fps))
+
+        # 在背景執行緒解碼，主執行緒只負責依播放時鐘顯示
+        self.clock.start(self.current_frame / self.fps if self.fps > 0 else 0)
+        self.decoder = DecodeWorker(
+            self.video_path, self.width, self.height, self.clock,
+            self.total_frames, start_frame=self.current_frame + 1,
+            end_frame=end_frame, keyframe_index=self.keyframe_index
+        )
+        self.decoder.start()
+        self._next_tick = time.monotonic()
+        self._play_loop()
+
+    def play_segment(self, start: float, end: float) -> None:
+        """
+        播放指定片段，播放時鐘到達結束時間時自動暫停
+
+        Args:
+            start: 開始時間（秒）
+            end: 結束時間（秒）
+        """
+        if not self.cap:
+            return
+
+        self._pause()
+        self.seek_to(start)
+        self.stop_time = min(end, self.duration)
+        self._play()
 
     def _pause(self):
         """暫停播放"""
         self.is_playing = False
         self.play_pause_btn.config(text="播放")
+        self._stop_decoder()
+        self.clock.pause()
 
     def _stop(self):
         """停止播放"""
-        self.is_playing = False
-        self.play_pause_btn.config(text="播放")
+        self._pause()
+        self.stop_time = None
         self._show_frame(0)
 
+    def _stop_decoder(self):
+        """停止背景解碼與顯示計時器"""
+        if self._play_job is not None:
+            self.after_cancel(self._play_job)
+            self._play_job = None
+
+        if self.decoder:
+            self.decoder.stop()
+            self.decoder = None
+
     def _backward_one_second(self):
         """後退一秒"""
         if not self.cap:
@@ -258,23 +335,39 @@ class VideoPlayer(ttk.Frame):
         self.seek_to(target_time)
 
     def _play_loop(self):
-        """播放循環（在背景執行緒中執行）"""
-        frame_delay = 1.0 / self.fps if self.fps > 0 else 0.033
-
-        while self.is_playing and self.current_frame < self.total_frames - 1:
-            start_time = time.time()
+        """播放循環（由主執行緒的計時器驅動，只顯示最新解碼完成的幀）"""
+        self._play_job = None
+        decoder = self.decoder
+        if not self.is_playing or not decoder:
+            return
 
-            # 顯示下一幀
-            next_frame = self.current_frame + 1
-            self.after(0, lambda f=next_frame: self._show_frame(f))
+        # 播放時鐘到達片段結束時間，精確停在結束位置
+        if self.stop_time is not None and self.clock.position() >= self.stop_time:
+            self._pause()
+            self.clock.seek(self.stop_time)
+            self.stop_time = None
+            return
 
-            # 控制播放速度
-            elapsed = time.time() - start_time
-            sleep_time = max(0, frame_delay - elapsed)
-            time.sleep(sleep_time)
+        latest = decoder.ring.take_latest()
+        if latest:
+            slot, frame_number = latest
+            try:
+                self._display_frame(decoder.ring.buffers[slot], frame_number)
+            finally:
+                decoder.ring.release(slot)
+        elif decoder.finished and self.stop_time is None:
+            # 播放結束
+            self._pause()
+            return
 
-        # 播放結束
-        self.after(0, self._pause)
+        # 依牆上時鐘排程下一次顯示，避免計時誤差累積
+        frame_delay = 1.0 / self.fps if self.fps > 0 else 0.033
+        now = time.monotonic()
+        self._next_tick += frame_delay
+        if self._next_tick < now:
+            self._next_tick = now
+        delay_ms = max(1, int((self._next_tick - now) * 1000))
+        self._play_job = self.after(delay_ms, self._play_loop)
 
     def _on_scale_change(self, value):
         """
@@ -322,11 +415,13 @@ class VideoPlayer(ttk.Frame):
 
     def get_current_time(self) -> float:
         """
-        取得當前播放時間
+        取得當前播放時間（播放中以播放時鐘為準）
 
         Returns:
             當前時間（秒）
         """
+        if self.is_playing:
+            return min(self.clock.position(), self.duration)
         return self.current_frame / self.fps if self.fps > 0 else 0
 
     def get_duration(self) -> float:
@@ -350,22 +445,33 @@ class VideoPlayer(ttk.Frame):
 
         frame_number = int(seconds * self.fps)
         frame_number = max(0, min(frame_number, self.total_frames - 1))
+        if self.stop_time is not None and seconds >= self.stop_time:
+            self.stop_time = None
+
         self._show_frame(frame_number)
+        self.clock.seek(frame_number / self.fps if self.fps > 0 else 0)
+        if self.is_playing and self.decoder:
+            self.decoder.seek(frame_number + 1)
 
     def _release_video(self):
         """釋放影片資源"""
         self.is_playing = False
+        self._stop_decoder()
 
         if self.cap:
             self.cap.release()
             self.cap = None
+        self.reader = None
+        self.keyframe_index = None
 
         self.current_frame = 0
         self.total_frames = 0
         self.fps = 30
         self.duration = 0
+        self.stop_time = None
 
     def destroy(self):
         """銷毀元件"""
         self._release_video()
+        self.frame_cache.invalidate()
         super().destroy()
@@ -0,0 +1,191 @@
+"""
+工作目錄掃描模組
+以 os.scandir 一次列出課程種類、影片與分段描述檔，
+並以執行緒池平行掃描各課程種類資料夾（網路磁碟上每個系統呼叫都是一次往返）
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+VIDEO_EXTENSIONS = ('.mp4', '.m4v')
+PLAYLISTS_DIR_NAME = "playlists"
+
+Signature = Tuple[int, int]  # (mtime_ns, size)
+
+
+def stat_signature(path: Path) -> Optional[Signature]:
+    """
+    取得檔案簽章
+
+    Args:
+        path: 檔案路徑
+
+    Returns:
+        (mtime_ns, size)，檔案不存在時回傳 None
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ScannedVideo:
+    """掃描到的影片"""
+
+    __slots__ = ('path', 'category', 'sidecar_signature')
+
+    def __init__(self, path: Path, category: str, sidecar_signature: Optional[Signature]):
+        """
+        初始化掃描結果
+
+        Args:
+            path: 影片檔案路徑
+            category: 課程種類
+            sidecar_signature: 分段描述檔的 (mtime_ns, size)，沒有描述檔時為 None
+        """
+        self.path = path
+        self.category = category
+        self.sidecar_signature = sidecar_signature
+
+    @property
+    def json_path(self) -> Path:
+        """分段描述檔路徑"""
+        return self.path.with_suffix('.json')
+
+
+class CategoryScan:
+    """單一課程種類的掃描結果"""
+
+    def __init__(self, name: str, videos: List[ScannedVideo]):
+        """
+        初始化掃描結果
+
+        Args:
+            name: 課程種類
+            videos: 依路徑排序的影片列表
+        """
+        self.name = name
+        self.videos = videos
+
+    @property
+    def video_paths(self) -> List[Path]:
+        """影片路徑列表"""
+        return [video.path for video in self.videos]
+
+
+def scan_categories(work_dir: Path) -> List[str]:
+    """
+    列出所有課程種類（第一層資料夾，排除隱藏資料夾與 playlists/）
+
+    Args:
+        work_dir: 工作目錄路徑
+
+    Returns:
+        排序後的課程種類名稱列表
+    """
+    try:
+        with os.scandir(work_dir) as entries:
+            return sorted(
+                entry.name for entry in entries
+                if not entry.name.startswith('.') and entry.name != PLAYLISTS_DIR_NAME
+                and entry.is_dir()
+            )
+    except OSError:
+        return []
+
+
+def scan_category(work_dir: Path, category: str) -> CategoryScan:
+    """
+    掃描一個課程種類資料夾：一次列出影片與描述檔，只對存在的描述檔取得簽章
+
+    Args:
+        work_dir: 工作目錄路徑
+        category: 課程種類
+
+    Returns:
+        掃描結果（資料夾不存在時沒有影片）
+    """
+    directory = Path(work_dir) / category
+    videos: List[str] = []
+    sidecars: Dict[str, os.DirEntry] = {}
+
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                # 副檔名不分大小寫（.MP4 與 .mp4 都是影片）
+                if ext.lower() in VIDEO_EXTENSIONS:
+                    # d_type 已知時 is_file() 不需要額外的系統呼叫
+                    if entry.is_file():
+                        videos.append(entry.name)
+                elif ext == '.json':
+                    sidecars[stem] = entry
+    except OSError:
+        return CategoryScan(category, [])
+
+    result = []
+    for name in sorted(videos):
+        sidecar = sidecars.get(os.path.splitext(name)[0])
+        signature = None
+        if sidecar is not None:
+            try:
+                # Windows 上 DirEntry 已帶有 stat 資訊；其他平台每個描述檔一次 stat
+                stat = sidecar.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        result.append(ScannedVideo(directory / name, category, signature))
+    return CategoryScan(category, result)
+
+
+def iter_workspace(work_dir: Path, categories: Optional[Iterable[str]] = None,
+                   max_workers: Optional[int] = None) -> Iterator[CategoryScan]:
+    """
+    平行掃描工作目錄，每完成一個課程種類就回傳（順序不固定）
+
+    Args:
+        work_dir: 工作目錄路徑
+        categories: 要掃描的課程種類，None 表示全部
+        max_workers: 執行緒數量（None 表示依課程種類數與 CPU 核心數）
+
+    Yields:
+        CategoryScan
+    """
+    work_dir = Path(work_dir)
+    names = list(categories) if categories is not None else scan_categories(work_dir)
+    if len(names) <= 1 or max_workers == 1:
+        for name in names:
+            yield scan_category(work_dir, name)
+        return
+
+    max_workers = max_workers or min(len(names), (os.cpu_count() or 1) * 4, 32)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = [executor.submit(scan_category, work_dir, name) for name in names]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # 呼叫端提早停止時取消尚未開始的掃描
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def scan_workspace(work_dir: Path, categories: Optional[Iterable[str]] = None,
+                   max_workers: Optional[int] = None) -> Dict[str, CategoryScan]:
+    """
+    掃描整個工作目錄
+
+    Args:
+        work_dir: 工作目錄路徑
+        categories: 要掃描的課程種類，None 表示全部
+        max_workers: 執行緒數量
+
+    Returns:
+        {課程種類: 掃描結果}，依課程種類名稱排序
+    """
+    scans = {scan.name: scan for scan in iter_workspace(work_dir, categories, max_workers)}
+    return {name: scans[name] for name in sorted(scans)}
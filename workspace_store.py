@@ -0,0 +1,466 @@
+"""
+工作目錄資料庫模組
+以單一 SQLite 資料庫（WAL 模式）儲存分段、最愛、播放統計與偏好設定，
+可取代每部影片的 *.json 描述檔與 .workout-planner 配置檔，並可與 JSON 格式互相匯入匯出
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from track_manager import Track, read_track_file
+from utils import atomic_write_text, normalize_video_id
+from workspace_scanner import iter_workspace
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,          -- 影片 ID（相對於工作目錄）
+    category TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0 -- 分段每次變更加一
+);
+CREATE INDEX IF NOT EXISTS idx_videos_category ON videos(category);
+
+CREATE TABLE IF NOT EXISTS tracks (
+    video_id INTEGER NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+    serial INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    training TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (video_id, serial)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_tracks_training ON tracks(training COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS favorites (
+    video_id INTEGER NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+    serial INTEGER NOT NULL,
+    PRIMARY KEY (video_id, serial)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS playlist_stats (
+    name TEXT PRIMARY KEY,
+    play_count INTEGER NOT NULL DEFAULT 0,
+    last_played TEXT
+);
+
+CREATE TABLE IF NOT EXISTS preferences (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL                 -- JSON 編碼的值
+);
+"""
+
+
+def _row_to_track(serial: int, start: float, end: float, name: str, training: str) -> Track:
+    """資料列轉換為 Track（整數秒數還原為 int，匯出的 JSON 與原本相同）"""
+    if start.is_integer():
+        start = int(start)
+    if end.is_integer():
+        end = int(end)
+    return Track(serial, start, end, name, training)
+
+
+class WorkspaceStore:
+    """
+    工作目錄資料庫
+
+    工作目錄下有 .workout-planner.db 時，TrackManager、ConfigManager 與 TrackCatalog
+    改由資料庫讀寫；可用 `python workspace_store.py import/export <工作目錄>`
+    在資料庫與 JSON 檔案之間轉換
+    """
+
+    DB_FILE_NAME = ".workout-planner.db"
+
+    _instances: Dict[Path, 'WorkspaceStore'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, work_dir: Path):
+        """
+        開啟（或建立）工作目錄資料庫
+
+        Args:
+            work_dir: 工作目錄路徑
+        """
+        self.work_dir = Path(work_dir)
+        self.db_path = self.work_dir / self.DB_FILE_NAME
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open_if_exists(cls, work_dir: Path) -> Optional['WorkspaceStore']:
+        """
+        取得工作目錄共用的資料庫，沒有資料庫檔案時回傳 None
+
+        Args:
+            work_dir: 工作目錄路徑
+
+        Returns:
+            資料庫或 None
+        """
+        work_dir = Path(work_dir)
+        if not (work_dir / cls.DB_FILE_NAME).exists():
+            return None
+        return cls.for_workspace(work_dir)
+
+    @classmethod
+    def for_workspace(cls, work_dir: Path) -> 'WorkspaceStore':
+        """
+        取得工作目錄共用的資料庫（不存在時建立）
+
+        Args:
+            work_dir: 工作目錄路徑
+
+        Returns:
+            資料庫
+        """
+        key = Path(work_dir).resolve()
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(work_dir)
+                cls._instances[key] = store
+            return store
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        with self._instances_lock:
+            self._instances.pop(self.work_dir.resolve(), None)
+        with self._lock:
+            self._conn.close()
+
+    def _transaction(self):
+        """開始寫入交易（with 區塊結束時提交，發生例外時復原）"""
+        return _Transaction(self)
+
+    def video_id(self, video_path) -> str:
+        """取得影片 ID"""
+        return normalize_video_id(video_path, self.work_dir)
+
+    def _video_row_id(self, video_id: str, create: bool = False) -> Optional[int]:
+        """取得影片的資料列 ID，create 為 True 時不存在就新增"""
+        row = self._conn.execute("SELECT id FROM videos WHERE path = ?", (video_id,)).fetchone()
+        if row:
+            return row[0]
+        if not create:
+            return None
+        category = video_id.split('/', 1)[0] if '/' in video_id else ''
+        return self._conn.execute(
+            "INSERT INTO videos (path, category) VALUES (?, ?)", (video_id, category)
+        ).lastrowid
+
+    # --- 分段 ---
+
+    def get_tracks(self, video_path) -> Optional[List[Track]]:
+        """
+        取得影片的所有分段
+
+        Args:
+            video_path: 影片路徑
+
+        Returns:
+            依序號排序的 Track 列表，資料庫中沒有此影片的分段時回傳 None
+        """
+        with self._lock:
+            row_id = self._video_row_id(self.video_id(video_path))
+            if row_id is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT serial, start, end, name, training FROM tracks WHERE video_id = ? ORDER BY serial",
+                (row_id,)
+            ).fetchall()
+        return [_row_to_track(*row) for row in rows] if rows else None
+
+    def save_tracks(self, video_path, tracks: List[Track]) -> None:
+        """
+        取代影片的所有分段
+
+        Args:
+            video_path: 影片路徑
+            tracks: Track 列表
+        """
+        with self._transaction():
+            row_id = self._video_row_id(self.video_id(video_path), create=True)
+            self._conn.execute("DELETE FROM tracks WHERE video_id = ?", (row_id,))
+            self._conn.executemany(
+                "INSERT INTO tracks (video_id, serial, start, end, name, training) VALUES (?, ?, ?, ?, ?, ?)",
+                [(row_id, t.serial, t.start, t.end, t.name or '', t.training or '') for t in tracks]
+            )
+            self._conn.execute("UPDATE videos SET revision = revision + 1 WHERE id = ?", (row_id,))
+
+    def get_category_tracks(self, category: str) -> Dict[str, Tuple[int, List[Track]]]:
+        """
+        取得課程種類下所有影片的分段（單一查詢）
+
+        Args:
+            category: 課程種類
+
+        Returns:
+            {影片 ID: (版本號, Track 列表)}，只包含有分段的影片
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT v.path, v.revision, t.serial, t.start, t.end, t.name, t.training "
+                "FROM videos v JOIN tracks t ON t.video_id = v.id "
+                "WHERE v.category = ? ORDER BY v.path, t.serial",
+                (category,)
+            ).fetchall()
+
+        result: Dict[str, Tuple[int, List[Track]]] = {}
+        for path, revision, *track in rows:
+            result.setdefault(path, (revision, []))[1].append(_row_to_track(*track))
+        return result
+
+    def find_tracks(self, training: Optional[str] = None, category: Optional[str] = None,
+                    favorites_only: bool = False) -> List[Tuple[str, Track]]:
+        """
+        依訓練名稱、課程種類或最愛查詢分段（使用索引）
+
+        Args:
+            training: 訓練名稱（不分大小寫的完全比對），None 表示不限
+            category: 課程種類，None 表示不限
+            favorites_only: 只列出最愛
+
+        Returns:
+            [(影片 ID, Track)]
+        """
+        sql = ("SELECT v.path, t.serial, t.start, t.end, t.name, t.training "
+               "FROM tracks t JOIN videos v ON v.id = t.video_id")
+        conditions = []
+        params: List = []
+        if favorites_only:
+            sql += " JOIN favorites f ON f.video_id = t.video_id AND f.serial = t.serial"
+        if training is not None:
+            conditions.append("t.training = ? COLLATE NOCASE")
+            params.append(training)
+        if category is not None:
+            conditions.append("v.category = ?")
+            params.append(category)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY v.path, t.serial"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(path, _row_to_track(*track)) for path, *track in rows]
+
+    # --- 最愛 ---
+
+    def get_all_favorites(self) -> Dict[str, FrozenSet[int]]:
+        """
+        取得所有最愛
+
+        Returns:
+            {影片 ID: 最愛的分段序號集合}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT v.path, f.serial FROM favorites f JOIN videos v ON v.id = f.video_id"
+            ).fetchall()
+
+        favorites: Dict[str, set] = {}
+        for path, serial in rows:
+            favorites.setdefault(path, set()).add(serial)
+        return {path: frozenset(serials) for path, serials in favorites.items()}
+
+    def set_favorite(self, video_path, serial: int, is_favorite: bool) -> None:
+        """
+        設定分段的最愛狀態
+
+        Args:
+            video_path: 影片路徑
+            serial: 分段序號
+            is_favorite: 是否為最愛
+        """
+        with self._transaction():
+            row_id = self._video_row_id(self.video_id(video_path), create=is_favorite)
+            if row_id is None:
+                return
+            if is_favorite:
+                self._conn.execute("INSERT OR IGNORE INTO favorites (video_id, serial) VALUES (?, ?)",
+                                   (row_id, serial))
+            else:
+                self._conn.execute("DELETE FROM favorites WHERE video_id = ? AND serial = ?",
+                                   (row_id, serial))
+
+    # --- 播放統計與偏好設定 ---
+
+    def update_playlist_stats(self, playlist_name: str, last_played: Optional[str] = None) -> None:
+        """
+        播放次數加一並更新最後播放日期
+
+        Args:
+            playlist_name: 播放清單名稱
+            last_played: 最後播放日期 (YYYY-MM-DD 格式)
+        """
+        with self._transaction():
+            self._conn.execute(
+                "INSERT INTO playlist_stats (name, play_count, last_played) VALUES (?, 1, ?) "
+                "ON CONFLICT(name) DO UPDATE SET play_count = play_count + 1, "
+                "last_played = COALESCE(excluded.last_played, last_played)",
+                (playlist_name, last_played)
+            )
+
+    def set_preference(self, key: str, value) -> None:
+        """設定偏好設定"""
+        with self._transaction():
+            self._conn.execute(
+                "INSERT INTO preferences (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value, ensure_ascii=False))
+            )
+
+    def export_config(self) -> Dict:
+        """
+        以 .workout-planner 的格式匯出配置
+
+        Returns:
+            配置 dict（playlists、favorites、preferences）
+        """
+        with self._lock:
+            playlists = {
+                name: {"play_count": count, "last_played": last_played}
+                for name, count, last_played in self._conn.execute(
+                    "SELECT name, play_count, last_played FROM playlist_stats ORDER BY name")
+            }
+            preferences = {
+                key: json.loads(value)
+                for key, value in self._conn.execute("SELECT key, value FROM preferences ORDER BY key")
+            }
+        favorites = {path: sorted(serials) for path, serials in sorted(self.get_all_favorites().items())}
+        return {"playlists": playlists, "favorites": favorites, "preferences": preferences}
+
+    # --- JSON 匯入/匯出 ---
+
+    def import_json(self) -> Tuple[int, int]:
+        """
+        從工作目錄的 *.json 描述檔與 .workout-planner 匯入（取代資料庫內容）
+
+        Returns:
+            (匯入的影片數, 匯入的分段數)
+        """
+        video_count = 0
+        track_count = 0
+        with self._transaction():
+            # 保留 videos 資料列，版本號才會持續遞增
+            for table in ("favorites", "tracks", "playlist_stats", "preferences"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+            for scan in iter_workspace(self.work_dir):
+                for video in scan.videos:
+                    if video.sidecar_signature is None:
+                        continue
+                    try:
+                        tracks = read_track_file(video.json_path)
+                    except (json.JSONDecodeError, IOError, KeyError, AttributeError, TypeError, ValueError) as e:
+                        print(f"分段描述檔載入失敗: {video.json_path}: {e}")
+                        continue
+                    self.save_tracks(video.path, tracks)
+                    video_count += 1
+                    track_count += len(tracks)
+
+            config_file = self.work_dir / ".workout-planner"
+            if config_file.exists():
+                try:
+                    with open(config_file, 'r', encoding='utf-8') as f:
+                        config = json.load(f)
+                except (json.JSONDecodeError, IOError) as e:
+                    print(f"配置檔案載入失敗: {e}")
+                    config = {}
+
+                for video_path, serials in config.get("favorites", {}).items():
+                    for serial in serials:
+                        self.set_favorite(video_path, serial, True)
+                for name, stats in config.get("playlists", {}).items():
+                    self._conn.execute(
+                        "INSERT INTO playlist_stats (name, play_count, last_played) VALUES (?, ?, ?)",
+                        (name, stats.get("play_count", 0), stats.get("last_played"))
+                    )
+                for key, value in config.get("preferences", {}).items():
+                    self.set_preference(key, value)
+
+        return video_count, track_count
+
+    def export_json(self) -> int:
+        """
+        匯出為 *.json 描述檔與 .workout-planner（與 JSON 模式的格式相同）
+
+        Returns:
+            匯出的描述檔數
+        """
+        with self._lock:
+            paths = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT v.path FROM videos v JOIN tracks t ON t.video_id = v.id")]
+
+        for path in paths:
+            video_path = self.work_dir / path
+            data = {
+                "video": video_path.name,
+                "tracks": [t.to_dict() for t in self.get_tracks(path) or []]
+            }
+            atomic_write_text(video_path.with_suffix('.json'),
+                              json.dumps(data, indent=2, ensure_ascii=False))
+
+        atomic_write_text(self.work_dir / ".workout-planner",
+                          json.dumps(self.export_config(), indent=2, ensure_ascii=False))
+        return len(paths)
+
+
+class _Transaction:
+    """資料庫寫入交易（可巢狀，只有最外層會提交）"""
+
+    def __init__(self, store: WorkspaceStore):
+        self.store = store
+
+    def __enter__(self):
+        self.store._lock.acquire()
+        self._outermost = not self.store._conn.in_transaction
+        if self._outermost:
+            self.store._conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._outermost:
+                self.store._conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self.store._lock.release()
+
+
+def main() -> int:
+    """命令列進入點：在 JSON 檔案與資料庫之間轉換"""
+    parser = argparse.ArgumentParser(description="Workout Planner 工作目錄資料庫")
+    parser.add_argument("action", choices=["import", "export"],
+                        help="import: JSON 檔案匯入資料庫；export: 資料庫匯出為 JSON 檔案")
+    parser.add_argument("work_dir", help="工作目錄路徑")
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir)
+    if not work_dir.is_dir():
+        print(f"✗ 找不到工作目錄: {work_dir}")
+        return 1
+
+    if args.action == "import":
+        store = WorkspaceStore.for_workspace(work_dir)
+        videos, tracks = store.import_json()
+        print(f"✓ 已匯入 {videos} 部影片、{tracks} 個分段至 {store.db_path}")
+    else:
+        store = WorkspaceStore.open_if_exists(work_dir)
+        if store is None:
+            print(f"✗ 找不到資料庫: {work_dir / WorkspaceStore.DB_FILE_NAME}")
+            return 1
+        count = store.export_json()
+        print(f"✓ 已匯出 {count} 個分段描述檔與 .workout-planner")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
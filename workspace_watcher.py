@@ -0,0 +1,465 @@
+"""
+工作目錄監看模組
+監看課程種類資料夾中影片 (*.mp4, *.m4v) 與分段描述檔 (*.json) 的新增、修改與刪除，
+即時更新分段目錄並通知開啟中的視窗。Linux 使用 inotify，其他平台定期比對檔案簽章
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from track_catalog import TrackCatalog
+from workspace_scanner import PLAYLISTS_DIR_NAME, VIDEO_EXTENSIONS, scan_categories
+
+
+class WorkspaceChange:
+    """分段目錄的一項變更"""
+
+    ADDED = "added"
+    CHANGED = "changed"
+    REMOVED = "removed"
+    CATEGORIES = "categories"  # 課程種類資料夾增減（或事件遺失），已重新掃描整個工作目錄
+
+    def __init__(self, kind: str, video_path: Optional[Path] = None):
+        """
+        初始化變更
+
+        Args:
+            kind: 變更種類
+            video_path: 影片檔案路徑（CATEGORIES 時為 None）
+        """
+        self.kind = kind
+        self.video_path = video_path
+
+    @property
+    def category(self) -> Optional[str]:
+        """影片所屬的課程種類"""
+        return self.video_path.parent.name if self.video_path else None
+
+    def __repr__(self) -> str:
+        return f"WorkspaceChange({self.kind!r}, {self.video_path!r})"
+
+
+def _is_category_dir(name: str) -> bool:
+    """是否為課程種類資料夾名稱"""
+    return not name.startswith('.') and name != PLAYLISTS_DIR_NAME
+
+
+class _InotifyBackend:
+    """以 inotify 監看工作目錄與各課程種類資料夾（只在 Linux 上可用）"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    # 只監看寫入完成與搬移（atomic_write_text 以 rename 取代檔案），不監看尚在複製中的檔案
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    _EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self, work_dir: Path):
+        """
+        初始化 inotify
+
+        Args:
+            work_dir: 工作目錄路徑
+
+        Raises:
+            OSError: 平台不支援 inotify 或初始化失敗
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify 只在 Linux 上可用")
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._inotify_add_watch = libc.inotify_add_watch
+        self._inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self.work_dir = work_dir
+        self._watches: Dict[int, Path] = {}  # watch descriptor -> 資料夾
+        self._add_watch(work_dir)
+        for category in scan_categories(work_dir):
+            self._add_watch(work_dir / category)
+
+    def _add_watch(self, directory: Path) -> None:
+        """監看資料夾"""
+        wd = self._inotify_add_watch(self._fd, os.fsencode(str(directory)), self.WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = directory
+
+    def read(self, timeout: float) -> List[Path]:
+        """
+        等待並讀取事件
+
+        Args:
+            timeout: 最長等待時間（秒）
+
+        Returns:
+            有變動的檔案；課程種類資料夾增減時回傳工作目錄本身
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        while offset + self._EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = self._EVENT_HEADER.unpack_from(data, offset)
+            offset += self._EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                paths.append(self.work_dir)
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+
+            if mask & self.IN_ISDIR:
+                if directory == self.work_dir and _is_category_dir(name):
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        self._add_watch(path)
+                    paths.append(self.work_dir)
+            elif directory != self.work_dir and not mask & self.IN_CREATE:
+                paths.append(path)
+        return paths
+
+    def close(self) -> None:
+        """關閉 inotify"""
+        os.close(self._fd)
+
+
+class _PollingBackend:
+    """定期比對影片與描述檔的 (mtime_ns, size) 簽章"""
+
+    def __init__(self, work_dir: Path, interval: float):
+        """
+        初始化輪詢
+
+        Args:
+            work_dir: 工作目錄路徑
+            interval: 輪詢間隔（秒）
+        """
+        self.work_dir = work_dir
+        self.interval = interval
+        self._categories, self._signatures = self._snapshot()
+        self._last_poll = time.monotonic()
+
+    def _snapshot(self) -> Tuple[Set[str], Dict[Path, Tuple[int, int]]]:
+        """取得所有課程種類與檔案簽章"""
+        categories = set(scan_categories(self.work_dir))
+        signatures = {}
+        for category in categories:
+            try:
+                with os.scandir(self.work_dir / category) as entries:
+                    for entry in entries:
+                        ext = os.path.splitext(entry.name)[1]
+                        if ext.lower() not in VIDEO_EXTENSIONS and ext != '.json':
+                            continue
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        signatures[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return categories, signatures
+
+    def read(self, timeout: float) -> List[Path]:
+        """
+        到了輪詢時間就比對簽章，否則等待
+
+        Args:
+            timeout: 最長等待時間（秒）
+
+        Returns:
+            有變動的檔案；課程種類資料夾增減時回傳工作目錄本身
+        """
+        remaining = self._last_poll + self.interval - time.monotonic()
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            return []
+
+        categories, signatures = self._snapshot()
+        self._last_poll = time.monotonic()
+
+        paths = [path for path in signatures.keys() | self._signatures.keys()
+                 if signatures.get(path) != self._signatures.get(path)]
+        if categories != self._categories:
+            paths.append(self.work_dir)
+        self._categories, self._signatures = categories, signatures
+        return paths
+
+    def close(self) -> None:
+        """輪詢不需釋放資源"""
+
+
+class WorkspaceWatcher:
+    """
+    工作目錄監看器
+
+    在背景執行緒中監看檔案變更，連續的變更合併後（等待 DEBOUNCE 秒沒有新事件）
+    以 TrackCatalog.sync_video() 只更新受影響的影片，再以變更列表呼叫監聽函式。
+    監聽函式在背景執行緒中被呼叫，GUI 需以 after() 交回主執行緒處理。
+    第一個監聽函式加入時開始監看，最後一個移除時停止
+    """
+
+    DEBOUNCE = 0.3
+    DEFAULT_POLL_INTERVAL = 2.0
+
+    _instances: Dict[Path, 'WorkspaceWatcher'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, work_dir: Path, catalog: Optional[TrackCatalog] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+        """
+        初始化監看器
+
+        Args:
+            work_dir: 工作目錄路徑
+            catalog: 要更新的分段目錄（None 表示工作目錄共用的分段目錄）
+            poll_interval: 無法使用 inotify 時的輪詢間隔（秒）
+            use_inotify: 是否優先使用 inotify
+        """
+        self.work_dir = Path(work_dir)
+        self.catalog = catalog or TrackCatalog.for_workspace(self.work_dir)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.backend_name: Optional[str] = None
+
+        self._listeners: List[Callable[[List[WorkspaceChange]], None]] = []
+        self._pending: Set[Path] = set()
+        self._notified: Set[Path] = set()  # notify() 送來、尚未交給監看執行緒的路徑
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def for_workspace(cls, work_dir: Path) -> 'WorkspaceWatcher':
+        """
+        取得工作目錄共用的監看器
+
+        Args:
+            work_dir: 工作目錄路徑
+
+        Returns:
+            監看器
+        """
+        key = Path(work_dir).resolve()
+        with cls._instances_lock:
+            watcher = cls._instances.get(key)
+            if watcher is None:
+                watcher = cls(work_dir)
+                cls._instances[key] = watcher
+            return watcher
+
+    @classmethod
+    def get_existing(cls, work_dir: Path) -> Optional['WorkspaceWatcher']:
+        """
+        取得工作目錄已建立的監看器（不建立新的監看器與分段目錄）
+
+        Args:
+            work_dir: 工作目錄路徑
+
+        Returns:
+            監看器，尚未建立時回傳 None
+        """
+        with cls._instances_lock:
+            return cls._instances.get(Path(work_dir).resolve())
+
+    @property
+    def is_running(self) -> bool:
+        """是否正在監看"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_listener(self, listener: Callable[[List[WorkspaceChange]], None]) -> None:
+        """
+        加入監聽函式（尚未開始監看時開始監看）
+
+        Args:
+            listener: 以變更列表呼叫的函式
+        """
+        with self._lock:
+            self._listeners.append(listener)
+        self.start()
+
+    def remove_listener(self, listener: Callable[[List[WorkspaceChange]], None]) -> None:
+        """
+        移除監聽函式（沒有監聽函式時停止監看）
+
+        Args:
+            listener: add_listener() 時的函式
+        """
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+            empty = not self._listeners
+        if empty:
+            self.stop()
+
+    def start(self) -> None:
+        """在背景執行緒開始監看"""
+        if self.is_running and not self._stop_event.is_set():
+            return
+        if self._thread is not None:
+            # 剛要求停止的執行緒最多再等待一次 DEBOUNCE
+            self._thread.join()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止監看"""
+        self._stop_event.set()
+
+    def notify(self, paths: Iterable[Path]) -> None:
+        """
+        通知檔案已變更（不經由檔案系統事件，例如分段已存入資料庫）；
+        路徑交給監看執行緒處理，不在呼叫端的執行緒更新分段目錄。沒有在監看時忽略
+
+        Args:
+            paths: 影片或描述檔路徑（不在課程種類資料夾中的檔案會被忽略）
+        """
+        if not self.is_running:
+            return
+        with self._lock:
+            self._notified.update(Path(path) for path in paths)
+
+    def _category_paths(self, paths: Iterable[Path]) -> Set[Path]:
+        """將路徑轉換為與分段目錄相同的形式（工作目錄/課程種類/檔名），忽略課程種類資料夾外的檔案"""
+        root = self.work_dir.resolve()
+        inside = set()
+        for path in paths:
+            path = Path(path).resolve()
+            if path.parent.parent == root and _is_category_dir(path.parent.name):
+                inside.add(self.work_dir / path.parent.name / path.name)
+        return inside
+
+    def _create_backend(self):
+        """建立 inotify，無法使用時改用輪詢"""
+        if self.use_inotify:
+            try:
+                backend = _InotifyBackend(self.work_dir)
+                self.backend_name = "inotify"
+                return backend
+            except (OSError, AttributeError) as e:
+                print(f"inotify 無法使用，改為定期檢查: {e}")
+        self.backend_name = "polling"
+        return _PollingBackend(self.work_dir, self.poll_interval)
+
+    def _run(self) -> None:
+        """監看迴圈（在背景執行緒中執行）"""
+        backend = self._create_backend()
+        last_event = 0.0
+        try:
+            while not self._stop_event.is_set():
+                paths = backend.read(self.DEBOUNCE)
+                if paths:
+                    self._pending.update(paths)
+                    last_event = time.monotonic()
+
+                with self._lock:
+                    notified, self._notified = self._notified, set()
+                if notified:
+                    # notify() 送來的路徑不需要等待後續事件
+                    self._pending.update(self._category_paths(notified))
+
+                if self._pending and time.monotonic() - last_event >= self.DEBOUNCE:
+                    pending, self._pending = self._pending, set()
+                    self._dispatch(pending)
+        except Exception as e:
+            print(f"工作目錄監看失敗: {e}")
+        finally:
+            backend.close()
+
+    def _dispatch(self, paths: Set[Path]) -> None:
+        """更新分段目錄並通知監聽函式"""
+        try:
+            changes = self._apply(paths)
+        except Exception as e:
+            print(f"分段目錄更新失敗: {e}")
+            return
+        if not changes:
+            return
+
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"工作目錄變更通知失敗: {e}")
+
+    def _apply(self, paths: Set[Path]) -> List[WorkspaceChange]:
+        """將檔案變更對應到影片並更新分段目錄"""
+        if self.work_dir in paths:
+            self.catalog.refresh()
+            return [WorkspaceChange(WorkspaceChange.CATEGORIES)]
+
+        videos = set()
+        for path in paths:
+            ext = path.suffix
+            if ext.lower() in VIDEO_EXTENSIONS:
+                videos.add(path)
+            elif ext == '.json':
+                video_path = self._video_for_sidecar(path)
+                if video_path is not None:
+                    videos.add(video_path)
+
+        changes = []
+        for video_path in sorted(videos):
+            old_entry = self.catalog.get_entry(video_path)
+            old_signature = old_entry.signature if old_entry else None
+            entry = self.catalog.sync_video(video_path)
+            if entry is None:
+                if old_entry is None:
+                    continue
+                kind = WorkspaceChange.REMOVED
+            elif old_entry is None:
+                kind = WorkspaceChange.ADDED
+            elif entry.signature != old_signature:
+                kind = WorkspaceChange.CHANGED
+            else:
+                # 同一個變更可能同時經由 notify() 與檔案系統事件通知
+                continue
+            changes.append(WorkspaceChange(kind, video_path))
+        return changes
+
+    def _video_for_sidecar(self, json_path: Path) -> Optional[Path]:
+        """找出描述檔對應的影片"""
+        candidates = [json_path.with_suffix(suffix)
+                      for ext in VIDEO_EXTENSIONS for suffix in (ext, ext.upper())]
+        for video_path in candidates:
+            if self.catalog.get_entry(video_path) is not None:
+                return video_path
+        for video_path in candidates:
+            if video_path.exists():
+                return video_path
+        return None
@@ -3,14 +3,45 @@ XSPF 播放清單生成模組
 生成 VLC 播放器支援的 XSPF 格式播放清單
 """
 
-import xml.etree.ElementTree as ET
+import os
+import sys
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple
-from xml.dom import minidom
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from urllib.parse import quote
+
+
+def _escape(text: str) -> str:
+    """跳脫 XML 特殊字元（與 minidom 的輸出相同，換行統一為 \\n）"""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+
+def _element(indent: str, tag: str, text) -> str:
+    """只有文字內容的元素（一行）"""
+    if not text:
+        return f"{indent}<{tag}/>\n"
+    return f"{indent}<{tag}>{_escape(str(text))}</{tag}>\n"
+
+
+@lru_cache(maxsize=4096)
+def _video_stem(video_path: str) -> str:
+    """影片檔名（不含副檔名），同一部影片只計算一次"""
+    return Path(video_path).stem
 
 
 class PlaylistItem:
-    """播放清單項目"""
+    """
+    播放清單項目
+
+    使用 __slots__ 並以 sys.intern() 共用影片路徑與訓練名稱字串；
+    duration 在建立時計算，title 第一次讀取時才產生並保存。
+    項目建立後不再修改
+    """
+
+    __slots__ = ('video_path', 'track_serial', 'track_name', 'start_time', 'end_time', 'training',
+                 'duration', '_title')
 
     def __init__(self, video_path: str, track_serial: int, track_name: str,
                  start_time: float, end_time: float, training: str = ""):
@@ -25,31 +56,132 @@ class PlaylistItem:
             end_time: 結束時間（秒）
             training: 訓練名稱
         """
-        self.video_path = video_path
+        self.video_path = sys.intern(str(video_path))
         self.track_serial = track_serial
         self.track_name = track_name
         self.start_time = start_time
         self.end_time = end_time
-        self.training = training
-
-    @property
-    def duration(self) -> float:
-        """取得時長（秒）"""
-        return self.end_time - self.start_time
+        self.training = sys.intern(training) if training else training
+        self.duration = end_time - start_time  # 時長（秒）
+        self._title: Optional[str] = None
 
     @property
     def title(self) -> str:
         """取得顯示標題"""
-        video_name = Path(self.video_path).stem
-        title_parts = [video_name, f"Track {self.track_serial}"]
+        if self._title is None:
+            title_parts = [_video_stem(self.video_path), f"Track {self.track_serial}"]
+
+            if self.track_name:
+                title_parts.append(self.track_name)
+
+            if self.training:
+                title_parts.append(f"({self.training})")
+
+            self._title = " - ".join(title_parts)
+        return self._title
+
+
+class VideoURIResolver:
+    """
+    影片位置 URI 解析器
+
+    絕對路徑 URI 需要 resolve()（會存取檔案系統），同一部影片只解析一次並快取，
+    同一工作目錄的所有匯出共用；工作目錄內容變更時呼叫 invalidate()。
+    相對路徑 URI 只做字串運算，不存取檔案系統
+    """
+
+    _instances: Dict[Path, 'VideoURIResolver'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, work_dir: Path):
+        """
+        初始化解析器
+
+        Args:
+            work_dir: 工作目錄路徑
+        """
+        self.work_dir = Path(work_dir)
+        self._uris: Dict[str, str] = {}
+        self._relative_uris: Dict[Tuple[str, Path], str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_workspace(cls, work_dir: Path) -> 'VideoURIResolver':
+        """
+        取得工作目錄共用的解析器
+
+        Args:
+            work_dir: 工作目錄路徑
+
+        Returns:
+            解析器
+        """
+        key = Path(work_dir).absolute()
+        with cls._instances_lock:
+            resolver = cls._instances.get(key)
+            if resolver is None:
+                resolver = cls(work_dir)
+                cls._instances[key] = resolver
+            return resolver
+
+    def absolute_uri(self, video_path: str) -> str:
+        """
+        取得影片的絕對路徑 URI（file:///...）
+
+        Args:
+            video_path: 影片路徑（相對於工作目錄）
 
-        if self.track_name:
-            title_parts.append(self.track_name)
+        Returns:
+            URI
+        """
+        with self._lock:
+            uri = self._uris.get(video_path)
+        if uri is None:
+            uri = (self.work_dir / video_path).resolve().as_uri()
+            with self._lock:
+                self._uris[video_path] = uri
+        return uri
+
+    def relative_uri(self, video_path: str, playlist_dir: Path) -> str:
+        """
+        取得影片相對於播放清單所在目錄的 URI（不存取檔案系統）
 
-        if self.training:
-            title_parts.append(f"({self.training})")
+        Args:
+            video_path: 影片路徑（相對於工作目錄）
+            playlist_dir: 播放清單所在目錄
 
-        return " - ".join(title_parts)
+        Returns:
+            URI（如 ../BodyCombat/BC64.mp4）；Windows 上影片與播放清單位於不同磁碟時無法使用相對路徑，
+            改為 absolute_uri() 的結果
+        """
+        key = (video_path, playlist_dir)
+        uri = self._relative_uris.get(key)
+        if uri is None:
+            try:
+                relative = os.path.relpath(self.work_dir / video_path, playlist_dir)
+            except ValueError:
+                # 不同磁碟（如 C: 與 D:）之間沒有相對路徑
+                return self.absolute_uri(video_path)
+            uri = quote(Path(relative).as_posix())
+            with self._lock:
+                self._relative_uris[key] = uri
+        return uri
+
+    def invalidate(self, video_path: Optional[str] = None) -> None:
+        """
+        清除快取
+
+        Args:
+            video_path: 只清除此影片，None 表示全部清除
+        """
+        with self._lock:
+            if video_path is None:
+                self._uris.clear()
+                self._relative_uris.clear()
+            else:
+                self._uris.pop(video_path, None)
+                for key in [k for k in self._relative_uris if k[0] == video_path]:
+                    del self._relative_uris[key]
 
 
 class XSPFGenerator:
@@ -58,96 +190,112 @@ class XSPFGenerator:
     NAMESPACE = "http://xspf.org/ns/0/"
     VLC_NAMESPACE = "http://www.videolan.org/vlc/playlist/0"
 
-    def __init__(self, work_dir: str = "."):
+    def __init__(self, work_dir: str = ".", relative_locations: bool = False):
         """
         初始化生成器
 
         Args:
             work_dir: 工作目錄路徑
+            relative_locations: location 是否使用相對於播放清單檔案的路徑
         """
         self.work_dir = Path(work_dir)
+        self.relative_locations = relative_locations
+        self.resolver = VideoURIResolver.for_workspace(self.work_dir)
 
-    def generate_xspf(self, playlist_name: str, items: List[PlaylistItem]) -> str:
+    def generate_xspf(self, playlist_name: str, items: Iterable[PlaylistItem]) -> str:
         """
         生成 XSPF 格式的播放清單
 
         Args:
             playlist_name: 播放清單名稱
-            items: 播放清單項目列表
+            items: 播放清單項目（可為任意 iterable，逐項寫入）
 
         Returns:
             XSPF 檔案路徑
         """
-        # 建立 XML 根元素
-        playlist = ET.Element("playlist", {
-            "version": "1",
-            "xmlns": self.NAMESPACE,
-            "xmlns:vlc": self.VLC_NAMESPACE
-        })
-
-        # 標題
-        title = ET.SubElement(playlist, "title")
-        title.text = playlist_name
-
-        # trackList
-        track_list = ET.SubElement(playlist, "trackList")
-
-        for idx, item in enumerate(items, start=1):
-            self._add_track(track_list, item, idx)
-
-        # 轉換為字串並格式化
-        xml_str = ET.tostring(playlist, encoding='utf-8')
-        dom = minidom.parseString(xml_str)
-        pretty_xml = dom.toprettyxml(indent="  ", encoding='utf-8')
-
-        # 儲存檔案
         output_dir = self.work_dir / "playlists"
         output_dir.mkdir(exist_ok=True)
 
         output_file = output_dir / f"{playlist_name}.xspf"
-        with open(output_file, 'wb') as f:
-            f.write(pretty_xml)
-
+        self.write_xspf(output_file, playlist_name, items)
         return str(output_file)
 
-    def _add_track(self, track_list: ET.Element, item: PlaylistItem, track_id: int) -> None:
+    def write_xspf(self, output_file: Path, playlist_name: str, items: Iterable[PlaylistItem]) -> None:
         """
-        新增一個 track 到 trackList
+        將播放清單直接寫入檔案，每次只處理一個項目，記憶體用量與項目數無關
 
         Args:
-            track_list: trackList 元素
-            item: 播放清單項目
-            track_id: track ID（從1開始）
+            output_file: 輸出檔案路徑
+            playlist_name: 播放清單名稱
+            items: 播放清單項目
         """
-        track = ET.SubElement(track_list, "track")
-
-        # location (使用絕對路徑)
-        location = ET.SubElement(track, "location")
-        video_abs_path = (self.work_dir / item.video_path).resolve()
-        location.text = video_abs_path.as_uri()
+        with open(output_file, 'w', encoding='utf-8', newline='\n') as f:
+            self.write_xspf_to(f, playlist_name, items, Path(output_file).parent)
 
-        # title
-        title = ET.SubElement(track, "title")
-        title.text = item.title
-
-        # duration (毫秒)
-        duration = ET.SubElement(track, "duration")
-        duration.text = str(int(item.duration * 1000))
-
-        # extension for VLC options
-        extension = ET.SubElement(track, "extension", {
-            "application": self.VLC_NAMESPACE
-        })
+    def write_xspf_to(self, f: TextIO, playlist_name: str, items: Iterable[PlaylistItem],
+                      playlist_dir: Optional[Path] = None) -> None:
+        """
+        將播放清單寫入已開啟的文字檔
 
-        # VLC options for start and stop time
-        vlc_id = ET.SubElement(extension, "vlc:id")
-        vlc_id.text = str(track_id - 1)  # VLC uses 0-based index
+        Args:
+            f: 文字檔（UTF-8）
+            playlist_name: 播放清單名稱
+            items: 播放清單項目
+            playlist_dir: 播放清單所在目錄（使用相對路徑時需要，預設為 playlists/）
+        """
+        playlist_dir = playlist_dir or self.work_dir / "playlists"
+        for chunk in self._iter_xspf(playlist_name, items, playlist_dir):
+            f.write(chunk)
+
+    def _iter_xspf(self, playlist_name: str, items: Iterable[PlaylistItem],
+                   playlist_dir: Path) -> Iterator[str]:
+        """逐段產生縮排後的 XSPF 內容"""
+        yield '<?xml version="1.0" encoding="utf-8"?>\n'
+        yield f'<playlist xmlns="{self.NAMESPACE}" xmlns:vlc="{self.VLC_NAMESPACE}" version="1">\n'
+        yield _element("  ", "title", playlist_name)
+
+        iterator = iter(items)
+        first = next(iterator, None)
+        if first is None:
+            yield "  <trackList/>\n"
+        else:
+            yield "  <trackList>\n"
+            yield self._track_xml(first, 1, playlist_dir)
+            for idx, item in enumerate(iterator, start=2):
+                yield self._track_xml(item, idx, playlist_dir)
+            yield "  </trackList>\n"
+
+        yield "</playlist>\n"
+
+    def _track_xml(self, item: PlaylistItem, track_id: int, playlist_dir: Path) -> str:
+        """
+        產生一個 track 元素
 
-        vlc_option_start = ET.SubElement(extension, "vlc:option")
-        vlc_option_start.text = f"start-time={item.start_time:.2f}"
+        Args:
+            item: 播放清單項目
+            track_id: track ID（從1開始）
+            playlist_dir: 播放清單所在目錄
 
-        vlc_option_stop = ET.SubElement(extension, "vlc:option")
-        vlc_option_stop.text = f"stop-time={item.end_time:.2f}"
+        Returns:
+            track 元素的 XML（含縮排與換行）
+        """
+        # location 預設使用絕對路徑；duration 為毫秒；VLC 的 id 從0開始
+        if self.relative_locations:
+            location = self.resolver.relative_uri(item.video_path, playlist_dir)
+        else:
+            location = self.resolver.absolute_uri(item.video_path)
+        return (
+            "    <track>\n"
+            + _element("      ", "location", location)
+            + _element("      ", "title", item.title)
+            + _element("      ", "duration", str(int(item.duration * 1000)))
+            + f'      <extension application="{self.VLC_NAMESPACE}">\n'
+            + _element("        ", "vlc:id", str(track_id - 1))
+            + _element("        ", "vlc:option", f"start-time={item.start_time:.2f}")
+            + _element("        ", "vlc:option", f"stop-time={item.end_time:.2f}")
+            + "      </extension>\n"
+            "    </track>\n"
+        )
 
     @staticmethod
     def calculate_total_duration(items: List[PlaylistItem]) -> float:
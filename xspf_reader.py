@@ -0,0 +1,218 @@
+"""
+XSPF 播放清單讀取模組
+讀回已匯出的 XSPF 播放清單
+"""
+
+import difflib
+import os
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+from utils import normalize_video_id
+from xspf_generator import PlaylistItem, XSPFGenerator
+
+_NS = "{%s}" % XSPFGenerator.NAMESPACE
+_VLC_NS = "{%s}" % XSPFGenerator.VLC_NAMESPACE
+
+# 標題的 "Track N" 之後的部分： " - 名稱 - (訓練)"
+_TITLE_REST_RE = re.compile(r"^(?:(?P<name>.*) - )?\((?P<training>[^()]*)\)$")
+
+
+def location_to_video_path(location: str, playlist_dir: Path, work_dir: Path) -> str:
+    """
+    將 location URI 轉換為相對於工作目錄的影片路徑
+
+    Args:
+        location: file:/// 絕對路徑 URI 或相對於播放清單的 URI
+        playlist_dir: 播放清單所在目錄
+        work_dir: 工作目錄路徑
+
+    Returns:
+        影片 ID（如 "BodyCombat/BC64.mp4"；工作目錄外的影片為絕對路徑）
+    """
+    parsed = urlparse(location)
+    if parsed.scheme == "file":
+        path = Path(url2pathname(parsed.path))
+    else:
+        path = Path(os.path.normpath(playlist_dir / unquote(location)))
+    return normalize_video_id(path, work_dir)
+
+
+def parse_track_title(title: str, video_path: str) -> Tuple[int, str, str]:
+    """
+    從 PlaylistItem.title 格式的標題取回序號、名稱與訓練
+    （名稱本身以 "(...)" 結尾且沒有訓練時無法區分，會被視為訓練）
+
+    Args:
+        title: 標題（"BC64 - Track 3 - 名稱 - (訓練)"）
+        video_path: 影片路徑
+
+    Returns:
+        (序號, 名稱, 訓練)；不是本程式產生的標題時回傳 (0, 標題, "")
+    """
+    return _parse_title(title, f"{Path(video_path).stem} - Track ")
+
+
+def _parse_title(title: str, prefix: str) -> Tuple[int, str, str]:
+    """parse_track_title() 的實作（prefix 為「影片名稱 - Track 」）"""
+    if not title.startswith(prefix):
+        return 0, title, ""
+
+    rest = title[len(prefix):]
+    digits = len(rest) - len(rest.lstrip("0123456789"))
+    if digits == 0 or (len(rest) > digits and not rest.startswith(" - ", digits)):
+        return 0, title, ""
+
+    serial = int(rest[:digits])
+    rest = rest[digits + 3:]
+    match = _TITLE_REST_RE.match(rest)
+    if match:
+        return serial, match.group("name") or "", match.group("training")
+    return serial, rest, ""
+
+
+def iter_xspf_items(xspf_path: Path, work_dir: Path) -> Iterator[PlaylistItem]:
+    """
+    逐項讀取 XSPF 播放清單（iterparse，讀完一個 track 就釋放，記憶體用量與項目數無關）
+
+    Args:
+        xspf_path: XSPF 檔案路徑
+        work_dir: 工作目錄路徑
+
+    Yields:
+        PlaylistItem
+
+    Raises:
+        ET.ParseError: XML 格式錯誤
+    """
+    for _title, item in _iter_xspf(Path(xspf_path), Path(work_dir), {}):
+        if item is not None:
+            yield item
+
+
+def read_xspf(xspf_path: Path, work_dir: Path,
+              location_cache: Optional[Dict] = None) -> Tuple[str, List[PlaylistItem]]:
+    """
+    讀取 XSPF 播放清單
+
+    Args:
+        xspf_path: XSPF 檔案路徑
+        work_dir: 工作目錄路徑
+        location_cache: location 轉換結果的快取（讀取同一目錄的多個播放清單時共用）
+
+    Returns:
+        (播放清單名稱, PlaylistItem 列表)；沒有標題時以檔名為名稱
+
+    Raises:
+        ET.ParseError: XML 格式錯誤
+    """
+    xspf_path = Path(xspf_path)
+    name = xspf_path.stem
+    items = []
+    if location_cache is None:
+        location_cache = {}
+    for title, item in _iter_xspf(xspf_path, Path(work_dir), location_cache):
+        if item is None:
+            name = title or name
+        else:
+            items.append(item)
+    return name, items
+
+
+def _iter_xspf(xspf_path: Path, work_dir: Path,
+               location_cache: Dict[str, Tuple[str, str]]) -> Iterator[Tuple[Optional[str], Optional[PlaylistItem]]]:
+    """
+    讀取 XSPF 內容（同一部影片的 location 只轉換一次）
+
+    Yields:
+        (播放清單標題, None) 或 (None, PlaylistItem)
+    """
+    playlist_dir = xspf_path.parent
+    track_list = None
+    in_track = False
+
+    for event, elem in ET.iterparse(str(xspf_path), events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _NS + "track":
+                in_track = True
+            elif tag == _NS + "trackList":
+                track_list = elem
+            continue
+
+        if tag == _NS + "title" and not in_track:
+            yield (elem.text or "").strip(), None
+        elif tag == _NS + "track":
+            in_track = False
+            item = _track_to_item(elem, playlist_dir, work_dir, location_cache)
+            if item is not None:
+                yield None, item
+            # 已處理的 track 不再需要
+            if track_list is not None:
+                track_list.clear()
+
+
+def _track_to_item(track: ET.Element, playlist_dir: Path, work_dir: Path,
+                   location_cache: Dict[str, Tuple[str, str]]) -> Optional[PlaylistItem]:
+    """將 track 元素轉換為 PlaylistItem，沒有 location 時回傳 None"""
+    location = (track.findtext(_NS + "location") or "").strip()
+    if not location:
+        return None
+
+    cached = location_cache.get(location)
+    if cached is None:
+        video_path = location_to_video_path(location, playlist_dir, work_dir)
+        cached = location_cache[location] = (video_path, f"{Path(video_path).stem} - Track ")
+    video_path, title_prefix = cached
+    serial, name, training = _parse_title((track.findtext(_NS + "title") or "").strip(), title_prefix)
+
+    start_time = 0.0
+    end_time = None
+    for option in track.iter(_VLC_NS + "option"):
+        key, _, value = (option.text or "").partition("=")
+        try:
+            if key == "start-time":
+                start_time = float(value)
+            elif key == "stop-time":
+                end_time = float(value)
+        except ValueError:
+            continue
+
+    if end_time is None:
+        # 沒有 stop-time 時以 duration（毫秒）推算
+        try:
+            end_time = start_time + int(track.findtext(_NS + "duration") or 0) / 1000
+        except ValueError:
+            end_time = start_time
+
+    return PlaylistItem(video_path, serial, name, start_time, end_time, training)
+
+
+def diff_playlists(old_items: List[PlaylistItem], new_items: List[PlaylistItem]) -> List[str]:
+    """
+    比較兩個播放清單（以影片、序號與時間區間判定是否為同一項目）
+
+    Args:
+        old_items: 原播放清單
+        new_items: 新播放清單
+
+    Returns:
+        差異列表，每行以 "+ "（新增）、"- "（移除）或 "  "（相同）開頭
+    """
+    def key(item: PlaylistItem):
+        return item.video_path, item.track_serial, round(item.start_time, 2), round(item.end_time, 2)
+
+    matcher = difflib.SequenceMatcher(a=[key(i) for i in old_items], b=[key(i) for i in new_items],
+                                      autojunk=False)
+    lines = []
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            lines.extend(f"  {item.title}" for item in old_items[i1:i2])
+            continue
+        lines.extend(f"- {item.title}" for item in old_items[i1:i2])
+        lines.extend(f"+ {item.title}" for item in new_items[j1:j2])
+    return lines